@@ -55,6 +55,40 @@ class AppConfig(BaseSettings):
     chunk_tokens: int = Field(default=CHUNK_TOKENS, env="CHUNK_TOKENS")
     overlap_tokens: int = Field(default=OVERLAP_TOKENS, env="OVERLAP_TOKENS")
     
+    # Необязательные нативные бэкенды app.utils.smart_text. Их результаты
+    # могут отличаться от встроенной реализации, поэтому они включаются явно
+    use_semantic_splitter: bool = Field(default=False, env="USE_SEMANTIC_SPLITTER")
+    use_hyperscan: bool = Field(default=False, env="USE_HYPERSCAN")
+    use_rapidfuzz: bool = Field(default=False, env="USE_RAPIDFUZZ")
+    use_pysbd: bool = Field(default=False, env="USE_PYSBD")
+    use_datasketch: bool = Field(default=False, env="USE_DATASKETCH")
+    
+    # Хранение задач веб-интерфейса: Redis делает состояние задач общим для
+    # всех воркеров uvicorn и воркеров Celery
+    redis_url: Optional[str] = Field(default=None, env="REDIS_URL")
+    tasks_ttl: int = Field(default=86400, env="TASKS_TTL")
+    tasks_max_count: int = Field(default=10000, env="TASKS_MAX_COUNT")
+    
+    # Очередь Celery для обработки вне веб-процесса (брокер по умолчанию -
+    # redis_url), лимит времени задачи в секундах и число задач на процесс
+    # воркера до его перезапуска
+    celery_broker_url: Optional[str] = Field(default=None, env="CELERY_BROKER_URL")
+    celery_result_backend: Optional[str] = Field(default=None, env="CELERY_RESULT_BACKEND")
+    celery_task_time_limit: int = Field(default=3600, env="CELERY_TASK_TIME_LIMIT")
+    celery_max_tasks_per_child: int = Field(default=50, env="CELERY_MAX_TASKS_PER_CHILD")
+    
+    # Префикс внутреннего location nginx, отдающего файлы из output_dir.
+    # Если задан, файлы результатов отдаются через X-Accel-Redirect
+    x_accel_redirect_prefix: Optional[str] = Field(default=None, env="X_ACCEL_REDIRECT_PREFIX")
+    
+    # Время кеширования ответа /health в секундах
+    health_cache_ttl: float = Field(default=1.0, env="HEALTH_CACHE_TTL")
+    
+    # Запуск веб-сервера: число процессов uvicorn (больше одного - только с
+    # REDIS_URL) и журнал доступа
+    web_workers: int = Field(default=1, env="WEB_WORKERS")
+    web_access_log: bool = Field(default=False, env="WEB_ACCESS_LOG")
+    
     class Config:
         """Настройки для Pydantic"""
         env_file = ".env"
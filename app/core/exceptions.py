@@ -1,7 +1,7 @@
 """
 Иерархия исключений приложения
 """
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Callable, Dict, List
 
 class AppBaseError(Exception):
     """Базовое исключение для всех ошибок приложения"""
@@ -92,13 +92,28 @@ class ValidationError(AppBaseError):
         self, 
         message: str = "Ошибка валидации данных", 
         details: Optional[Dict[str, Any]] = None,
-        validation_errors: Optional[List[str]] = None
+        validation_errors: Optional[List[str]] = None,
+        details_factory: Optional[Callable[[], Dict[str, Any]]] = None
     ):
+        # details_factory вызывается только при первом обращении к details,
+        # поэтому детали не собираются, если их никто не читает
+        self._details_factory = details_factory
         details = details or {}
         if validation_errors:
             details["validation_errors"] = validation_errors
         
         super().__init__(message, details)
+    
+    @property
+    def details(self) -> Dict[str, Any]:
+        if self._details_factory is not None:
+            factory, self._details_factory = self._details_factory, None
+            self._details.update(factory())
+        return self._details
+    
+    @details.setter
+    def details(self, value: Dict[str, Any]) -> None:
+        self._details = value
 
 class FileProcessingError(AppBaseError):
     """Ошибка при обработке файлов"""
@@ -22,6 +22,7 @@ from ...core.models.transcript import Transcript, TranscriptSegment
 from ...core.models.protocol import Protocol
 from ...core.exceptions import ASRError, LLMError, NotificationError, ConfigError, ValidationError, FileProcessingError
 from ...utils.logging import get_default_logger
+from ...utils.text import count_segment_tokens
 from ...utils.metrics import track_file_processed, track_processing_time, monitor_processing_time
 from ...config.config import config
 
@@ -175,6 +176,10 @@ class Pipeline:
             with open(transcript_path, "w", encoding="utf-8") as f:
                 json.dump(transcript_segments, f, ensure_ascii=False, indent=2)
             
+            # Считаем токены сегментов один раз, пакетно - при разбиении
+            # на чанки они не кодируются повторно
+            count_segment_tokens(transcript_segments)
+            
             # 2. Обработка текста (Map-Reduce-Refine)
             logger.info("Step 2: Starting transcript analysis")
             if progress_callback:
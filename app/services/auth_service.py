@@ -2,14 +2,15 @@
 Authentication Service для управления пользователями и безопасностью
 """
 import secrets
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, List, Any, Union
+from typing import Dict, Optional, List, Any, Set, Union
 from pathlib import Path
 import json
 
 import jwt
 from passlib.context import CryptContext
-from pydantic import BaseModel, EmailStr, Field, SecretStr
+from pydantic import BaseModel, EmailStr, Field, PrivateAttr, SecretStr
 
 from ..utils.logging import get_default_logger
 from ..core.exceptions import AuthenticationError, ConfigError
@@ -36,6 +37,31 @@ class UserInDB(BaseModel):
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    _json_row: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    
+    @property
+    def json_row(self) -> Dict[str, Any]:
+        """
+        Строка списка пользователей для администратора
+        
+        Строка собирается при первом обращении и хранится до вызова
+        refresh_json_row(), который нужно делать после изменения полей.
+        """
+        if self._json_row is None:
+            self.refresh_json_row()
+        return self._json_row
+    
+    def refresh_json_row(self) -> None:
+        """Пересобирает строку списка пользователей после изменения полей"""
+        self._json_row = {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "roles": list(self.roles),
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat()
+        }
 
 class Token(BaseModel):
     """Модель токена доступа"""
@@ -99,6 +125,12 @@ class AuthenticationService:
         # Контекст для хеширования паролей
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         
+        # Методы сервиса вызываются из пула потоков, поэтому изменения
+        # пользователей и сессий и их сохранение в файл выполняются под
+        # блокировкой. Блокировка реентерабельная: изменяющие методы вызывают
+        # _save_data, уже удерживая ее
+        self._lock = threading.RLock()
+        
         # Временное хранилище (будет заменено на PostgreSQL)
         self.db_path = db_path or Path("./data/auth.json")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -113,6 +145,9 @@ class AuthenticationService:
         """Загружает данные из файла (временное решение)"""
         self.users: Dict[str, UserInDB] = {}
         self.sessions: Dict[str, Session] = {}
+        # Индекс идентификаторов сессий по пользователю: сессии пользователя
+        # находятся без обхода всех сессий
+        self.sessions_by_user: Dict[str, Set[str]] = {}
         
         if self.db_path.exists():
             try:
@@ -127,21 +162,40 @@ class AuthenticationService:
                 # Загружаем сессии
                 for session_data in data.get("sessions", []):
                     session = Session(**session_data)
-                    self.sessions[session.session_id] = session
+                    self._add_session(session)
                     
             except Exception as e:
                 logger.warning(f"Failed to load auth data: {e}")
     
+    def _add_session(self, session: Session) -> None:
+        """Добавляет сессию в хранилище и индекс по пользователю"""
+        self.sessions[session.session_id] = session
+        self.sessions_by_user.setdefault(session.user_id, set()).add(session.session_id)
+    
+    def _remove_session(self, session_id: str) -> None:
+        """Удаляет сессию из хранилища и индекса по пользователю"""
+        session = self.sessions.pop(session_id)
+        user_sessions = self.sessions_by_user.get(session.user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self.sessions_by_user[session.user_id]
+    
+    def _user_sessions(self, user_id: str) -> List[Session]:
+        """Возвращает все сессии пользователя по индексу"""
+        return [self.sessions[session_id] for session_id in tuple(self.sessions_by_user.get(user_id, ()))]
+    
     def _save_data(self) -> None:
         """Сохраняет данные в файл (временное решение)"""
         try:
-            data = {
-                "users": [user.model_dump(mode='json') for user in self.users.values()],
-                "sessions": [session.model_dump(mode='json') for session in self.sessions.values()]
-            }
-            
-            with open(self.db_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            with self._lock:
+                data = {
+                    "users": [user.model_dump(mode='json') for user in self.users.values()],
+                    "sessions": [session.model_dump(mode='json') for session in self.sessions.values()]
+                }
+                
+                with open(self.db_path, 'w') as f:
+                    json.dump(data, f, indent=2, default=str)
                 
         except Exception as e:
             logger.error(f"Failed to save auth data: {e}")
@@ -176,7 +230,8 @@ class AuthenticationService:
                 details={"username": user_create.username}
             )
         
-        # Создаем пользователя
+        # Создаем пользователя. Хеширование bcrypt медленное, поэтому
+        # выполняется без блокировки
         user_id = secrets.token_urlsafe(16)
         hashed_password = self.get_password_hash(user_create.password.get_secret_value())
         
@@ -189,8 +244,16 @@ class AuthenticationService:
             roles=user_create.roles
         )
         
-        self.users[user.username] = user
-        self._save_data()
+        with self._lock:
+            # Проверяем повторно: пользователя с тем же именем могли создать,
+            # пока хешировался пароль
+            if user.username in self.users:
+                raise AuthenticationError(
+                    message="User already exists",
+                    details={"username": user.username}
+                )
+            self.users[user.username] = user
+            self._save_data()
         
         logger.info(f"Created user: {user.username}")
         return user
@@ -343,8 +406,9 @@ class AuthenticationService:
             ip_address=ip_address
         )
         
-        self.sessions[session_id] = session
-        self._save_data()
+        with self._lock:
+            self._add_session(session)
+            self._save_data()
         
         logger.info(f"Created session for user: {user.username}")
         return session
@@ -375,12 +439,14 @@ class AuthenticationService:
         Returns:
             True, если сессия была инвалидирована
         """
-        if session_id in self.sessions:
+        with self._lock:
+            if session_id not in self.sessions:
+                return False
             self.sessions[session_id].is_active = False
             self._save_data()
-            logger.info(f"Invalidated session: {session_id}")
-            return True
-        return False
+        
+        logger.info(f"Invalidated session: {session_id}")
+        return True
     
     def invalidate_user_sessions(self, user_id: str) -> int:
         """
@@ -393,13 +459,16 @@ class AuthenticationService:
             Количество инвалидированных сессий
         """
         count = 0
-        for session in self.sessions.values():
-            if session.user_id == user_id and session.is_active:
-                session.is_active = False
-                count += 1
+        with self._lock:
+            for session in self._user_sessions(user_id):
+                if session.is_active:
+                    session.is_active = False
+                    count += 1
+            
+            if count > 0:
+                self._save_data()
         
         if count > 0:
-            self._save_data()
             logger.info(f"Invalidated {count} sessions for user: {user_id}")
             
         return count
@@ -449,14 +518,16 @@ class AuthenticationService:
         if not user:
             return False
             
-        if role not in user.roles:
+        with self._lock:
+            if role in user.roles:
+                return False
             user.roles.append(role)
             user.updated_at = datetime.now(timezone.utc)
+            user.refresh_json_row()
             self._save_data()
-            logger.info(f"Added role '{role}' to user: {username}")
-            return True
-            
-        return False
+        
+        logger.info(f"Added role '{role}' to user: {username}")
+        return True
 
     
     def remove_role_from_user(self, username: str, role: str) -> bool:
@@ -474,14 +545,40 @@ class AuthenticationService:
         if not user:
             return False
             
-        if role in user.roles and role != "user":  # Базовую роль user нельзя удалить
+        with self._lock:
+            if role not in user.roles or role == "user":  # Базовую роль user нельзя удалить
+                return False
             user.roles.remove(role)
             user.updated_at = datetime.now(timezone.utc)
+            user.refresh_json_row()
             self._save_data()
-            logger.info(f"Removed role '{role}' from user: {username}")
-            return True
+        
+        logger.info(f"Removed role '{role}' from user: {username}")
+        return True
+    
+    def set_user_roles(self, username: str, roles: List[str]) -> Optional[UserInDB]:
+        """
+        Заменяет список ролей пользователя
+        
+        Args:
+            username: Имя пользователя
+            roles: Новый список ролей
             
-        return False
+        Returns:
+            Обновленный пользователь или None
+        """
+        user = self.get_user(username)
+        if not user:
+            return None
+        
+        with self._lock:
+            user.roles = list(roles)
+            user.updated_at = datetime.now(timezone.utc)
+            user.refresh_json_row()
+            self._save_data()
+        
+        logger.info(f"Set roles {roles} for user: {username}")
+        return user
     
     def update_user(self, username: str, **kwargs) -> Optional[UserInDB]:
         """
@@ -500,12 +597,14 @@ class AuthenticationService:
             
         # Обновляем разрешенные поля
         allowed_fields = {"email", "full_name", "is_active"}
-        for field, value in kwargs.items():
-            if field in allowed_fields and hasattr(user, field):
-                setattr(user, field, value)
-        
-        user.updated_at = datetime.now(timezone.utc)
-        self._save_data()
+        with self._lock:
+            for field, value in kwargs.items():
+                if field in allowed_fields and hasattr(user, field):
+                    setattr(user, field, value)
+            
+            user.updated_at = datetime.now(timezone.utc)
+            user.refresh_json_row()
+            self._save_data()
         
         logger.info(f"Updated user: {username}")
         return user
@@ -522,14 +621,13 @@ class AuthenticationService:
             Список активных сессий
         """
         now = datetime.now(timezone.utc)
-        active_sessions = []
+        with self._lock:
+            sessions = list(self.sessions.values()) if user_id is None else self._user_sessions(user_id)
         
-        for session in self.sessions.values():
-            if session.is_active and session.expires_at > now:
-                if user_id is None or session.user_id == user_id:
-                    active_sessions.append(session)
-                    
-        return active_sessions
+        return [
+            session for session in sessions
+            if session.is_active and session.expires_at > now
+        ]
     
     def cleanup_expired_sessions(self) -> int:
         """
@@ -541,15 +639,18 @@ class AuthenticationService:
         now = datetime.now(timezone.utc)
         expired_sessions = []
         
-        for session_id, session in self.sessions.items():
-            if session.expires_at < now:
-                expired_sessions.append(session_id)
-        
-        for session_id in expired_sessions:
-            del self.sessions[session_id]
+        with self._lock:
+            for session_id, session in self.sessions.items():
+                if session.expires_at < now:
+                    expired_sessions.append(session_id)
+            
+            for session_id in expired_sessions:
+                self._remove_session(session_id)
+            
+            if expired_sessions:
+                self._save_data()
         
         if expired_sessions:
-            self._save_data()
             logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
             
         return len(expired_sessions)
@@ -288,6 +288,39 @@ class CacheAdapter:
         
         return success
     
+    def is_redis_available(self) -> bool:
+        """
+        Проверяет, используется ли Redis
+        
+        Returns:
+            True, если подключение к Redis установлено
+        """
+        return self._redis_available
+    
+    def get_cache_size(self) -> Optional[int]:
+        """
+        Возвращает количество записей в кеше
+        
+        Для Redis это DBSIZE (запрос к серверу), для файлового кеша - обход
+        директории кеша, поэтому частые вызовы стоит кешировать.
+        
+        Returns:
+            Количество записей или None, если его не удалось получить
+        """
+        if self._redis_available and self.redis_client:
+            try:
+                return self.redis_client.dbsize()
+            except Exception as e:
+                logger.warning(f"Failed to get Redis cache size: {e}")
+        
+        if self.fallback_to_file and self.file_cache_dir.exists():
+            try:
+                return sum(1 for _ in self.file_cache_dir.rglob("*.cache"))
+            except Exception as e:
+                logger.warning(f"Failed to get file cache size: {e}")
+        
+        return None
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Возвращает статистику кеша
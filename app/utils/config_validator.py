@@ -31,6 +31,9 @@ def get_config_health_status() -> Dict[str, Any]:
     """
     Возвращает детальную информацию о состоянии конфигурации
     
+    Результат содержит только JSON-совместимые типы (str, int, bool, None,
+    list, dict), поэтому его можно напрямую сериализовать через orjson.
+    
     Returns:
         Dict[str, Any]: Словарь с информацией о состоянии конфигурации
     """
@@ -39,8 +42,8 @@ def get_config_health_status() -> Dict[str, Any]:
         result = validator.validate_all()
         return {
             "healthy": len(validator.errors) == 0,
-            "errors": validator.errors,
-            "warnings": validator.warnings,
+            "errors": list(validator.errors),
+            "warnings": list(validator.warnings),
             "details": result
         }
     except Exception as e:
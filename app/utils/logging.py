@@ -6,12 +6,14 @@
 """
 import logging
 import logging.config
+import logging.handlers
+import queue
 import sys
 import os
 import yaml
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, List, Tuple
 
 # Пытаемся импортировать colorlog для цветного логирования
 try:
@@ -27,6 +29,86 @@ except ImportError:
     DEFAULT_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOGS_DIR = Path("logs")
 
+class _RoutedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладет записи в общую очередь вместе с хэндлерами, которые их выводят
+    """
+    def __init__(self, log_queue: queue.SimpleQueue, handlers: List[logging.Handler]):
+        super().__init__(log_queue)
+        self.target_handlers = tuple(handlers)
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        record.target_handlers = self.target_handlers
+        super().enqueue(record)
+
+class _RoutedQueueListener(logging.handlers.QueueListener):
+    """
+    Передает записи из очереди хэндлерам логгера, из которого они пришли
+    """
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in record.target_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+# Очередь и поток вывода логов, пока включен start_queue_logging()
+_log_queue: Optional[queue.SimpleQueue] = None
+_queue_listener: Optional[_RoutedQueueListener] = None
+_queued_loggers: List[Tuple[logging.Logger, _RoutedQueueHandler]] = []
+
+def _enqueue_logger_handlers(logger: logging.Logger) -> None:
+    """Заменяет хэндлеры логгера одним хэндлером общей очереди"""
+    handlers = [h for h in logger.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    if not handlers:
+        return
+    
+    queue_handler = _RoutedQueueHandler(_log_queue, handlers)
+    logger.handlers = [h for h in logger.handlers if h not in handlers] + [queue_handler]
+    _queued_loggers.append((logger, queue_handler))
+
+def start_queue_logging() -> None:
+    """
+    Переводит вывод логов в фоновый поток
+    
+    Хэндлеры всех настроенных логгеров заменяются хэндлером общей очереди,
+    а запись в консоль и файлы выполняет поток QueueListener. Вызывающий
+    поток только кладет запись в очередь и не ждет блокировок хэндлеров и
+    ввода-вывода. Логгеры, настроенные через setup_logger() позже, тоже
+    пишут через очередь. Повторный вызов ничего не делает.
+    """
+    global _log_queue, _queue_listener
+    if _queue_listener is not None:
+        return
+    
+    _log_queue = queue.SimpleQueue()
+    loggers = [logging.getLogger()] + [
+        logger for logger in list(logging.Logger.manager.loggerDict.values())
+        if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        _enqueue_logger_handlers(logger)
+    
+    _queue_listener = _RoutedQueueListener(_log_queue)
+    _queue_listener.start()
+
+def stop_queue_logging() -> None:
+    """
+    Выводит оставшиеся в очереди записи и возвращает логгерам их хэндлеры
+    """
+    global _log_queue, _queue_listener
+    if _queue_listener is None:
+        return
+    
+    _queue_listener.stop()
+    for logger, queue_handler in _queued_loggers:
+        if queue_handler in logger.handlers:
+            logger.removeHandler(queue_handler)
+            for handler in queue_handler.target_handlers:
+                logger.addHandler(handler)
+    
+    _queued_loggers.clear()
+    _log_queue = None
+    _queue_listener = None
+
 def setup_logger(
     name: str,
     log_level: Union[str, int] = DEFAULT_LOG_LEVEL,
@@ -77,6 +159,9 @@ def setup_logger(
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
     
+    if _log_queue is not None:
+        _enqueue_logger_handlers(logger)
+    
     return logger
 
 def get_default_logger(name: str) -> logging.Logger:
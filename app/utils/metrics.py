@@ -2,7 +2,8 @@
 Prometheus метрики для мониторинга приложения
 """
 import time
-from typing import Dict, Any, Optional, Callable
+import threading
+from typing import Dict, Any, List, Optional, Callable
 from functools import wraps
 from threading import Lock
 
@@ -12,10 +13,12 @@ try:
         CollectorRegistry, generate_latest, 
         CONTENT_TYPE_LATEST, REGISTRY
     )
+    from prometheus_client.core import CounterMetricFamily
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
     Counter = Histogram = Gauge = Summary = None
+    CounterMetricFamily = None
     CollectorRegistry = None
     generate_latest = None
     CONTENT_TYPE_LATEST = 'text/plain'
@@ -25,13 +28,83 @@ from ..utils.logging import get_default_logger
 
 logger = get_default_logger(__name__)
 
+class _ShardedCounter:
+    """
+    Счетчики по ключам без блокировки на горячем пути
+    
+    Каждый поток увеличивает только собственный словарь счетчиков
+    (threading.local), поэтому инкремент не требует блокировки. При чтении
+    значения всех потоков суммируются.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[str, int]] = []
+        self._shards_lock = Lock()
+    
+    def _shard(self) -> Dict[str, int]:
+        """Возвращает словарь счетчиков текущего потока"""
+        shard = getattr(self._local, "counts", None)
+        if shard is None:
+            shard = {}
+            # Блокировка нужна только при первом обращении потока
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.counts = shard
+        return shard
+    
+    def increment(self, key: str, amount: int = 1) -> None:
+        """Увеличивает счетчик key на amount"""
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+    
+    def snapshot(self) -> Dict[str, int]:
+        """Возвращает суммы счетчиков по всем потокам"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        
+        totals: Dict[str, int] = {}
+        for shard in shards:
+            for key, value in shard.copy().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+class _TaskCountsCollector:
+    """Передает счетчики задач в Prometheus в момент сбора метрик"""
+    
+    def __init__(self, task_counts: _ShardedCounter):
+        self._task_counts = task_counts
+    
+    def collect(self):
+        counts = self._task_counts.snapshot()
+        
+        yield CounterMetricFamily(
+            'meeting_tasks_created',
+            'Total number of created processing tasks',
+            value=counts.pop(MetricsCollector.TASK_CREATED_KEY, 0)
+        )
+        
+        status_updates = CounterMetricFamily(
+            'meeting_task_status_updates',
+            'Total number of task status updates',
+            labels=['status']
+        )
+        for status, value in sorted(counts.items()):
+            status_updates.add_metric([status], value)
+        yield status_updates
+
 class MetricsCollector:
     """Коллектор метрик для мониторинга системы"""
     
+    TASK_CREATED_KEY = "__created__"
+    
     def __init__(self, registry: Optional[CollectorRegistry] = None):
         self.registry = registry or REGISTRY
         self._metrics: Dict[str, Any] = {}
         self._enabled = PROMETHEUS_AVAILABLE
+        # Счетчики задач обновляются из потоков обработки на каждом шаге
+        # прогресса, поэтому ведутся без общей блокировки
+        self._task_counts = _ShardedCounter()
         
         if not self._enabled:
             logger.warning("Prometheus client not available, metrics disabled")
@@ -59,6 +132,41 @@ class MetricsCollector:
             ['stage', 'language'],
             registry=self.registry
         )
+        
+        self._metrics['active_tasks'] = Gauge(
+            'meeting_active_tasks',
+            'Number of pending and processing tasks',
+            registry=self.registry
+        )
+        
+        self._metrics['stored_tasks'] = Gauge(
+            'meeting_stored_tasks',
+            'Number of tasks kept in the task store',
+            registry=self.registry
+        )
+        
+        self.registry.register(_TaskCountsCollector(self._task_counts))
+    
+    def task_created(self, task_id: str) -> None:
+        """Учитывает создание задачи обработки"""
+        self._task_counts.increment(self.TASK_CREATED_KEY)
+    
+    def task_status_update(self, task_id: str, status: str, progress: float) -> None:
+        """Учитывает обновление статуса задачи обработки"""
+        self._task_counts.increment(status)
+    
+    def get_task_counts(self) -> Dict[str, Any]:
+        """
+        Возвращает счетчики задач
+        
+        Returns:
+            Словарь с количеством созданных задач и обновлений по статусам
+        """
+        counts = self._task_counts.snapshot()
+        return {
+            "created": counts.pop(self.TASK_CREATED_KEY, 0),
+            "status_updates": counts
+        }
     
     def is_enabled(self) -> bool:
         """Проверяет включены ли метрики"""
@@ -77,15 +185,22 @@ class MetricsCollector:
 
 # Глобальный экземпляр коллектора метрик
 _metrics_collector: Optional[MetricsCollector] = None
+_metrics_collector_lock = Lock()
 
 def get_metrics_collector() -> MetricsCollector:
     """Возвращает глобальный экземпляр коллектора метрик"""
     global _metrics_collector
     
-    if _metrics_collector is None:
-        _metrics_collector = MetricsCollector()
+    collector = _metrics_collector
+    if collector is not None:
+        return collector
     
-    return _metrics_collector
+    # Double-checked locking: без блокировки два потока могут создать
+    # по коллектору и повторно зарегистрировать метрики в REGISTRY
+    with _metrics_collector_lock:
+        if _metrics_collector is None:
+            _metrics_collector = MetricsCollector()
+        return _metrics_collector
 
 # Convenience функции
 def track_file_processed(language: str, file_type: str, status: str = 'success'):
@@ -114,4 +229,12 @@ def track_api_request(provider: str, method: str, duration: float, success: bool
 
 def track_active_tasks(count: int):
     """Отслеживает количество активных задач"""
-    pass  # Placeholder для совместимости
+    collector = get_metrics_collector()
+    if collector.is_enabled():
+        collector._metrics['active_tasks'].set(count)
+
+def track_stored_tasks(count: int):
+    """Отслеживает количество задач в хранилище"""
+    collector = get_metrics_collector()
+    if collector.is_enabled():
+        collector._metrics['stored_tasks'].set(count)
@@ -1,19 +1,24 @@
 """
 Утилиты для валидации схем JSON
 """
-import json
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Any, Union, Optional, List
+from typing import Dict, Any, Union, Optional, List, Tuple, BinaryIO, Iterator, NoReturn
+
+import orjson
+
+import jsonschema
+from jsonschema import Draft7Validator
+from jsonschema.protocols import Validator
 
 try:
-    import jsonschema
-    from jsonschema import Draft7Validator, ValidationError
+    import ijson
+    IJSON_AVAILABLE = True
 except ImportError:
-    # Установка jsonschema, если отсутствует
-    import subprocess
-    subprocess.check_call(["pip", "install", "jsonschema"])
-    import jsonschema
-    from jsonschema import Draft7Validator, ValidationError
+    ijson = None
+    IJSON_AVAILABLE = False
 
 from ..core.exceptions import ValidationError as AppValidationError
 from ..utils.logging import get_default_logger
@@ -21,10 +26,67 @@ from ..config.config import config
 
 logger = get_default_logger(__name__)
 
+# Кеш скомпилированных валидаторов. Построение валидатора (с проверкой
+# метасхемы) заметно дороже самой валидации, поэтому валидатор создается
+# один раз на схему: быстрый путь - по id объекта схемы, запасной - по хешу
+# ее канонического JSON-представления (одинаковые схемы из разных объектов)
+_VALIDATOR_CACHE: Dict[int, Tuple[Dict[str, Any], Validator]] = {}
+_SCHEMA_HASH_CACHE: Dict[str, Validator] = {}
+_VALIDATOR_CACHE_MAX_SIZE = 64
+
+# Кеш загруженных схем по (путь, mtime_ns): файл перечитывается только
+# после изменения на диске
+_SCHEMA_FILE_CACHE: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+_PROTOCOL_SCHEMA_PATH = Path(__file__).parent / "schemas" / "protocol_schema.json"
+
+def _get_validator(schema: Dict[str, Any]) -> Validator:
+    """
+    Возвращает закешированный валидатор для JSON-схемы
+    
+    Класс валидатора выбирается по ключу $schema (по умолчанию Draft 7).
+    Схема не должна изменяться после первой валидации: изменения объекта
+    не инвалидируют кеш по id.
+    
+    Args:
+        schema: JSON-схема
+        
+    Returns:
+        Скомпилированный валидатор
+        
+    Raises:
+        jsonschema.SchemaError: Если схема некорректна
+    """
+    cached = _VALIDATOR_CACHE.get(id(schema))
+    # Храним ссылку на саму схему, чтобы id не мог быть переиспользован
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    
+    key = hashlib.blake2b(
+        orjson.dumps(schema, option=orjson.OPT_SORT_KEYS, default=str)
+    ).hexdigest()
+    validator = _SCHEMA_HASH_CACHE.get(key)
+    if validator is None:
+        validator_cls = jsonschema.validators.validator_for(schema, default=Draft7Validator)
+        validator_cls.check_schema(schema)
+        # Проверка "format" конвейеру не нужна: без FormatChecker валидатор
+        # не вызывает Python-проверки форматов для каждого такого ключа
+        validator = validator_cls(schema, format_checker=None)
+        _SCHEMA_HASH_CACHE[key] = validator
+    
+    if len(_VALIDATOR_CACHE) >= _VALIDATOR_CACHE_MAX_SIZE:
+        _VALIDATOR_CACHE.clear()
+    _VALIDATOR_CACHE[id(schema)] = (schema, validator)
+    
+    return validator
+
 def load_json_schema(schema_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
     """
     Загружает JSON-схему из файла
     
+    Результат кешируется по пути и времени изменения файла; возвращаемый
+    словарь разделяется между вызовами и не должен изменяться.
+    
     Args:
         schema_path: Путь к файлу схемы (если None, используется путь из конфигурации)
         
@@ -40,62 +102,66 @@ def load_json_schema(schema_path: Optional[Union[str, Path]] = None) -> Dict[str
     else:
         schema_path = Path(schema_path)
     
-    if not schema_path.exists():
+    try:
+        cache_key = (str(schema_path), schema_path.stat().st_mtime_ns)
+    except OSError:
         error_msg = f"Schema file not found: {schema_path}"
         logger.error(error_msg)
         raise FileNotFoundError(error_msg)
     
+    schema = _SCHEMA_FILE_CACHE.get(cache_key)
+    if schema is not None:
+        return schema
+    
     try:
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema = json.load(f)
+        schema = orjson.loads(schema_path.read_bytes())
         
+        _SCHEMA_FILE_CACHE[cache_key] = schema
         logger.debug(f"Loaded JSON schema from {schema_path}")
         return schema
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         error_msg = f"Invalid JSON in schema file: {e}"
         logger.error(error_msg)
         raise ValueError(error_msg) from e
 
-def validate_json(
-    data: Union[Dict[str, Any], str, Path],
-    schema: Optional[Dict[str, Any]] = None,
-    schema_path: Optional[Union[str, Path]] = None
-) -> Dict[str, Any]:
+def _coerce_to_dict(data: Union[Dict[str, Any], str, Path]) -> Dict[str, Any]:
     """
-    Валидирует JSON-данные по схеме
+    Приводит JSON-данные (словарь, строку или путь к файлу) к словарю
     
     Args:
         data: JSON-данные (словарь, строка или путь к файлу)
-        schema: JSON-схема (если None, загружается из schema_path)
-        schema_path: Путь к файлу схемы (если None и schema None, используется путь из конфигурации)
         
     Returns:
-        Валидированные данные (всегда словарь)
+        Данные в виде словаря
         
     Raises:
-        AppValidationError: Если данные не соответствуют схеме
-        ValueError: Если data не является валидным JSON
-        FileNotFoundError: Если файл схемы или файл с данными не найден
+        ValueError: Если data не является валидным JSON или не является словарем
     """
-    # Загружаем данные, если это строка или путь
-    if isinstance(data, (str, Path)):
+    if isinstance(data, str) and data.lstrip().startswith('{'):
+        # JSON-строку разбираем сразу, не обращаясь к файловой системе
+        try:
+            data = orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            error_msg = f"Invalid JSON string: {e}"
+            logger.error(error_msg)
+            raise ValueError(error_msg) from e
+    elif isinstance(data, (str, Path)):
         data_path = Path(data)
         if data_path.exists():
             try:
-                with open(data_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = orjson.loads(data_path.read_bytes())
                 
                 logger.debug(f"Loaded JSON data from {data_path}")
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 error_msg = f"Invalid JSON in data file: {e}"
                 logger.error(error_msg)
                 raise ValueError(error_msg) from e
         else:
             # Если это не путь к файлу, пробуем распарсить как JSON-строку
             try:
-                data = json.loads(data)
-            except json.JSONDecodeError as e:
+                data = orjson.loads(str(data))
+            except orjson.JSONDecodeError as e:
                 error_msg = f"Invalid JSON string: {e}"
                 logger.error(error_msg)
                 raise ValueError(error_msg) from e
@@ -106,35 +172,195 @@ def validate_json(
         logger.error(error_msg)
         raise ValueError(error_msg)
     
+    return data
+
+def validate_json(
+    data: Union[Dict[str, Any], str, Path],
+    schema: Optional[Dict[str, Any]] = None,
+    schema_path: Optional[Union[str, Path]] = None
+) -> Dict[str, Any]:
+    """
+    Валидирует JSON-данные по схеме
+    
+    Args:
+        data: JSON-данные (словарь, строка или путь к файлу)
+        schema: JSON-схема (если None, загружается из schema_path)
+        schema_path: Путь к файлу схемы (если None и schema None, используется путь из конфигурации)
+        
+    Returns:
+        Валидированные данные (всегда словарь)
+        
+    Raises:
+        AppValidationError: Если данные не соответствуют схеме
+        ValueError: Если data не является валидным JSON
+        FileNotFoundError: Если файл схемы или файл с данными не найден
+    """
+    # Загружаем данные, если это строка или путь
+    data = _coerce_to_dict(data)
+    
     # Загружаем схему, если она не передана
     if schema is None:
         schema = load_json_schema(schema_path)
     
     # Валидируем данные
-    try:
-        jsonschema.validate(instance=data, schema=schema)
-        
+    validator = _get_validator(schema)
+    
+    # Быстрый путь: для валидных данных объекты ошибок не создаются
+    if validator.is_valid(data):
         logger.debug("JSON data passed validation")
         return data
+    
+    _raise_validation_error(jsonschema.exceptions.best_match(validator.iter_errors(data)))
+
+def _raise_validation_error(e: jsonschema.ValidationError) -> NoReturn:
+    """
+    Преобразует ошибку jsonschema в AppValidationError и выбрасывает ее
+    
+    Args:
+        e: Ошибка валидации jsonschema
         
-    except ValidationError as e:
-        error_msg = f"Validation error: {e.message}"
-        logger.error(f"{error_msg} at path: {'/'.join(str(p) for p in e.path)}")
-        
-        # Собираем информацию об ошибке
-        error_details = {
-            "message": e.message,
-            "path": '/'.join(str(p) for p in e.path) if e.path else None,
-            "schema_path": '/'.join(str(p) for p in e.schema_path) if e.schema_path else None,
-            "validator": e.validator,
-            "validator_value": e.validator_value,
+    Raises:
+        AppValidationError: Всегда
+    """
+    error_msg = f"Validation error: {e.message}"
+    # Путь нужен для лога сразу, остальные детали собираются лениво
+    path_str = '/'.join(map(str, e.path)) if e.path else None
+    logger.error(f"{error_msg} at path: {path_str or ''}")
+    
+    def build_details() -> Dict[str, Any]:
+        return {
+            "validation_error": {
+                "message": e.message,
+                "path": path_str,
+                "schema_path": '/'.join(map(str, e.schema_path)) if e.schema_path else None,
+                "validator": e.validator,
+                "validator_value": e.validator_value,
+            }
         }
+    
+    # Выбрасываем наше исключение
+    raise AppValidationError(
+        message=error_msg,
+        details_factory=build_details
+    ) from e
+
+def _iter_protocol_stream(f: BinaryIO) -> Iterator[Tuple[bool, Union[str, int], Any]]:
+    """
+    Потоково разбирает JSON-документ протокола
+    
+    Пункты массива agenda_items собираются и отдаются по одному, остальные
+    поля верхнего уровня - целиком.
+    
+    Args:
+        f: Файл с JSON-документом, открытый в бинарном режиме
         
-        # Выбрасываем наше исключение
-        raise AppValidationError(
-            message=error_msg,
-            details={"validation_error": error_details}
-        ) from e
+    Yields:
+        Кортежи (is_agenda_item, ключ поля или индекс пункта, значение)
+    """
+    builder = None
+    depth = 0
+    key: Union[str, int] = ""
+    in_agenda = False
+    index = 0
+    
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is None:
+            if prefix == "":
+                # События самого корневого объекта
+                if event == "map_key":
+                    key = value
+                elif event not in ("start_map", "end_map"):
+                    raise ValueError("Protocol data must be a JSON object")
+                continue
+            if prefix == "agenda_items" and event == "start_array":
+                in_agenda = True
+                index = 0
+                continue
+            if prefix == "agenda_items" and event == "end_array":
+                in_agenda = False
+                continue
+            builder = ijson.ObjectBuilder()
+            depth = 0
+        
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        
+        if depth == 0:
+            if in_agenda:
+                yield True, index, builder.value
+                index += 1
+            else:
+                yield False, key, builder.value
+            builder = None
+
+def validate_json_streaming(
+    path: Union[str, Path],
+    schema: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Валидирует большой JSON-файл протокола без загрузки документа целиком
+    
+    Пункты agenda_items разбираются через ijson и проверяются по одному,
+    поэтому пиковая память ограничена размером одного пункта, а не всего
+    документа. Остальные поля верхнего уровня проверяются вместе.
+    
+    Args:
+        path: Путь к JSON-файлу протокола
+        schema: JSON-схема (если None, используется схема протокола)
+        
+    Returns:
+        Количество проверенных пунктов повестки
+        
+    Raises:
+        ImportError: Если пакет ijson не установлен
+        AppValidationError: Если данные не соответствуют схеме
+        ValueError: Если файл не является валидным JSON-объектом
+        FileNotFoundError: Если файл с данными не найден
+    """
+    if not IJSON_AVAILABLE:
+        raise ImportError("ijson is required for streaming validation: pip install ijson")
+    
+    if schema is None:
+        schema = _PROTOCOL_SCHEMA if _PROTOCOL_SCHEMA is not None else load_json_schema(_PROTOCOL_SCHEMA_PATH)
+    validator = _get_validator(schema)
+    items_schema = schema.get("properties", {}).get("agenda_items", {}).get("items")
+    
+    top_level: Dict[str, Any] = {}
+    items_count = 0
+    
+    try:
+        with open(path, "rb") as f:
+            for is_agenda_item, key, value in _iter_protocol_stream(f):
+                if not is_agenda_item:
+                    top_level[key] = value
+                    continue
+                
+                items_count += 1
+                if items_schema is None:
+                    continue
+                error = jsonschema.exceptions.best_match(
+                    validator.descend(value, items_schema, path=key, schema_path="items")
+                )
+                if error is not None:
+                    error.path.appendleft("agenda_items")
+                    error.schema_path.extendleft(("agenda_items", "properties"))
+                    _raise_validation_error(error)
+    except ijson.JSONError as e:
+        error_msg = f"Invalid JSON in data file: {e}"
+        logger.error(error_msg)
+        raise ValueError(error_msg) from e
+    
+    # Массив повестки уже проверен поэлементно, остальное проверяем целиком
+    if items_count or "agenda_items" not in top_level:
+        top_level.setdefault("agenda_items", [])
+    if not validator.is_valid(top_level):
+        _raise_validation_error(jsonschema.exceptions.best_match(validator.iter_errors(top_level)))
+    
+    logger.debug(f"Streamed protocol validation passed for {path} ({items_count} agenda items)")
+    return items_count
 
 def validate_json_schema(
     data: Dict[str, Any],
@@ -150,15 +376,25 @@ def validate_json_schema(
     Returns:
         Список ошибок валидации (пустой список, если данные валидны)
     """
-    validator = Draft7Validator(schema)
+    validator = _get_validator(schema)
     errors = []
     
     for error in validator.iter_errors(data):
-        path = "/".join(str(p) for p in error.path) if error.path else "root"
+        path = "/".join(map(str, error.path)) if error.path else "root"
         errors.append(f"Error at {path}: {error.message}")
     
     return errors
 
+# Схема протокола и ее валидатор готовятся один раз при импорте, чтобы
+# validate_protocol_json не читал файл и не строил валидатор на каждый вызов
+try:
+    _PROTOCOL_SCHEMA: Optional[Dict[str, Any]] = load_json_schema(_PROTOCOL_SCHEMA_PATH)
+    _PROTOCOL_VALIDATOR: Optional[Validator] = _get_validator(_PROTOCOL_SCHEMA)
+except (FileNotFoundError, ValueError, jsonschema.SchemaError) as e:
+    logger.warning(f"Failed to preload protocol schema: {e}")
+    _PROTOCOL_SCHEMA = None
+    _PROTOCOL_VALIDATOR = None
+
 def validate_protocol_json(
     data: Union[Dict[str, Any], str, Path],
     strict: bool = False
@@ -179,17 +415,16 @@ def validate_protocol_json(
         ValueError: Если data не является валидным JSON
         FileNotFoundError: Если файл схемы или файл с данными не найден
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    # Получаем путь к схеме
-    schema_path = Path(__file__).parent / "schemas" / "protocol_schema.json"
+    # Разбираем данные один раз: словарь используется и для валидации,
+    # и для исправления структуры в нестрогом режиме
+    data = _coerce_to_dict(data)
     
     try:
         # Пытаемся валидировать данные по схеме
-        return validate_json(data, schema_path=schema_path)
+        return validate_json(data, schema=_PROTOCOL_SCHEMA, schema_path=_PROTOCOL_SCHEMA_PATH)
     except Exception as e:
-        logger.warning(f"Protocol validation error: {e}")
+        # Берем только сообщение: str(e) форматирует details ошибки валидации
+        logger.warning("Protocol validation error: %s", getattr(e, "message", e))
         
         if strict:
             # В строгом режиме просто пробрасываем исключение дальше
@@ -198,43 +433,21 @@ def validate_protocol_json(
         # В нестрогом режиме пытаемся исправить данные
         logger.info("Attempting to fix protocol data structure...")
         
-        # Преобразуем данные в словарь, если они еще не словарь
-        if isinstance(data, (str, Path)):
-            try:
-                if isinstance(data, str):
-                    if data.strip().startswith('{'): 
-                        import json
-                        data = json.loads(data)
-                    else:
-                        with open(data, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                else:  # Path
-                    with open(data, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to parse protocol data: {e}")
-                raise ValueError(f"Failed to parse protocol data: {e}") from e
-        
-        # Если это не словарь, мы не можем исправить
-        if not isinstance(data, dict):
-            logger.error("Protocol data is not a dictionary")
-            raise ValueError("Protocol data must be a dictionary")
-        
         # Исправляем структуру данных
         fixed_data = {}
         
         # Добавляем обязательные поля
-        fixed_data["metadata"] = data.get("metadata", {})
-        if not isinstance(fixed_data["metadata"], dict):
-            fixed_data["metadata"] = {}
-        
-        # Добавляем обязательные поля в метаданные
-        if "title" not in fixed_data["metadata"]:
-            fixed_data["metadata"]["title"] = "Meeting Protocol"
-        
-        if "date" not in fixed_data["metadata"]:
-            from datetime import datetime
-            fixed_data["metadata"]["date"] = datetime.now().strftime("%Y-%m-%d")
+        metadata = data.get("metadata", {})
+        if not isinstance(metadata, dict):
+            metadata = {}
+        fixed_data["metadata"] = metadata
+        
+        # Добавляем обязательные поля прямо в metadata: вызывающий код
+        # (ProtocolService) рассчитывает, что они появятся в его словаре.
+        # date.isoformat() дает тот же YYYY-MM-DD без разбора формата strftime
+        metadata.setdefault("title", "Meeting Protocol")
+        if "date" not in metadata:
+            metadata["date"] = date.today().isoformat()
         
         # Добавляем остальные поля
         fixed_data["summary"] = data.get("summary", "")
@@ -244,12 +457,7 @@ def validate_protocol_json(
         fixed_data["action_items"] = data.get("action_items", data.get("actions", []))
         
         # Добавляем время создания
-        if "created_at" not in fixed_data:
-            from datetime import datetime
-            fixed_data["created_at"] = datetime.now().isoformat()
-        elif hasattr(fixed_data["created_at"], 'isoformat'):
-            # Если это datetime объект, конвертируем в строку
-            fixed_data["created_at"] = fixed_data["created_at"].isoformat()
+        fixed_data["created_at"] = datetime.now().isoformat()
         
         logger.info("Protocol data structure fixed successfully")
         return fixed_data
@@ -279,23 +487,22 @@ def convert_to_egl_format(data: Dict[str, Any]) -> Dict[str, Any]:
             raise ValueError("Missing 'agenda_items' field")
         
         # Собираем meta
+        metadata = data["metadata"]
         meta = {
-            "titel": data["metadata"].get("title", "Protokoll"),
-            "datum": data["metadata"].get("date", ""),
-            "ort": data["metadata"].get("location", ""),
-            "sitzungsleiter": data["metadata"].get("organizer", ""),
-            "verfasser": data["metadata"].get("author", "AI Assistant"),
+            "titel": metadata.get("title", "Protokoll"),
+            "datum": metadata.get("date", ""),
+            "ort": metadata.get("location", ""),
+            "sitzungsleiter": metadata.get("organizer", ""),
+            "verfasser": metadata.get("author", "AI Assistant"),
         }
         
-        # Собираем teilnehmer
+        # Собираем teilnehmer за один проход, с локальными ссылками на append
         anwesend = []
         entschuldigt = []
+        add_anwesend, add_entschuldigt = anwesend.append, entschuldigt.append
         
         for participant in data["participants"]:
-            if participant.get("present", True):
-                anwesend.append(participant["name"])
-            else:
-                entschuldigt.append(participant["name"])
+            (add_anwesend if participant.get("present", True) else add_entschuldigt)(participant["name"])
         
         teilnehmer = {
             "anwesend": anwesend,
@@ -303,38 +510,30 @@ def convert_to_egl_format(data: Dict[str, Any]) -> Dict[str, Any]:
         }
         
         # Собираем traktanden
-        traktanden = []
-        
-        for i, item in enumerate(data["agenda_items"]):
-            traktand = {
+        traktanden = [
+            {
                 "id": item.get("id") or f"T{i+1:03d}",
                 "titel": item["topic"],
                 "diskussion": item.get("discussion_summary", ""),
-                "entscheidungen": [],
-                "pendenzen": [],
-            }
-            
-            # Добавляем entscheidungen
-            for decision in item.get("decisions_made", []):
-                if isinstance(decision, dict):
-                    traktand["entscheidungen"].append(decision.get("description", ""))
-                else:
-                    traktand["entscheidungen"].append(str(decision))
-            
-            # Добавляем pendenzen
-            for action in item.get("action_items_assigned", []):
-                if isinstance(action, dict):
-                    pendenz = {
+                "entscheidungen": [
+                    decision.get("description", "") if isinstance(decision, dict) else str(decision)
+                    for decision in item.get("decisions_made", ())
+                ],
+                "pendenzen": [
+                    {
                         "wer": action.get("who", ""),
                         "was": action.get("what", ""),
                         "frist": action.get("due", None),
                     }
-                    traktand["pendenzen"].append(pendenz)
-            
-            traktanden.append(traktand)
+                    for action in item.get("action_items_assigned", ())
+                    if isinstance(action, dict)
+                ],
+            }
+            for i, item in enumerate(data["agenda_items"])
+        ]
         
         # Собираем анханг
-        anhänge = data["metadata"].get("attachments", [])
+        anhänge = metadata.get("attachments", [])
         
         # Собираем финальный результат
         result = {
@@ -353,6 +552,30 @@ def convert_to_egl_format(data: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError(error_msg) from e
 
 
+# Синонимы ключей протокола (английские и немецкие варианты) в порядке
+# приоритета для fix_protocol_data
+_PROTOCOL_FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "metadata": ("metadata", "meta"),
+    "summary": ("summary", "zusammenfassung", "overall_summary"),
+    "decisions": ("decisions", "entscheidungen"),
+    "action_items": ("action_items", "pendenzen", "actions"),
+}
+
+@dataclass(slots=True)
+class _ProtocolSkeleton:
+    """Каркас исправленного протокола со значениями по умолчанию"""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    summary: Any = "No summary available"
+    participants: List[Any] = field(default_factory=list)
+    agenda_items: List[Any] = field(default_factory=list)
+    decisions: List[Any] = field(default_factory=list)
+    action_items: List[Any] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразует каркас в словарь без копирования вложенных данных"""
+        # dataclasses.asdict рекурсивно копирует значения, здесь это не нужно
+        return {name: getattr(self, name) for name in self.__slots__}
+
 def fix_protocol_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Пытается исправить структуру данных протокола для соответствия схеме
@@ -366,41 +589,25 @@ def fix_protocol_data(data: Dict[str, Any]) -> Dict[str, Any]:
     try:
         logger.info("Attempting to fix protocol data structure...")
         
-        # Создаем базовую структуру
-        fixed_data = {
-            "metadata": {},
-            "summary": "",
-            "participants": [],
-            "agenda_items": [],
-            "decisions": [],
-            "action_items": []
-        }
+        # Создаем базовую структуру со значениями по умолчанию
+        fixed_data = _ProtocolSkeleton()
         
-        # Исправляем метаданные
-        if "metadata" in data:
-            fixed_data["metadata"] = data["metadata"]
-        elif "meta" in data:
-            fixed_data["metadata"] = data["meta"]
-        
-        # Убеждаемся что обязательные поля метаданных присутствуют
-        if "title" not in fixed_data["metadata"]:
-            fixed_data["metadata"]["title"] = data.get("title", "Meeting Protocol")
-        if "date" not in fixed_data["metadata"]:
-            fixed_data["metadata"]["date"] = data.get("date", "Unknown Date")
-            
-        # Исправляем summary
-        if "summary" in data:
-            fixed_data["summary"] = data["summary"]
-        elif "zusammenfassung" in data:
-            fixed_data["summary"] = data["zusammenfassung"]
-        elif "overall_summary" in data:
-            fixed_data["summary"] = data["overall_summary"]
-        else:
-            fixed_data["summary"] = "No summary available"
+        # Переносим поля, у которых отличаются только имена ключей: берется
+        # первый найденный синоним, иначе остается значение по умолчанию
+        for target, sources in _PROTOCOL_FIELD_ALIASES.items():
+            setattr(fixed_data, target, next((data[source] for source in sources if source in data), getattr(fixed_data, target)))
+        
+        # Убеждаемся что обязательные поля метаданных присутствуют: значения
+        # по умолчанию перекрываются существующими ключами одним слиянием
+        fixed_data.metadata = {
+            "title": data.get("title", "Meeting Protocol"),
+            "date": data.get("date", "Unknown Date"),
+            **fixed_data.metadata
+        }
             
         # Исправляем участников
         if "participants" in data:
-            fixed_data["participants"] = data["participants"]
+            fixed_data.participants = data["participants"]
         elif "teilnehmer" in data:
             # Преобразуем немецкий формат
             if isinstance(data["teilnehmer"], dict):
@@ -417,11 +624,11 @@ def fix_protocol_data(data: Dict[str, Any]) -> Dict[str, Any]:
                     elif isinstance(person, dict):
                         participants.append({**person, "status": "absent"})
                         
-                fixed_data["participants"] = participants
+                fixed_data.participants = participants
         
         # Исправляем пункты повестки
         if "agenda_items" in data:
-            fixed_data["agenda_items"] = data["agenda_items"]
+            fixed_data.agenda_items = data["agenda_items"]
         elif "traktanden" in data:
             agenda_items = []
             for item in data["traktanden"]:
@@ -432,24 +639,10 @@ def fix_protocol_data(data: Dict[str, Any]) -> Dict[str, Any]:
                     "action_items": item.get("pendenzen", [])
                 }
                 agenda_items.append(agenda_item)
-            fixed_data["agenda_items"] = agenda_items
-            
-        # Исправляем решения
-        if "decisions" in data:
-            fixed_data["decisions"] = data["decisions"]
-        elif "entscheidungen" in data:
-            fixed_data["decisions"] = data["entscheidungen"]
-            
-        # Исправляем задачи
-        if "action_items" in data:
-            fixed_data["action_items"] = data["action_items"]
-        elif "pendenzen" in data:
-            fixed_data["action_items"] = data["pendenzen"]
-        elif "actions" in data:
-            fixed_data["action_items"] = data["actions"]
+            fixed_data.agenda_items = agenda_items
             
         logger.info("Protocol data structure fixed successfully")
-        return fixed_data
+        return fixed_data.to_dict()
         
     except Exception as e:
         logger.error(f"Failed to fix protocol data: {e}")
@@ -2,21 +2,209 @@
 Улучшенные утилиты для интеллектуального разбиения текста
 """
 import re
-from typing import List, Dict, Any, Optional, Union, Tuple
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import List, Dict, Any, DefaultDict, Iterator, Optional, Pattern, Union, Tuple
+
+import orjson
+import tiktoken
+
+try:
+    from semantic_text_splitter import TextSplitter
+    SEMANTIC_SPLITTER_AVAILABLE = True
+except ImportError:
+    TextSplitter = None
+    SEMANTIC_SPLITTER_AVAILABLE = False
 
 try:
-    import tiktoken
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
 except ImportError:
-    # Установка tiktoken, если отсутствует
-    import subprocess
-    subprocess.check_call(["pip", "install", "tiktoken"])
-    import tiktoken
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    from datasketch import MinHash, MinHashLSH
+    DATASKETCH_AVAILABLE = True
+except ImportError:
+    MinHash = MinHashLSH = None
+    DATASKETCH_AVAILABLE = False
+
+try:
+    from rapidfuzz import fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    fuzz = None
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import pysbd
+    PYSBD_AVAILABLE = True
+except ImportError:
+    pysbd = None
+    PYSBD_AVAILABLE = False
 
 from ..utils.logging import get_default_logger
 from ..config.config import config
 
 logger = get_default_logger(__name__)
 
+# Регулярные выражения для разбиения текста
+_PARA_RE = re.compile(r'\n\s*\n')
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+_SUBSENT_RE = re.compile(r'(?<=[,;:])\s+')
+
+# Регулярные выражения для классификации сегментов транскрипции
+_CLASSIFIER_PATTERN_SOURCES = {
+    "introduction": [
+        r"\b(?:welcome|good\s+(?:morning|afternoon|evening)|(?:let['’]s\s+)?start|begin|introduction|introduce|opening|hello|hi everyone)\b",
+        r"\btoday\s+(?:we|I|(?:we['’]re|I['’]m)\s+going\s+to)\b",
+        r'\bagenda\s+(?:for\s+today|is|includes)\b',
+        r'\bmeeting\s+(?:objective|purpose|goal)\b'
+    ],
+    "discussion": [
+        r'\b(?:discuss|discussed|discussing|discussion|talk|talked|talking|review|reviewed|reviewing|analyze|analyzed|analyzing|consider|considered|considering|examine|examined|examining)\b',
+        r'\b(?:point|topic|subject|issue|concern|matter|question)\b',
+        r'\b(?:what\s+about|how\s+about|regarding)\b'
+    ],
+    "decision": [
+        r'\b(?:decide|decided|decision|agree|agreed|agreement|consensus|vote|voted|approve|approved|approval|resolve|resolved|resolution)\b',
+        r'\b(?:we\s+(?:have|will|should|must|need\s+to)|it\s+was\s+(?:decided|agreed|determined))\b',
+        r'\b(?:(?:will|shall|should|must|going\s+to)\s+(?:be|proceed|continue|start|stop|implement|adopt))\b'
+    ],
+    "action": [
+        r'\b(?:action|task|todo|to\s+do|assign|assigned|responsibility|responsible|accountable|owner|take\s+care|follow\s+up)\b',
+        r'\b(?:(?:will|shall|must|need\s+to)\s+(?:do|prepare|create|send|write|contact|call|email|report|update))\b',
+        r'\b(?:by\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|next\s+week|next\s+month|end\s+of|deadline))\b',
+        r'\b(?:due\s+(?:date|by|on))\b'
+    ],
+    "conclusion": [
+        r'\b(?:conclude|concluded|conclusion|summary|summarize|summarized|wrap|wrap\s+up|end|finish|thank|thanks|closing)\b',
+        r'\b(?:next\s+(?:meeting|session|time))\b',
+        r'\b(?:any\s+(?:other|final|last)\s+(?:business|questions|comments|thoughts|remarks))\b',
+        r'\b(?:see\s+you\s+(?:next|all|then|soon|later|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b'
+    ]
+}
+
+# Модели tiktoken, через которые semantic-text-splitter получает нужную кодировку
+_ENCODING_MODELS = {
+    "cl100k_base": "gpt-4",
+    "o200k_base": "gpt-4o",
+    "p50k_base": "text-davinci-003",
+    "r50k_base": "davinci",
+}
+
+# Шаблоны каждой категории объединяются в одну альтернацию и компилируются
+# один раз, поэтому сегмент просматривается один раз на категорию
+_CLASSIFIER_PATTERNS = {
+    category: re.compile("|".join(f"(?:{pattern})" for pattern in pattern_list), re.IGNORECASE)
+    for category, pattern_list in _CLASSIFIER_PATTERN_SOURCES.items()
+}
+
+# Порядок категорий задает идентификаторы шаблонов в базе Hyperscan
+_CLASSIFIER_CATEGORIES = list(_CLASSIFIER_PATTERN_SOURCES)
+
+@lru_cache(maxsize=1)
+def _get_hyperscan_classifier() -> Optional["hyperscan.Database"]:
+    """
+    Компилирует шаблоны классификатора в базу Hyperscan один раз
+    
+    Returns:
+        База Hyperscan или None, если пакет не установлен или компиляция не удалась
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
+    
+    expressions, ids, flags = [], [], []
+    pattern_flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8
+    for category_id, category in enumerate(_CLASSIFIER_CATEGORIES):
+        for pattern in _CLASSIFIER_PATTERN_SOURCES[category]:
+            expressions.append(pattern.encode("utf-8"))
+            ids.append(category_id)
+            flags.append(pattern_flags)
+    
+    try:
+        database = hyperscan.Database()
+        database.compile(expressions=expressions, ids=ids, elements=len(expressions), flags=flags)
+        return database
+    except Exception as e:
+        logger.warning(f"Failed to compile Hyperscan classifier, using regex classifier: {e}")
+        return None
+
+def _hyperscan_categories(database: "hyperscan.Database", text: str) -> set:
+    """
+    Возвращает идентификаторы всех категорий, шаблоны которых нашлись в тексте
+    
+    Args:
+        database: База Hyperscan с шаблонами классификатора
+        text: Текст сегмента
+        
+    Returns:
+        Множество индексов категорий из _CLASSIFIER_CATEGORIES
+    """
+    matched = set()
+    
+    def on_match(category_id, start, end, flags, context):
+        matched.add(category_id)
+    
+    database.scan(text.encode("utf-8"), match_event_handler=on_match)
+    return matched
+
+@lru_cache(maxsize=8)
+def _get_encoding(encoding_name: str) -> "tiktoken.Encoding":
+    """
+    Возвращает кодировку tiktoken, создавая ее один раз на имя
+    
+    Args:
+        encoding_name: Имя кодировки для tiktoken
+        
+    Returns:
+        Объект кодировки tiktoken
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+@lru_cache(maxsize=8)
+def _get_sentence_segmenter(language: str) -> Optional["pysbd.Segmenter"]:
+    """
+    Возвращает сегментатор предложений PySBD для языка, создавая его один раз
+    
+    Args:
+        language: Код языка (en, de, ru, ...)
+        
+    Returns:
+        Сегментатор или None, если PySBD не установлен или язык не поддерживается
+    """
+    if not PYSBD_AVAILABLE:
+        return None
+    try:
+        return pysbd.Segmenter(language=language, clean=False)
+    except ValueError:
+        logger.debug(f"PySBD does not support language '{language}', using regex sentence split")
+        return None
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Разбивает текст на предложения
+    
+    PySBD корректно обрабатывает сокращения ("Dr.", "z.B.") и используется
+    для языка из конфигурации, если он установлен и включен настройкой
+    use_pysbd; иначе текст режется регулярным выражением по знакам конца
+    предложения.
+    
+    Args:
+        text: Текст для разбиения
+        
+    Returns:
+        Список предложений
+    """
+    segmenter = _get_sentence_segmenter(config.default_lang or "en") if config.use_pysbd else None
+    if segmenter is None:
+        return _SENT_RE.split(text)
+    
+    sentences = [sentence.strip() for sentence in segmenter.segment(text)]
+    return [sentence for sentence in sentences if sentence] or [text]
+
 def smart_split_text(
     text: str,
     chunk_tokens: int = None,
@@ -28,6 +216,9 @@ def smart_split_text(
     """
     Интеллектуально разбивает текст на чанки с учетом смысловых границ
     
+    Если установлен semantic-text-splitter, в режиме по умолчанию (абзацы и
+    предложения) разбиение выполняется в нативном коде за один проход.
+    
     Args:
         text: Текст для разбиения
         chunk_tokens: Максимальное количество токенов в чанке
@@ -41,6 +232,38 @@ def smart_split_text(
     Returns:
         Список чанков текста с учетом смысловых границ
     """
+    return list(smart_split_text_iter(
+        text, chunk_tokens, overlap_tokens, encoding_name, respect_paragraphs, respect_sentences
+    ))
+
+def smart_split_text_iter(
+    text: str,
+    chunk_tokens: int = None,
+    overlap_tokens: int = None,
+    encoding_name: str = "cl100k_base",
+    respect_paragraphs: bool = True,
+    respect_sentences: bool = True
+) -> Iterator[str]:
+    """
+    Разбивает текст на чанки так же, как smart_split_text, но отдает их по одному
+    
+    Позволяет обрабатывать чанки по мере готовности, не держа в памяти весь
+    список. Если ошибка возникла до выдачи первого чанка, выполняется базовое
+    разбиение; ошибка после этого пробрасывается вызывающему коду.
+    
+    Args:
+        text: Текст для разбиения
+        chunk_tokens: Максимальное количество токенов в чанке
+                     (если None, берется из конфигурации)
+        overlap_tokens: Количество токенов перекрытия между чанками
+                       (если None, берется из конфигурации)
+        encoding_name: Имя кодировки для tiktoken
+        respect_paragraphs: Учитывать ли границы параграфов при разбиении
+        respect_sentences: Учитывать ли границы предложений при разбиении
+        
+    Yields:
+        Чанки текста с учетом смысловых границ
+    """
     if chunk_tokens is None:
         chunk_tokens = config.chunk_tokens
     
@@ -55,160 +278,245 @@ def smart_split_text(
         )
         overlap_tokens = 0
     
-    # Если текст пустой, возвращаем пустой список
+    # Если текст пустой, чанков нет
     if not text:
-        return []
+        return
     
+    # Нативный сплиттер сам соблюдает границы абзацев и предложений,
+    # поэтому используем его только в режиме по умолчанию. Его границы
+    # чанков отличаются от встроенного разбиения, поэтому он включается
+    # явно настройкой use_semantic_splitter
+    if (
+        config.use_semantic_splitter and SEMANTIC_SPLITTER_AVAILABLE
+        and respect_paragraphs and respect_sentences
+    ):
+        try:
+            splitter = _get_semantic_splitter(encoding_name, chunk_tokens, overlap_tokens)
+            chunks = splitter.chunks(text) if splitter is not None else None
+        except Exception as e:
+            logger.warning(f"semantic-text-splitter failed, using built-in splitter: {e}")
+            chunks = None
+        
+        if chunks is not None:
+            logger.debug(f"Split text into {len(chunks)} chunks using semantic-text-splitter")
+            yield from chunks
+            return
+    
+    chunks_count = 0
     try:
-        # Получаем кодировку
-        encoding = tiktoken.get_encoding(encoding_name)
+        for chunk in _iter_slow_smart_split(
+            text, chunk_tokens, overlap_tokens, encoding_name, respect_paragraphs, respect_sentences
+        ):
+            chunks_count += 1
+            yield chunk
+    except Exception as e:
+        logger.error(f"Error in smart_split_text: {e}", exc_info=True)
+        if chunks_count:
+            # Часть чанков уже отдана, поэтому подменить результат нельзя
+            raise
         
-        # Разбиваем текст на параграфы и предложения, если это требуется
-        if respect_paragraphs:
-            # Разбиваем на параграфы (несколько пустых строк или \n\n)
-            paragraphs = re.split(r'\n\s*\n', text)
-            
-            # Если абзацы большие, можно разбить их на предложения
-            if respect_sentences:
-                segments = []
-                for paragraph in paragraphs:
-                    # Разбиваем абзац на предложения
-                    # Учитываем различные окончания предложений (., !, ?, ...)
-                    sentences = re.split(r'(?<=[.!?])\s+', paragraph)
-                    segments.extend(sentences)
-            else:
-                segments = paragraphs
-        elif respect_sentences:
-            # Разбиваем только на предложения
-            segments = re.split(r'(?<=[.!?])\s+', text)
-        else:
-            # Если не учитываем ни параграфы, ни предложения, используем весь текст
-            segments = [text]
+        # Если произошла ошибка, возвращаемся к базовому разбиению
+        logger.warning("Falling back to basic text chunking")
         
-        # Токенизируем каждый сегмент
-        segment_tokens = [(segment, encoding.encode(segment)) for segment in segments]
+        from ..utils.text import split_text_into_chunks
+        yield from split_text_into_chunks(text, chunk_tokens, overlap_tokens, encoding_name)
+        return
+    
+    logger.debug(f"Split text into {chunks_count} chunks using smart split")
+
+@lru_cache(maxsize=16)
+def _get_semantic_splitter(
+    encoding_name: str,
+    chunk_tokens: int,
+    overlap_tokens: int
+) -> Optional["TextSplitter"]:
+    """
+    Возвращает закешированный нативный сплиттер для заданных параметров
+    
+    Args:
+        encoding_name: Имя кодировки для tiktoken
+        chunk_tokens: Максимальное количество токенов в чанке
+        overlap_tokens: Количество токенов перекрытия между чанками
         
-        # Разбиваем на чанки с учетом токенов
-        chunks = []
-        current_chunk_text = []
-        current_chunk_tokens = []
-        current_token_count = 0
+    Returns:
+        Объект TextSplitter или None, если для кодировки нет модели tiktoken
+    """
+    model = _ENCODING_MODELS.get(encoding_name)
+    if model is None:
+        return None
+    return TextSplitter.from_tiktoken_model(model, chunk_tokens, overlap=overlap_tokens)
+
+def _iter_slow_smart_split(
+    text: str,
+    chunk_tokens: int,
+    overlap_tokens: int,
+    encoding_name: str,
+    respect_paragraphs: bool,
+    respect_sentences: bool
+) -> Iterator[str]:
+    """
+    Разбивает текст на чанки средствами Python (см. smart_split_text)
+    
+    Используется, когда semantic-text-splitter не установлен или выбран
+    режим, который он не поддерживает.
+    
+    Yields:
+        Чанки текста с учетом смысловых границ
+    """
+    # Получаем кодировку
+    encoding = _get_encoding(encoding_name)
+    
+    # Разбиваем текст на параграфы и предложения, если это требуется
+    if respect_paragraphs:
+        # Разбиваем на параграфы (несколько пустых строк или \n\n)
+        paragraphs = _PARA_RE.split(text)
+        
+        # Если абзацы большие, можно разбить их на предложения
+        if respect_sentences:
+            segments = []
+            for paragraph in paragraphs:
+                # Разбиваем абзац на предложения
+                # Учитываем различные окончания предложений (., !, ?, ...)
+                sentences = _split_sentences(paragraph)
+                segments.extend(sentences)
+        else:
+            segments = paragraphs
+    elif respect_sentences:
+        # Разбиваем только на предложения
+        segments = _split_sentences(text)
+    else:
+        # Если не учитываем ни параграфы, ни предложения, используем весь текст
+        segments = [text]
+    
+    # Токенизируем все сегменты одним пакетным вызовом: в тексте совещаний
+    # нет спецтокенов, поэтому используем encode_ordinary_batch
+    segment_tokens = zip(segments, encoding.encode_ordinary_batch(segments))
+    
+    # Разбиваем на чанки с учетом токенов
+    # Текущий чанк хранится как список пар (текст сегмента, токены сегмента);
+    # текст склеивается только один раз, когда чанк готов
+    current_chunk: List[Tuple[str, List[int]]] = []
+    current_token_count = 0
+    
+    for segment_text, segment_token_ids in segment_tokens:
+        segment_token_count = len(segment_token_ids)
         
-        for segment_text, segment_token_ids in segment_tokens:
-            segment_token_count = len(segment_token_ids)
+        # Если текущий сегмент один больше, чем размер чанка, разбиваем его на более мелкие части
+        if segment_token_count > chunk_tokens:
+            # Если есть уже накопленные сегменты, сохраняем их как чанк
+            if current_chunk:
+                yield " ".join([text for text, _ in current_chunk])
+                current_chunk = []
+                current_token_count = 0
             
-            # Если текущий сегмент один больше, чем размер чанка, разбиваем его на более мелкие части
-            if segment_token_count > chunk_tokens:
-                # Если есть уже накопленные сегменты, сохраняем их как чанк
-                if current_chunk_text:
-                    chunks.append(" ".join(current_chunk_text))
-                    current_chunk_text = []
-                    current_chunk_tokens = []
-                    current_token_count = 0
-                
-                # Разбиваем большой сегмент на части по маркерам пунктуации или просто по количеству токенов
-                if respect_sentences:
-                    # Пытаемся разбить по запятым, точкам с запятой и т.д.
-                    subsegments = re.split(r'(?<=[,;:])\s+', segment_text)
-                    
-                    # Если все еще слишком большие, просто разбиваем по токенам
-                    if any(len(encoding.encode(ss)) > chunk_tokens for ss in subsegments):
-                        # Просто разбиваем по токенам
-                        for i in range(0, segment_token_count, chunk_tokens - overlap_tokens):
-                            end_idx = min(i + chunk_tokens, segment_token_count)
-                            subsegment_tokens = segment_token_ids[i:end_idx]
-                            subsegment_text = encoding.decode(subsegment_tokens)
-                            chunks.append(subsegment_text)
-                    else:
-                        # Используем разбиение по пунктуации
-                        subsegment_chunk_text = []
-                        subsegment_token_count = 0
-                        
-                        for subsegment in subsegments:
-                            subsegment_tokens = encoding.encode(subsegment)
-                            subsegment_token_len = len(subsegment_tokens)
-                            
-                            if subsegment_token_count + subsegment_token_len <= chunk_tokens:
-                                subsegment_chunk_text.append(subsegment)
-                                subsegment_token_count += subsegment_token_len
-                            else:
-                                # Сохраняем текущий под-чанк
-                                if subsegment_chunk_text:
-                                    chunks.append(" ".join(subsegment_chunk_text))
-                                
-                                # Начинаем новый под-чанк
-                                subsegment_chunk_text = [subsegment]
-                                subsegment_token_count = subsegment_token_len
-                        
-                        # Добавляем последний под-чанк, если он есть
-                        if subsegment_chunk_text:
-                            chunks.append(" ".join(subsegment_chunk_text))
+            # Разбиваем большой сегмент на части по маркерам пунктуации или просто по количеству токенов
+            if respect_sentences:
+                # Пытаемся разбить по запятым, точкам с запятой и т.д.
+                subsegments = _SUBSENT_RE.split(segment_text)
+                if len(subsegments) == 1:
+                    # Разделителей нет: подсегмент совпадает с сегментом, его токены
+                    # уже известны и заведомо не помещаются в чанк
+                    subsegments_tokens = [segment_token_ids]
                 else:
+                    subsegments_tokens = encoding.encode_ordinary_batch(subsegments)
+                subsegments_lens = [len(tokens) for tokens in subsegments_tokens]
+                
+                # Если все еще слишком большие, просто разбиваем по токенам
+                if max(subsegments_lens) > chunk_tokens:
                     # Просто разбиваем по токенам
                     for i in range(0, segment_token_count, chunk_tokens - overlap_tokens):
                         end_idx = min(i + chunk_tokens, segment_token_count)
                         subsegment_tokens = segment_token_ids[i:end_idx]
                         subsegment_text = encoding.decode(subsegment_tokens)
-                        chunks.append(subsegment_text)
-            
-            # Если добавление текущего сегмента превысит размер чанка, сохраняем текущий чанк и начинаем новый
-            elif current_token_count + segment_token_count > chunk_tokens:
-                chunks.append(" ".join(current_chunk_text))
-                
-                # Начинаем новый чанк с учетом перекрытия
-                if overlap_tokens > 0 and current_chunk_tokens:
-                    # Определяем, сколько последних токенов нужно включить в перекрытие
-                    overlap_start = max(0, len(current_chunk_tokens) - overlap_tokens)
-                    overlap_tokens_ids = []
-                    
-                    # Собираем токены для перекрытия
-                    for i in range(overlap_start, len(current_chunk_tokens)):
-                        overlap_tokens_ids.extend(current_chunk_tokens[i])
-                    
-                    # Декодируем токены перекрытия в текст
-                    overlap_text = encoding.decode(overlap_tokens_ids)
+                        yield subsegment_text
+                else:
+                    # Используем разбиение по пунктуации
+                    subsegment_chunk_text = []
+                    subsegment_token_count = 0
                     
-                    # Разбиваем текст перекрытия на предложения или параграфы
-                    if respect_sentences:
-                        overlap_segments = re.split(r'(?<=[.!?])\s+', overlap_text)
-                    elif respect_paragraphs:
-                        overlap_segments = re.split(r'\n\s*\n', overlap_text)
-                    else:
-                        overlap_segments = [overlap_text]
+                    for subsegment, subsegment_token_len in zip(subsegments, subsegments_lens):
+                        if subsegment_token_count + subsegment_token_len <= chunk_tokens:
+                            subsegment_chunk_text.append(subsegment)
+                            subsegment_token_count += subsegment_token_len
+                        else:
+                            # Сохраняем текущий под-чанк
+                            if subsegment_chunk_text:
+                                yield " ".join(subsegment_chunk_text)
+                            
+                            # Начинаем новый под-чанк
+                            subsegment_chunk_text = [subsegment]
+                            subsegment_token_count = subsegment_token_len
                     
-                    # Инициализируем новый чанк с текстом перекрытия
-                    current_chunk_text = overlap_segments
-                    current_chunk_tokens = [encoding.encode(seg) for seg in overlap_segments]
-                    current_token_count = sum(len(tokens) for tokens in current_chunk_tokens)
-                else:
-                    current_chunk_text = []
-                    current_chunk_tokens = []
-                    current_token_count = 0
-                
-                # Добавляем текущий сегмент в новый чанк
-                current_chunk_text.append(segment_text)
-                current_chunk_tokens.append(segment_token_ids)
-                current_token_count += segment_token_count
+                    # Добавляем последний под-чанк, если он есть
+                    if subsegment_chunk_text:
+                        yield " ".join(subsegment_chunk_text)
             else:
-                # Добавляем текущий сегмент к текущему чанку
-                current_chunk_text.append(segment_text)
-                current_chunk_tokens.append(segment_token_ids)
-                current_token_count += segment_token_count
-        
-        # Добавляем последний чанк, если он не пустой
-        if current_chunk_text:
-            chunks.append(" ".join(current_chunk_text))
-        
-        logger.debug(f"Split text into {len(chunks)} chunks using smart split")
-        return chunks
+                # Просто разбиваем по токенам
+                for i in range(0, segment_token_count, chunk_tokens - overlap_tokens):
+                    end_idx = min(i + chunk_tokens, segment_token_count)
+                    subsegment_tokens = segment_token_ids[i:end_idx]
+                    subsegment_text = encoding.decode(subsegment_tokens)
+                    yield subsegment_text
         
-    except Exception as e:
-        logger.error(f"Error in smart_split_text: {e}", exc_info=True)
-        # Если произошла ошибка, возвращаемся к базовому разбиению
-        logger.warning("Falling back to basic text chunking")
+        # Если добавление текущего сегмента превысит размер чанка, сохраняем текущий чанк и начинаем новый
+        elif current_token_count + segment_token_count > chunk_tokens:
+            yield " ".join([text for text, _ in current_chunk])
+            
+            # Начинаем новый чанк с учетом перекрытия
+            if overlap_tokens > 0 and current_chunk:
+                # Перекрытие - последние сегменты чанка, суммарно дающие не меньше
+                # overlap_tokens токенов (но так, чтобы вместе с новым сегментом
+                # чанк не превысил chunk_tokens). Их тексты и токены уже известны,
+                # поэтому ничего не нужно декодировать и кодировать заново
+                overlap_start = len(current_chunk)
+                current_token_count = 0
+                while overlap_start > 0 and current_token_count < overlap_tokens:
+                    overlap_segment_len = len(current_chunk[overlap_start - 1][1])
+                    if current_token_count + overlap_segment_len + segment_token_count > chunk_tokens:
+                        break
+                    overlap_start -= 1
+                    current_token_count += overlap_segment_len
+                current_chunk = current_chunk[overlap_start:]
+            else:
+                current_chunk = []
+                current_token_count = 0
+            
+            # Добавляем текущий сегмент в новый чанк
+            current_chunk.append((segment_text, segment_token_ids))
+            current_token_count += segment_token_count
+        else:
+            # Добавляем текущий сегмент к текущему чанку
+            current_chunk.append((segment_text, segment_token_ids))
+            current_token_count += segment_token_count
+    
+    # Добавляем последний чанк, если он не пустой
+    if current_chunk:
+        yield " ".join([text for text, _ in current_chunk])
+
+@lru_cache(maxsize=16)
+def _get_fused_classifier(classification_types: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    """
+    Собирает шаблоны категорий в одно регулярное выражение с именованными группами
+    
+    Каждая категория оформлена как опережающая проверка от начала текста,
+    а альтернативы перебираются по порядку, поэтому при нескольких
+    подходящих категориях побеждает первая из classification_types - так же,
+    как при поочередной проверке категорий.
+    
+    Args:
+        classification_types: Категории в порядке приоритета
         
-        from ..utils.text import split_text_into_chunks
-        return split_text_into_chunks(text, chunk_tokens, overlap_tokens, encoding_name)
+    Returns:
+        Скомпилированное выражение или None, если ни для одной категории нет шаблонов
+    """
+    alternatives = [
+        f"(?=.*?(?P<{category}>{_CLASSIFIER_PATTERNS[category].pattern}))"
+        for category in dict.fromkeys(classification_types)
+        if category in _CLASSIFIER_PATTERNS
+    ]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives), re.IGNORECASE | re.DOTALL)
 
 def classify_transcript_segments(
     segments: List[Dict[str, Any]],
@@ -232,204 +540,317 @@ def classify_transcript_segments(
     classified_segments = {classification_type: [] for classification_type in classification_types}
     classified_segments["other"] = []  # Для сегментов, которые не попали ни в одну категорию
     
-    # Регулярные выражения для классификации
-    patterns = {
-        "introduction": [
-            r'\b(?:welcome|good\s+(?:morning|afternoon|evening)|(?:let[''']s\s+)?start|begin|introduction|introduce|opening|hello|hi everyone)\b',
-            r'\btoday\s+(?:we|I|(?:we[''']re|I[''']m)\s+going\s+to)\b',
-            r'\bagenda\s+(?:for\s+today|is|includes)\b',
-            r'\bmeeting\s+(?:objective|purpose|goal)\b'
-        ],
-        "discussion": [
-            r'\b(?:discuss|discussed|discussing|discussion|talk|talked|talking|review|reviewed|reviewing|analyze|analyzed|analyzing|consider|considered|considering|examine|examined|examining)\b',
-            r'\b(?:point|topic|subject|issue|concern|matter|question)\b',
-            r'\b(?:what\s+about|how\s+about|regarding)\b'
-        ],
-        "decision": [
-            r'\b(?:decide|decided|decision|agree|agreed|agreement|consensus|vote|voted|approve|approved|approval|resolve|resolved|resolution)\b',
-            r'\b(?:we\s+(?:have|will|should|must|need\s+to)|it\s+was\s+(?:decided|agreed|determined))\b',
-            r'\b(?:(?:will|shall|should|must|going\s+to)\s+(?:be|proceed|continue|start|stop|implement|adopt))\b'
-        ],
-        "action": [
-            r'\b(?:action|task|todo|to\s+do|assign|assigned|responsibility|responsible|accountable|owner|take\s+care|follow\s+up)\b',
-            r'\b(?:(?:will|shall|must|need\s+to)\s+(?:do|prepare|create|send|write|contact|call|email|report|update))\b',
-            r'\b(?:by\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|next\s+week|next\s+month|end\s+of|deadline))\b',
-            r'\b(?:due\s+(?:date|by|on))\b'
-        ],
-        "conclusion": [
-            r'\b(?:conclude|concluded|conclusion|summary|summarize|summarized|wrap|wrap\s+up|end|finish|thank|thanks|closing)\b',
-            r'\b(?:next\s+(?:meeting|session|time))\b',
-            r'\b(?:any\s+(?:other|final|last)\s+(?:business|questions|comments|thoughts|remarks))\b',
-            r'\b(?:see\s+you\s+(?:next|all|then|soon|later|tomorrow|monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b'
+    # Семантика шаблонов Hyperscan отличается от re, поэтому он
+    # включается явно настройкой use_hyperscan
+    hyperscan_classifier = _get_hyperscan_classifier() if config.use_hyperscan else None
+    
+    if hyperscan_classifier is not None:
+        # Hyperscan находит все подходящие категории за один проход по тексту,
+        # из них выбираем первую по порядку classification_types
+        category_ids = [
+            (_CLASSIFIER_CATEGORIES.index(category), category)
+            for category in classification_types
+            if category in _CLASSIFIER_PATTERN_SOURCES
         ]
-    }
-    
-    # Компилируем регулярные выражения
-    compiled_patterns = {
-        category: [re.compile(pattern, re.IGNORECASE) for pattern in pattern_list]
-        for category, pattern_list in patterns.items()
-    }
-    
-    # Проходим по всем сегментам
-    for segment in segments:
-        segment_text = segment.get("text", "")
-        segment_matched = False
-        
-        # Проверяем каждую категорию
-        for category in classification_types:
-            if category in compiled_patterns:
-                for pattern in compiled_patterns[category]:
-                    if pattern.search(segment_text):
-                        classified_segments[category].append(segment)
-                        segment_matched = True
-                        break
-            
-            if segment_matched:
-                break
-        
-        # Если сегмент не попал ни в одну категорию, добавляем его в "other"
-        if not segment_matched:
-            classified_segments["other"].append(segment)
+        for segment in segments:
+            matched = _hyperscan_categories(hyperscan_classifier, segment.get("text", ""))
+            category = next((category for category_id, category in category_ids if category_id in matched), "other")
+            classified_segments[category].append(segment)
+    else:
+        # Один проход регулярного выражения на сегмент: группа, давшая
+        # совпадение, и есть категория сегмента
+        classifier = _get_fused_classifier(tuple(classification_types))
+        if classifier is None:
+            classified_segments["other"].extend(segments)
+        else:
+            # Тексты сопоставляются через map(classifier.match, ...), а сегменты
+            # раскладываются по спискам категорий за один проход
+            texts = [segment.get("text", "") for segment in segments]
+            for segment, match in zip(segments, map(classifier.match, texts)):
+                classified_segments[match.lastgroup if match else "other"].append(segment)
     
     logger.debug(f"Classified {len(segments)} segments into categories: "
                 f"{', '.join(f'{cat}: {len(segs)}' for cat, segs in classified_segments.items())}")
     
     return classified_segments
 
-def optimize_deduplication(items: List[Dict[str, Any]], similarity_threshold: float = 0.8) -> List[Dict[str, Any]]:
+# Текстовые поля, по которым сравниваются элементы при дедупликации
+_DEDUP_TEXT_FIELDS = ("text", "description", "what", "content")
+
+# Сколько следующих (в порядке сортировки) ключей групп по умолчанию
+# сравнивается с каждым ключом в optimize_deduplication без MinHash LSH
+_DEDUP_KEY_WINDOW = 5
+
+# Параметры MinHash: число перестановок и длина символьных шинглов
+_MINHASH_PERMUTATIONS = 64
+_SHINGLE_SIZE = 3
+
+def _dedup_key(item: Dict[str, Any]) -> str:
+    """
+    Возвращает ключ группы элемента: первые 10 символов первого текстового поля
+    
+    Args:
+        item: Элемент для дедупликации
+        
+    Returns:
+        Ключ в нижнем регистре или пустая строка, если текстовых полей нет
+    """
+    for field_name in _DEDUP_TEXT_FIELDS:
+        value = item.get(field_name)
+        if isinstance(value, str) and value:
+            return value[:10].lower()
+    return ""
+
+def _text_similarity(text1: str, text2: str) -> float:
+    """
+    Вычисляет сходство двух текстов (0.0 - 1.0)
+    """
+    if config.use_rapidfuzz and RAPIDFUZZ_AVAILABLE:
+        # Похожая нормированная метрика в нативном коде. Значения для
+        # некоторых пар отличаются от difflib (у него есть эвристика
+        # "junk"), поэтому rapidfuzz включается явно настройкой use_rapidfuzz
+        return fuzz.ratio(text1, text2) / 100.0
+    return SequenceMatcher(None, text1, text2).ratio()
+
+def _items_similar(item1: Dict[str, Any], item2: Dict[str, Any], similarity_threshold: float) -> bool:
+    """
+    Проверяет, что среднее сходство элементов по общим текстовым полям
+    не ниже порога
+    
+    Сначала считается дешевая верхняя оценка сходства по длинам строк
+    (2 * min(len) / (len1 + len2) - и для difflib, и для rapidfuzz сходство
+    не может быть выше). Дорогое сравнение строк выполняется, только если
+    оценка достигает порога.
+    
+    Args:
+        item1: Первый элемент
+        item2: Второй элемент
+        similarity_threshold: Порог сходства (0.0 - 1.0)
+        
+    Returns:
+        True, если элементы достаточно похожи
+    """
+    pairs = [
+        (item1[field_name], item2[field_name])
+        for field_name in _DEDUP_TEXT_FIELDS
+        if isinstance(item1.get(field_name), str) and isinstance(item2.get(field_name), str)
+    ]
+    # Без общих текстовых полей сходство считается нулевым
+    if not pairs:
+        return 0.0 >= similarity_threshold
+    
+    upper_bound = sum(
+        2 * min(len(text1), len(text2)) / (len(text1) + len(text2)) if text1 or text2 else 1.0
+        for text1, text2 in pairs
+    ) / len(pairs)
+    if upper_bound < similarity_threshold - 1e-9:
+        return False
+    
+    return sum(_text_similarity(text1, text2) for text1, text2 in pairs) / len(pairs) >= similarity_threshold
+
+def _stable_key(value: Any) -> Any:
+    """
+    Возвращает хешируемый ключ значения для проверки дубликатов в списках
+    
+    Хешируемые значения используются как есть, словари и списки
+    сериализуются с сортировкой ключей.
+    
+    Args:
+        value: Элемент списка
+        
+    Returns:
+        Хешируемый ключ
+    """
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("json", orjson.dumps(value, option=orjson.OPT_SORT_KEYS, default=str))
+
+def _merge_items(item1: Dict[str, Any], item2: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Объединяет два похожих элемента
+    
+    Args:
+        item1: Основной элемент
+        item2: Элемент, данные которого добавляются к основному
+        
+    Returns:
+        Объединенный элемент
+    """
+    result = item1.copy()
+    
+    # Специальная логика объединения для разных типов полей
+    for key, value in item2.items():
+        if key not in result:
+            result[key] = value
+        else:
+            # Объединение строк
+            if isinstance(result[key], str) and isinstance(value, str):
+                # Выбираем более длинную строку
+                if len(value) > len(result[key]):
+                    result[key] = value
+            
+            # Объединение списков: проверка наличия по множеству ключей вместо
+            # поиска в списке, поэтому объединение линейное, а не квадратичное
+            elif isinstance(result[key], list) and isinstance(value, list):
+                # Список копируется, чтобы не изменять исходный элемент
+                merged_list = result[key] = list(result[key])
+                seen = set(map(_stable_key, merged_list))
+                for item in value:
+                    item_key = _stable_key(item)
+                    if item_key not in seen:
+                        seen.add(item_key)
+                        merged_list.append(item)
+            
+            # Объединение словарей
+            elif isinstance(result[key], dict) and isinstance(value, dict):
+                result[key] = {**result[key], **value}
+    
+    return result
+
+def _deduplicate_with_lsh(items: List[Dict[str, Any]], similarity_threshold: float) -> List[Dict[str, Any]]:
+    """
+    Дедупликация с отбором кандидатов через MinHash LSH
+    
+    Вместо попарного сравнения всех элементов LSH-индекс возвращает для
+    каждого элемента только похожих кандидатов; точное сходство считается
+    лишь для них. Жаккарово сходство шинглов обычно ниже, чем сходство
+    строк, поэтому порог индекса взят с запасом.
+    
+    Args:
+        items: Список элементов для дедупликации
+        similarity_threshold: Порог сходства для объединения элементов
+        
+    Returns:
+        Список уникальных элементов в исходном порядке
+    """
+    lsh = MinHashLSH(threshold=max(0.1, similarity_threshold / 2), num_perm=_MINHASH_PERMUTATIONS)
+    signatures: Dict[int, MinHash] = {}
+    
+    for index, item in enumerate(items):
+        text = " ".join(
+            item[field_name] for field_name in _DEDUP_TEXT_FIELDS
+            if isinstance(item.get(field_name), str)
+        ).lower()
+        # Элементы без текстовых полей ни с чем не объединяются
+        if not text:
+            continue
+        
+        signature = MinHash(num_perm=_MINHASH_PERMUTATIONS)
+        signature.update_batch([
+            text[i:i + _SHINGLE_SIZE].encode("utf-8")
+            for i in range(max(1, len(text) - _SHINGLE_SIZE + 1))
+        ])
+        lsh.insert(index, signature)
+        signatures[index] = signature
+    
+    merged: List[Optional[Dict[str, Any]]] = list(items)
+    for index, signature in signatures.items():
+        if merged[index] is None:
+            continue
+        
+        for candidate in sorted(lsh.query(signature)):
+            if candidate <= index or merged[candidate] is None:
+                continue
+            # Сходство считается по исходным элементам, а данные кандидата
+            # добавляются к уже накопленному результату
+            if _items_similar(items[index], items[candidate], similarity_threshold):
+                merged[index] = _merge_items(merged[index], items[candidate])
+                merged[candidate] = None
+    
+    return [item for item in merged if item is not None]
+
+def optimize_deduplication(
+    items: List[Dict[str, Any]],
+    similarity_threshold: float = 0.8,
+    key_window: Optional[int] = _DEDUP_KEY_WINDOW
+) -> List[Dict[str, Any]]:
     """
     Оптимизированный алгоритм дедупликации с использованием расстояния Левенштейна
     и смысловой близости текстов
     
+    MinHash LSH (пакет datasketch) отбирает кандидатов вероятностно и
+    используется, только если включен настройкой use_datasketch. Без него
+    элементы раскладываются по группам с ключом из первых
+    10 символов текста, и группы с похожими ключами объединяются. Ключи
+    сортируются, и каждый сравнивается только с key_window следующими:
+    дубликаты, ключи которых после сортировки оказались дальше друг от
+    друга, не объединяются. key_window=None сравнивает все пары ключей.
+    
     Args:
         items: Список элементов для дедупликации (словари с текстовыми полями)
         similarity_threshold: Порог сходства для объединения элементов (0.0 - 1.0)
+        key_window: Сколько следующих ключей групп сравнивается с каждым
+                   ключом (None - все ключи). С MinHash LSH не используется
         
     Returns:
-        Список уникальных элементов
+        Список уникальных элементов в исходном порядке: объединенный элемент
+        стоит на месте первого из дубликатов
     """
     if not items:
         return []
     
-    # Импортируем необходимые библиотеки
-    try:
-        from difflib import SequenceMatcher
-    except ImportError:
-        # Если difflib не установлен, используем простую дедупликацию
-        unique_items = []
-        unique_texts = set()
-        
-        for item in items:
-            item_text = str(item)
-            if item_text not in unique_texts:
-                unique_texts.add(item_text)
-                unique_items.append(item)
-        
+    if config.use_datasketch and DATASKETCH_AVAILABLE:
+        unique_items = _deduplicate_with_lsh(items, similarity_threshold)
+        logger.debug(f"Deduplicated {len(items)} items to {len(unique_items)} unique items using MinHash LSH")
         return unique_items
     
-    # Функция для вычисления сходства между двумя текстами
-    def text_similarity(text1: str, text2: str) -> float:
-        return SequenceMatcher(None, text1, text2).ratio()
-    
-    # Функция для объединения двух элементов
-    def merge_items(item1: Dict[str, Any], item2: Dict[str, Any]) -> Dict[str, Any]:
-        result = item1.copy()
-        
-        # Специальная логика объединения для разных типов полей
-        for key, value in item2.items():
-            if key not in result:
-                result[key] = value
-            else:
-                # Объединение строк
-                if isinstance(result[key], str) and isinstance(value, str):
-                    # Выбираем более длинную строку
-                    if len(value) > len(result[key]):
-                        result[key] = value
-                
-                # Объединение списков
-                elif isinstance(result[key], list) and isinstance(value, list):
-                    for item in value:
-                        if item not in result[key]:
-                            result[key].append(item)
-                
-                # Объединение словарей
-                elif isinstance(result[key], dict) and isinstance(value, dict):
-                    result[key].update(value)
-        
-        return result
-    
-    # Группируем элементы по ключевым полям для оптимизации
-    grouped_items = {}
-    for item in items:
-        # Определяем ключевое поле (например, первые несколько символов текста)
-        key_field = ""
-        for field_name in ["text", "description", "what", "content"]:
-            if field_name in item and isinstance(item[field_name], str):
-                key = item[field_name][:10].lower() if len(item[field_name]) > 10 else item[field_name].lower()
-                if key:
-                    key_field = key
-                    break
-        
+    # Раскладываем индексы элементов по корзинам ключевых полей; результат
+    # собирается по индексам, поэтому исходный порядок сохраняется
+    merged: List[Optional[Dict[str, Any]]] = list(items)
+    buckets: DefaultDict[str, List[int]] = defaultdict(list)
+    keyless_texts = set()
+    for index, item in enumerate(items):
+        key_field = _dedup_key(item)
         if key_field:
-            if key_field not in grouped_items:
-                grouped_items[key_field] = []
-            grouped_items[key_field].append(item)
+            buckets[key_field].append(index)
         else:
-            # Если не удалось найти ключевое поле, просто добавляем элемент в отдельную группу
-            key_field = str(hash(str(item)))
-            grouped_items[key_field] = [item]
+            # Элементы без ключевого поля не похожи ни на что, кроме точных копий
+            item_text = str(item)
+            if item_text in keyless_texts:
+                merged[index] = None
+            else:
+                keyless_texts.add(item_text)
     
-    # Дедупликация внутри каждой группы и между близкими группами
-    unique_items = []
-    processed_groups = set()
+    # После сортировки похожие ключи оказываются рядом, поэтому каждый ключ
+    # сравнивается только с key_window следующими, а не со всеми
+    sorted_keys = sorted(buckets)
+    processed = [False] * len(sorted_keys)
     
-    for key_field, group in grouped_items.items():
-        if key_field in processed_groups:
+    for key_index, key_field in enumerate(sorted_keys):
+        if processed[key_index]:
             continue
         
-        processed_groups.add(key_field)
+        processed[key_index] = True
         
         # Объединяем группы с похожими ключевыми полями
-        merged_group = group.copy()
-        for other_key, other_group in grouped_items.items():
-            if other_key != key_field and other_key not in processed_groups:
-                if text_similarity(key_field, other_key) >= similarity_threshold:
-                    merged_group.extend(other_group)
-                    processed_groups.add(other_key)
+        window_end = len(sorted_keys) if key_window is None else min(key_index + 1 + key_window, len(sorted_keys))
+        group = buckets[key_field].copy()
+        for other_index in range(key_index + 1, window_end):
+            if not processed[other_index]:
+                other_key = sorted_keys[other_index]
+                if _text_similarity(key_field, other_key) >= similarity_threshold:
+                    group.extend(buckets[other_key])
+                    processed[other_index] = True
         
-        # Дедупликация внутри объединенной группы
-        for i, item1 in enumerate(merged_group):
-            if item1 is None:
+        # Дедупликация внутри объединенной группы: как и с LSH, более ранний
+        # элемент поглощает более поздние
+        group.sort()
+        for position, index in enumerate(group):
+            if merged[index] is None:
                 continue
             
-            for j in range(i + 1, len(merged_group)):
-                item2 = merged_group[j]
-                if item2 is None:
+            for other in group[position + 1:]:
+                if merged[other] is None:
                     continue
                 
-                # Вычисляем сходство между элементами
-                similarity = 0.0
-                common_fields = 0
-                
-                for field_name in ["text", "description", "what", "content"]:
-                    if field_name in item1 and field_name in item2:
-                        if isinstance(item1[field_name], str) and isinstance(item2[field_name], str):
-                            field_similarity = text_similarity(item1[field_name], item2[field_name])
-                            similarity += field_similarity
-                            common_fields += 1
-                
-                # Вычисляем среднее сходство
-                avg_similarity = similarity / common_fields if common_fields > 0 else 0.0
-                
                 # Если элементы достаточно похожи, объединяем их
-                if avg_similarity >= similarity_threshold:
-                    merged_group[i] = merge_items(item1, item2)
-                    merged_group[j] = None
-        
-        # Добавляем уникальные элементы в результат
-        for item in merged_group:
-            if item is not None:
-                unique_items.append(item)
+                if _items_similar(items[index], items[other], similarity_threshold):
+                    merged[index] = _merge_items(merged[index], items[other])
+                    merged[other] = None
+    
+    unique_items = [item for item in merged if item is not None]
     
     logger.debug(f"Deduplicated {len(items)} items to {len(unique_items)} unique items")
     return unique_items
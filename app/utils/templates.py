@@ -2,16 +2,11 @@
 Утилиты для работы с шаблонами и генерации Markdown
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, Union
 
-try:
-    import jinja2
-except ImportError:
-    # Установка jinja2, если отсутствует
-    import subprocess
-    subprocess.check_call(["pip", "install", "jinja2"])
-    import jinja2
+import jinja2
 
 from ..core.models.protocol import Protocol
 from ..utils.logging import get_default_logger
@@ -20,10 +15,41 @@ from datetime import datetime
 
 logger = get_default_logger(__name__)
 
+# Запасные тексты Markdown для случая, когда шаблон протокола недоступен
+_ERROR_MARKDOWN_DE = """
+# Fehler bei der Protokollgenerierung
+
+**Datum:** {date}
+
+## Fehlermeldung
+{error}
+
+## Details
+Bei der Generierung des Protokolls ist ein Fehler aufgetreten. 
+Bitte überprüfen Sie die Eingabedaten und versuchen Sie es erneut.
+"""
+
+_ERROR_MARKDOWN_EN = """
+# Error in Protocol Generation
+
+**Date:** {date}
+
+## Error Message
+{error}
+
+## Details
+An error occurred during protocol generation.
+Please check the input data and try again.
+"""
+
 def load_prompt_template(prompt_name: str, language: str = "en") -> str:
     """
     Загружает шаблон промпта из файла
     
+    Содержимое кешируется по (prompt_name, language, директория промптов);
+    после изменения файлов на диске кеш сбрасывается через
+    prompt_templates_clear_cache().
+    
     Args:
         prompt_name: Имя промпта (без расширения)
         language: Язык промпта (en, de)
@@ -35,37 +61,7 @@ def load_prompt_template(prompt_name: str, language: str = "en") -> str:
         FileNotFoundError: Если файл промпта не найден
     """
     try:
-        # Формируем имя файла промпта
-        if language.lower() == "de":
-            prompt_file = f"{prompt_name}_de.txt"
-        else:
-            prompt_file = f"{prompt_name}.txt"
-        
-        # Формируем путь к промпту
-        prompts_dir = Path(config.prompts_dir)
-        prompt_path = prompts_dir / prompt_file
-        
-        # Проверяем существование файла
-        if not prompt_path.exists():
-            # Если локализованная версия не найдена, используем английскую
-            if language.lower() == "de":
-                prompt_file = f"{prompt_name}.txt"
-                prompt_path = prompts_dir / prompt_file
-                
-                # Если и английская версия не найдена, выбрасываем исключение
-                if not prompt_path.exists():
-                    raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
-                
-                logger.warning(f"German prompt not found, using English prompt: {prompt_path}")
-            else:
-                raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
-        
-        # Загружаем промпт из файла
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            prompt_content = f.read()
-        
-        logger.debug(f"Loaded prompt template: {prompt_path}")
-        return prompt_content
+        return _load_prompt_template_cached(prompt_name, language.lower(), str(config.prompts_dir))
         
     except FileNotFoundError:
         # Пробрасываем исключение дальше
@@ -76,6 +72,82 @@ def load_prompt_template(prompt_name: str, language: str = "en") -> str:
         logger.error(error_msg, exc_info=True)
         raise RuntimeError(error_msg) from e
 
+def prompt_templates_clear_cache() -> None:
+    """
+    Сбрасывает кеш загруженных шаблонов промптов (например, после их правки)
+    """
+    _load_prompt_template_cached.cache_clear()
+
+def _resolve_prompt_path(prompt_name: str, language: str, prompts_dir: str) -> Path:
+    """
+    Определяет путь к файлу промпта с учетом языка
+    
+    Args:
+        prompt_name: Имя промпта (без расширения)
+        language: Язык промпта в нижнем регистре (en, de)
+        prompts_dir: Директория с промптами
+        
+    Returns:
+        Путь к существующему файлу промпта
+        
+    Raises:
+        FileNotFoundError: Если файл промпта не найден
+    """
+    # Формируем имя файла промпта
+    if language == "de":
+        prompt_file = f"{prompt_name}_de.txt"
+    else:
+        prompt_file = f"{prompt_name}.txt"
+    
+    # Формируем путь к промпту
+    prompts_path = Path(prompts_dir)
+    prompt_path = prompts_path / prompt_file
+    
+    # Проверяем существование файла
+    if not prompt_path.exists():
+        # Если локализованная версия не найдена, используем английскую
+        if language == "de":
+            prompt_path = prompts_path / f"{prompt_name}.txt"
+            
+            # Если и английская версия не найдена, выбрасываем исключение
+            if not prompt_path.exists():
+                raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
+            
+            logger.warning(f"German prompt not found, using English prompt: {prompt_path}")
+        else:
+            raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
+    
+    return prompt_path
+
+@lru_cache(maxsize=64)
+def _load_prompt_template_cached(prompt_name: str, language: str, prompts_dir: str) -> str:
+    """
+    Читает файл промпта; результат кешируется (см. load_prompt_template)
+    """
+    prompt_path = _resolve_prompt_path(prompt_name, language, prompts_dir)
+    prompt_content = prompt_path.read_text(encoding="utf-8")
+    
+    logger.debug(f"Loaded prompt template: {prompt_path}")
+    return prompt_content
+
+@lru_cache(maxsize=4)
+def _get_template_environment(templates_dir: str) -> jinja2.Environment:
+    """
+    Возвращает окружение Jinja2 для директории шаблонов, создавая его один раз
+    
+    Args:
+        templates_dir: Директория с шаблонами Markdown
+        
+    Returns:
+        Окружение Jinja2
+    """
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(templates_dir),
+        autoescape=jinja2.select_autoescape(["html", "xml"]),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+
 def load_template(template_name: str, language: str = "en") -> jinja2.Template:
     """
     Загружает шаблон Markdown
@@ -117,20 +189,10 @@ def load_template(template_name: str, language: str = "en") -> jinja2.Template:
             else:
                 raise FileNotFoundError(f"Template file not found: {template_path}")
         
-        # Загружаем шаблон из файла
-        with open(template_path, "r", encoding="utf-8") as f:
-            template_content = f.read()
-        
-        # Создаем окружение Jinja2
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(templates_dir),
-            autoescape=jinja2.select_autoescape(["html", "xml"]),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
-        
-        # Загружаем шаблон
-        template = env.from_string(template_content)
+        # Загружаем шаблон через общее окружение: Jinja2 кеширует
+        # скомпилированные шаблоны и перечитывает файл только при его изменении
+        env = _get_template_environment(str(templates_dir))
+        template = env.get_template(template_file)
         
         logger.debug(f"Loaded template: {template_path}")
         return template
@@ -219,9 +281,6 @@ def generate_error_markdown(
     try:
         # Если протокол не передан, создаем минимальный протокол с ошибкой
         if protocol is None:
-            from datetime import datetime
-            from ..core.models.protocol import Protocol
-            
             protocol = Protocol(
                 metadata={
                     "title": "Error: Protocol Generation Failed",
@@ -246,29 +305,8 @@ def generate_error_markdown(
         # Если не удалось сгенерировать Markdown через шаблон, возвращаем простой текст
         logger.error(f"Failed to generate error Markdown: {e}", exc_info=True)
         
-        if language.lower() == "de":
-            return f"""
-# Fehler bei der Protokollgenerierung
-
-**Datum:** {datetime.now().strftime("%Y-%m-%d")}
-
-## Fehlermeldung
-{error_message}
-
-## Details
-Bei der Generierung des Protokolls ist ein Fehler aufgetreten. 
-Bitte überprüfen Sie die Eingabedaten und versuchen Sie es erneut.
-"""
-        else:
-            return f"""
-# Error in Protocol Generation
-
-**Date:** {datetime.now().strftime("%Y-%m-%d")}
-
-## Error Message
-{error_message}
-
-## Details
-An error occurred during protocol generation.
-Please check the input data and try again.
-"""
+        error_template = _ERROR_MARKDOWN_DE if language.lower() == "de" else _ERROR_MARKDOWN_EN
+        return error_template.format_map({
+            "date": datetime.now().strftime("%Y-%m-%d"),
+            "error": error_message
+        })
@@ -2,20 +2,202 @@
 Утилиты для работы с текстом
 """
 import json
-from typing import List, Dict, Any, Optional, Union
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 
+import tiktoken
+
+# Опциональный импорт rs-bpe: линейное по длине кодирование без
+# сверхлинейной деградации tiktoken на длинных входах
 try:
-    import tiktoken
+    from rs_bpe.bpe import openai as rs_bpe_openai
+    RS_BPE_AVAILABLE = True
 except ImportError:
-    import subprocess
-    subprocess.check_call(["pip", "install", "tiktoken"])
-    import tiktoken
+    rs_bpe_openai = None
+    RS_BPE_AVAILABLE = False
 
 from ..utils.logging import get_default_logger
 from ..config.config import config
 
 logger = get_default_logger(__name__)
 
+# Значения по умолчанию из конфигурации читаются один раз при импорте,
+# а не на каждом вызове функций разбиения. После изменения конфигурации
+# во время работы нужно вызвать reload_defaults()
+_DEFAULT_CHUNK_TOKENS = config.chunk_tokens
+_DEFAULT_OVERLAP_TOKENS = config.overlap_tokens
+
+# Размер окна (в символах), которыми tiktoken кодирует длинный текст:
+# время BPE растет сверхлинейно с длиной непрерывного фрагмента
+_ENCODE_WINDOW_CHARS = 65536
+
+# Пробел между непробельным символом и буквой - претокенизатор tiktoken
+# (cl100k_base, o200k_base) всегда начинает здесь новый фрагмент, поэтому
+# разрез окна в этой позиции не меняет результат кодирования
+_WINDOW_BOUNDARY_RE = re.compile(r"(?<=\S) (?=[^\W\d_])")
+
+# Насколько далеко от конца окна искать безопасную границу
+_WINDOW_BOUNDARY_LOOKBACK = 1024
+
+# Граница параграфов: пустая строка, возможно с пробелами
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+def reload_defaults() -> None:
+    """
+    Перечитывает из конфигурации размеры чанка и перекрытия по умолчанию
+    """
+    global _DEFAULT_CHUNK_TOKENS, _DEFAULT_OVERLAP_TOKENS
+    _DEFAULT_CHUNK_TOKENS = config.chunk_tokens
+    _DEFAULT_OVERLAP_TOKENS = config.overlap_tokens
+
+@lru_cache(maxsize=8)
+def _get_encoding(encoding_name: str) -> "tiktoken.Encoding":
+    """
+    Возвращает кодировку tiktoken, создавая ее один раз на имя
+    
+    Один объект безопасно использовать из нескольких потоков: tiktoken
+    держит отдельную копию регулярного выражения претокенизатора для
+    каждого потока, поэтому потоки не конкурируют за общее состояние.
+    
+    Args:
+        encoding_name: Имя кодировки для tiktoken
+        
+    Returns:
+        Объект кодировки tiktoken
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+@lru_cache(maxsize=8)
+def _get_rs_bpe_tokenizer(encoding_name: str) -> Optional[Any]:
+    """
+    Возвращает токенизатор rs-bpe для кодировки, создавая его один раз на имя
+    
+    Args:
+        encoding_name: Имя кодировки (cl100k_base, o200k_base)
+        
+    Returns:
+        Токенизатор rs-bpe или None, если библиотека не установлена
+        или не поддерживает кодировку
+    """
+    if not RS_BPE_AVAILABLE:
+        return None
+    
+    factory = getattr(rs_bpe_openai, encoding_name, None)
+    return factory() if callable(factory) else None
+
+def _encode(text: str, encoding_name: str) -> List[int]:
+    """
+    Кодирует текст в токены, предпочитая rs-bpe, если он доступен
+    
+    Словари rs-bpe и tiktoken для одной кодировки совпадают, поэтому
+    полученные токены можно декодировать любым из них.
+    
+    Args:
+        text: Текст для кодирования
+        encoding_name: Имя кодировки
+        
+    Returns:
+        Список токенов
+    """
+    tokenizer = _get_rs_bpe_tokenizer(encoding_name)
+    if tokenizer is not None:
+        return tokenizer.encode(text)
+    
+    encoding = _get_encoding(encoding_name)
+    if len(text) <= _ENCODE_WINDOW_CHARS:
+        return encoding.encode(text)
+    
+    # Длинный текст кодируем окнами, чтобы время работы оставалось линейным.
+    # Окна независимы, и encode_batch кодирует их в пуле потоков: tiktoken
+    # отпускает GIL на время работы BPE
+    windows = list(_iter_encode_windows(text))
+    tokens = []
+    for window_tokens in encoding.encode_batch(windows, num_threads=os.cpu_count() or 1):
+        tokens.extend(window_tokens)
+    return tokens
+
+def _iter_encode_windows(text: str) -> Iterator[str]:
+    """
+    Нарезает текст на окна не длиннее _ENCODE_WINDOW_CHARS для кодирования
+    
+    Окна режутся по границам фрагментов претокенизатора, поэтому
+    конкатенация токенов окон совпадает с кодированием всего текста.
+    Жесткий разрез делается, только если в конце окна нет ни одной такой
+    границы (например, в длинной строке без пробелов).
+    
+    Args:
+        text: Текст для нарезки
+        
+    Yields:
+        Последовательные окна текста
+    """
+    start = 0
+    while len(text) - start > _ENCODE_WINDOW_CHARS:
+        end = start + _ENCODE_WINDOW_CHARS
+        lookback_start = max(start + 1, end - _WINDOW_BOUNDARY_LOOKBACK)
+        
+        boundary = None
+        for match in _WINDOW_BOUNDARY_RE.finditer(text, lookback_start, end):
+            boundary = match.start()
+        
+        if boundary is not None:
+            end = boundary
+        
+        yield text[start:end]
+        start = end
+    
+    yield text[start:]
+
+def _fits_in_tokens(text: str, limit: int, encoding_name: str) -> Optional[bool]:
+    """
+    Проверяет, укладывается ли текст в лимит токенов, не кодируя его целиком
+    
+    Args:
+        text: Текст для проверки
+        limit: Лимит токенов
+        encoding_name: Имя кодировки
+        
+    Returns:
+        True/False, если проверку удалось выполнить через rs-bpe,
+        иначе None
+    """
+    tokenizer = _get_rs_bpe_tokenizer(encoding_name)
+    if tokenizer is None:
+        return None
+    return tokenizer.count_till_limit(text, limit) is not None
+
+def _fits_by_bytes(texts: Iterable[str], limit: int) -> bool:
+    """
+    Проверяет без токенизации, что тексты заведомо укладываются в лимит токенов
+    
+    Каждый токен BPE занимает не меньше одного байта UTF-8, поэтому суммарная
+    длина в байтах - верхняя граница числа токенов.
+    
+    Args:
+        texts: Тексты для проверки
+        limit: Лимит токенов
+        
+    Returns:
+        True, если суммарная длина текстов в байтах не превышает лимит
+    """
+    total = 0
+    for text in texts:
+        # Длина в символах не больше длины в байтах - отсекаем длинные
+        # тексты без кодирования в UTF-8
+        total += len(text)
+        if total > limit:
+            return False
+        total += len(text.encode("utf-8")) - len(text)
+        if total > limit:
+            return False
+    return True
+
 def split_text_into_chunks(
     text: str,
     chunk_tokens: int = None,
@@ -37,10 +219,10 @@ def split_text_into_chunks(
         Список чанков текста
     """
     if chunk_tokens is None:
-        chunk_tokens = config.chunk_tokens
+        chunk_tokens = _DEFAULT_CHUNK_TOKENS
     
     if overlap_tokens is None:
-        overlap_tokens = config.overlap_tokens
+        overlap_tokens = _DEFAULT_OVERLAP_TOKENS
     
     # Убеждаемся, что перекрытие не больше размера чанка
     if overlap_tokens >= chunk_tokens:
@@ -54,17 +236,36 @@ def split_text_into_chunks(
     if not text:
         return []
     
+    # Короткий текст заведомо помещается в один чанк - токенизатор не нужен
+    if _fits_by_bytes((text,), chunk_tokens):
+        return [text]
+    
     try:
+        # Короткий текст целиком помещается в чанк - rs-bpe проверяет это,
+        # останавливаясь на лимите, без полного кодирования
+        if _fits_in_tokens(text, chunk_tokens, encoding_name):
+            return [text]
+        
         # Получаем кодировку
-        encoding = tiktoken.get_encoding(encoding_name)
+        encoding = _get_encoding(encoding_name)
         
-        # Кодируем текст в токены
-        all_tokens = encoding.encode(text)
+        # Кодируем текст в токены. Токены и смещения живут до конца нарезки,
+        # поэтому храним их в компактных массивах (4-8 байт на элемент)
+        # вместо списков объектов int
+        all_tokens = array("I", _encode(text, encoding_name))
         
         # Если текст меньше размера чанка, возвращаем его целиком
         if len(all_tokens) <= chunk_tokens:
             return [text]
         
+        # Декодируем токены один раз вместе со смещениями символов, чтобы
+        # вырезать чанки срезами строки вместо декодирования каждого чанка.
+        # Смещения всегда указывают на начало символа, поэтому границы
+        # чанков не разрезают многобайтовые символы UTF-8
+        decoded_text, offsets = encoding.decode_with_offsets(all_tokens)
+        offsets = array("L", offsets)
+        offsets.append(len(decoded_text))
+        
         # Разбиваем токены на чанки
         chunks = []
         start_token_idx = 0
@@ -73,12 +274,8 @@ def split_text_into_chunks(
             # Находим конец текущего чанка
             end_token_idx = min(start_token_idx + chunk_tokens, len(all_tokens))
             
-            # Получаем токены для текущего чанка
-            current_chunk_tokens = all_tokens[start_token_idx:end_token_idx]
-            
-            # Декодируем токены обратно в текст
-            chunk_text = encoding.decode(current_chunk_tokens)
-            chunks.append(chunk_text)
+            # Вырезаем текст чанка по смещениям его первого и последнего токенов
+            chunks.append(decoded_text[offsets[start_token_idx]:offsets[end_token_idx]])
             
             # Если достигли конца текста, выходим из цикла
             if end_token_idx >= len(all_tokens):
@@ -103,26 +300,177 @@ def split_text_into_chunks(
         chunk_size_chars = chunk_tokens * 4  # Грубое приближение: 1 токен ~ 4 символа
         overlap_chars = overlap_tokens * 4
         
-        # Разбиваем текст на чанки по символам
-        result = []
-        start_idx = 0
-        
-        while start_idx < len(text):
-            end_idx = min(start_idx + chunk_size_chars, len(text))
-            result.append(text[start_idx:end_idx])
-            
-            if end_idx >= len(text):
-                break
-                
-            start_idx += chunk_size_chars - overlap_chars
-            
-            # Защита от бесконечного цикла
-            if start_idx >= end_idx:
-                start_idx = end_idx
+        # Начала чанков идут с шагом chunk_size_chars - overlap_chars;
+        # последний чанк начинается там, где его конец впервые достигает
+        # конца текста, то есть раньше len(text) - overlap_chars.
+        # Срезы str индексируются по символам, поэтому никогда не разрезают
+        # многобайтовый символ - переходить к байтам UTF-8 здесь не нужно
+        stride = chunk_size_chars - overlap_chars
+        result = [
+            text[start_idx:start_idx + chunk_size_chars]
+            for start_idx in range(0, max(len(text) - overlap_chars, 1), stride)
+        ]
         
         logger.debug(f"Split text into {len(result)} chunks using fallback method")
         return result
 
+def split_text_binary(
+    text: str,
+    chunk_tokens: int = None,
+    max_depth: Optional[int] = None,
+    encoding_name: str = "cl100k_base"
+) -> List[str]:
+    """
+    Разбивает текст рекурсивным делением пополам по границам параграфов
+    
+    В отличие от скользящего окна split_text_into_chunks, каждый диапазон
+    параграфов делится в точке, ближайшей к его середине по числу токенов,
+    поэтому части получаются сбалансированными по размеру. Глубина
+    рекурсии выбирается так, чтобы 2**depth частей в среднем укладывались
+    в chunk_tokens. Параграф длиннее chunk_tokens не разрезается.
+    
+    Args:
+        text: Текст для разбиения
+        chunk_tokens: Желаемый размер части в токенах
+                     (если None, берется из конфигурации)
+        max_depth: Максимальная глубина рекурсии (если None, не ограничена)
+        encoding_name: Имя кодировки для tiktoken
+        
+    Returns:
+        Список частей текста (не более 2**depth)
+    """
+    if chunk_tokens is None:
+        chunk_tokens = _DEFAULT_CHUNK_TOKENS
+    
+    paragraphs = [paragraph for paragraph in _PARAGRAPH_RE.split(text) if paragraph.strip()]
+    if not paragraphs:
+        return []
+    
+    # Токены всех параграфов считаем одним пакетным вызовом, а суммы
+    # диапазонов берем из префиксных сумм
+    encoding = _get_encoding(encoding_name)
+    token_counts = [
+        len(tokens)
+        for tokens in encoding.encode_ordinary_batch(paragraphs, num_threads=os.cpu_count() or 1)
+    ]
+    prefix = [0, *accumulate(token_counts)]
+    total_tokens = prefix[-1]
+    
+    depth = math.ceil(math.log2(total_tokens / chunk_tokens)) if total_tokens > chunk_tokens else 0
+    if max_depth is not None:
+        depth = min(depth, max_depth)
+    
+    parts = []
+    
+    def split(lo: int, hi: int, d: int) -> None:
+        if d == 0 or hi - lo <= 1:
+            parts.append("\n\n".join(paragraphs[lo:hi]))
+            return
+        
+        # Ищем границу между параграфами, ближайшую к середине диапазона
+        middle = (prefix[lo] + prefix[hi]) / 2
+        k = bisect_left(prefix, middle, lo + 1, hi - 1)
+        if k > lo + 1 and middle - prefix[k - 1] <= prefix[k] - middle:
+            k -= 1
+        
+        split(lo, k, d - 1)
+        split(k, hi, d - 1)
+    
+    split(0, len(paragraphs), depth)
+    
+    logger.debug(f"Split text into {len(parts)} balanced parts (depth {depth})")
+    return parts
+
+def _compute_chunk_boundaries(
+    token_counts: List[int],
+    chunk_tokens: int,
+    overlap_segments: int
+) -> List[Tuple[int, int]]:
+    """
+    Вычисляет границы чанков сегментов по числу токенов в каждом сегменте
+    
+    Сегменты добавляются в чанк, пока сумма токенов не превышает
+    chunk_tokens (первый сегмент чанка добавляется всегда). Новый чанк
+    начинается с последних overlap_segments сегментов предыдущего, если
+    тот длиннее перекрытия.
+    
+    Args:
+        token_counts: Число токенов в каждом сегменте
+        chunk_tokens: Максимальное количество токенов в чанке
+        overlap_segments: Количество сегментов перекрытия между чанками
+        
+    Returns:
+        Список пар (начало, конец) - полуинтервалов индексов сегментов
+    """
+    # Префиксные суммы: prefix[j] - prefix[i] - число токенов сегментов [i, j)
+    prefix = [0, *accumulate(token_counts)]
+    boundaries = []
+    start = 0
+    # Сегменты [start, forced_end] входят в чанк независимо от лимита:
+    # первый сегмент чанка и сегмент, на котором закончился предыдущий
+    forced_end = 0
+    
+    while start < len(token_counts):
+        # Самый длинный чанк, сумма токенов которого не превышает лимит
+        end = max(
+            forced_end + 1,
+            bisect_right(prefix, prefix[start] + chunk_tokens, forced_end + 1) - 1
+        )
+        boundaries.append((start, end))
+        
+        if end >= len(token_counts):
+            break
+        
+        if overlap_segments > 0 and end - start > overlap_segments:
+            start = end - overlap_segments
+        else:
+            start = end
+        forced_end = end
+    
+    return boundaries
+
+def _count_tokens_batch(texts: List[str], encoding_name: str) -> List[int]:
+    """
+    Подсчитывает число токенов в каждом тексте одним пакетным вызовом
+    
+    tiktoken кодирует пакет в нескольких потоках без GIL.
+    
+    Args:
+        texts: Список текстов
+        encoding_name: Имя кодировки для tiktoken
+        
+    Returns:
+        Число токенов в каждом тексте
+    """
+    encoding = _get_encoding(encoding_name)
+    encoded = encoding.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)
+    return [len(tokens) for tokens in encoded]
+
+def count_segment_tokens(
+    segments: List[Dict[str, Any]],
+    encoding_name: str = "cl100k_base"
+) -> List[Dict[str, Any]]:
+    """
+    Заполняет поле "n_tokens" сегментов транскрипции
+    
+    Вызывается там, где сегменты создаются, чтобы split_transcript_segments
+    не кодировал их тексты повторно. Сегменты, у которых поле уже заполнено,
+    не пересчитываются; остальные кодируются одним пакетным вызовом.
+    
+    Args:
+        segments: Список сегментов транскрипции (изменяется на месте)
+        encoding_name: Имя кодировки для tiktoken
+        
+    Returns:
+        Тот же список сегментов
+    """
+    missing = [segment for segment in segments if segment.get("n_tokens") is None]
+    if missing:
+        counts = _count_tokens_batch([segment.get("text", "") for segment in missing], encoding_name)
+        for segment, count in zip(missing, counts):
+            segment["n_tokens"] = count
+    return segments
+
 def split_transcript_segments(
     segments: List[Dict[str, Any]],
     chunk_tokens: int = None,
@@ -133,6 +481,11 @@ def split_transcript_segments(
     Разбивает сегменты транскрипции на чанки с заданным количеством токенов и
     перекрытием сегментов
     
+    Сегмент может содержать поле "n_tokens" - число токенов его текста
+    в кодировке encoding_name, посчитанное заранее (например, пакетно при
+    создании сегментов). Такие сегменты не кодируются повторно; для
+    сегментов без этого поля токены считаются здесь.
+    
     Args:
         segments: Список сегментов транскрипции
         chunk_tokens: Максимальное количество токенов в чанке
@@ -144,57 +497,31 @@ def split_transcript_segments(
         Список чанков сегментов
     """
     if chunk_tokens is None:
-        chunk_tokens = config.chunk_tokens
+        chunk_tokens = _DEFAULT_CHUNK_TOKENS
     
     # Если сегментов нет, возвращаем пустой список
     if not segments:
         return []
     
+    # Все сегменты заведомо помещаются в один чанк - токенизатор не нужен
+    if _fits_by_bytes((segment.get("text", "") for segment in segments), chunk_tokens):
+        return [list(segments)]
+    
     try:
-        # Получаем кодировку
-        encoding = tiktoken.get_encoding(encoding_name)
+        # Берем готовое число токенов из сегмента, если оно уже посчитано
+        token_counts = [segment.get("n_tokens") for segment in segments]
+        missing = [i for i, count in enumerate(token_counts) if count is None]
         
-        # Разбиваем сегменты на чанки
-        chunks = []
-        current_chunk = []
-        current_tokens = 0
+        if missing:
+            # Подсчитываем токены остальных сегментов одним пакетным вызовом
+            texts = [segments[i].get("text", "") for i in missing]
+            for i, count in zip(missing, _count_tokens_batch(texts, encoding_name)):
+                token_counts[i] = count
         
-        for segment in segments:
-            # Получаем текст сегмента
-            segment_text = segment.get("text", "")
-            
-            # Подсчитываем токены в сегменте
-            segment_tokens = len(encoding.encode(segment_text))
-            
-            # Если текущий чанк пуст или добавление сегмента не превысит лимит,
-            # добавляем сегмент в текущий чанк
-            if not current_chunk or current_tokens + segment_tokens <= chunk_tokens:
-                current_chunk.append(segment)
-                current_tokens += segment_tokens
-            else:
-                # Иначе сохраняем текущий чанк и начинаем новый
-                chunks.append(current_chunk)
-                
-                # Если у нас есть перекрытие, копируем последние N сегментов
-                # из предыдущего чанка в новый
-                if overlap_segments > 0 and len(current_chunk) > overlap_segments:
-                    current_chunk = current_chunk[-overlap_segments:]
-                    # Пересчитываем токены для нового чанка с перекрытием
-                    current_tokens = sum(
-                        len(encoding.encode(seg.get("text", "")))
-                        for seg in current_chunk
-                    )
-                else:
-                    current_chunk = []
-                    current_tokens = 0
-                
-                # Добавляем текущий сегмент в новый чанк
-                current_chunk.append(segment)
-                current_tokens += segment_tokens
-        
-        # Добавляем последний чанк, если он не пустой
-        if current_chunk:
-            chunks.append(current_chunk)
+        # Границы чанков считаются только по числам токенов, сегменты
+        # нарезаются срезами уже по готовым границам
+        boundaries = _compute_chunk_boundaries(token_counts, chunk_tokens, overlap_segments)
+        chunks = [segments[start:end] for start, end in boundaries]
         
         logger.debug(f"Split {len(segments)} segments into {len(chunks)} chunks")
         return chunks
@@ -220,6 +547,31 @@ def split_transcript_segments(
         logger.debug(f"Split {len(segments)} segments into {len(result)} chunks using fallback method")
         return result
 
+@lru_cache(maxsize=32)
+def _compile_header_template(header_template: str) -> Callable[[int], str]:
+    """
+    Компилирует шаблон заголовка в функцию от номера части
+    
+    Шаблон вида "<префикс>{index}<суффикс>" без других подстановок
+    превращается в конкатенацию строк без разбора шаблона str.format
+    на каждом вызове. Остальные шаблоны форматируются как обычно.
+    
+    Args:
+        header_template: Шаблон заголовка
+        
+    Returns:
+        Функция, возвращающая заголовок для номера части
+    """
+    prefix, placeholder, suffix = header_template.partition("{index}")
+    
+    if "{" in prefix or "}" in prefix or "{" in suffix or "}" in suffix:
+        return lambda index: header_template.format(index=index)
+    
+    if not placeholder:
+        return lambda index: header_template
+    
+    return lambda index: f"{prefix}{index}{suffix}"
+
 def merge_text_with_headers(texts: List[str], header_template: str = "Часть {index}:") -> str:
     """
     Объединяет список текстов, добавляя к каждому заголовок
@@ -231,14 +583,10 @@ def merge_text_with_headers(texts: List[str], header_template: str = "Часть
     Returns:
         Объединенный текст с заголовками
     """
-    result = []
-    
-    for i, text in enumerate(texts):
-        # Формируем заголовок
-        header = header_template.format(index=i+1)
-        
-        # Добавляем заголовок и текст
-        result.append(f"{header}\n\n{text.strip()}")
+    format_header = _compile_header_template(header_template)
     
     # Объединяем все части с двойным переносом строки
-    return "\n\n".join(result)
+    return "\n\n".join(
+        f"{format_header(i)}\n\n{text.strip()}"
+        for i, text in enumerate(texts, start=1)
+    )
@@ -2,23 +2,31 @@
 API маршруты для веб-интерфейса
 """
 import os
-import json
 import time
 import uuid
+import asyncio
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple, Union
+from urllib.parse import quote
 
+import orjson
 from fastapi import APIRouter, File, UploadFile, Form, BackgroundTasks, HTTPException, Depends, Request, Query, Path as PathParam
-from fastapi.responses import JSONResponse, FileResponse, Response
-from pydantic import ValidationError as PydanticValidationError
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
 
 from ..core.services.pipeline import Pipeline
 from ..core.exceptions import ASRError, LLMError, NotificationError, ConfigError, ValidationError
 from ..utils.logging import get_default_logger
 from ..config.config import config
 from ..utils.cache import get_cache
-from ..utils.metrics import get_metrics_collector, track_active_tasks
+from ..utils.config_validator import is_config_healthy
+from ..utils.metrics import get_metrics_collector, track_active_tasks, track_stored_tasks
+from ..workers import celery_app as celery_tasks
+from .task_store import TaskStore
 from .models import (
     UploadResponse, 
     StatusResponse, 
@@ -26,6 +34,7 @@ from .models import (
     ProtocolResponse, 
     ErrorResponse, 
     MeetingInfo, 
+    MeetingInfoIn,
     ProcessingStatus,
     TasksResponse,
     ProtocolsResponse
@@ -36,8 +45,24 @@ logger = get_default_logger(__name__)
 # Создаем роутер для API
 router = APIRouter(prefix="/api/v1", tags=["API"])
 
-# Словарь для хранения информации о задачах
-tasks_info: Dict[str, Dict[str, Any]] = {}
+# Хранилище информации о задачах: Redis, если задан REDIS_URL, чтобы
+# состояние задач было общим для всех воркеров, иначе память процесса.
+# Старые задачи удаляются, чтобы хранилище не росло со временем работы
+tasks_info = TaskStore(
+    redis_url=config.redis_url,
+    ttl=config.tasks_ttl,
+    maxsize=config.tasks_max_count
+)
+
+# Воркер Celery пишет статус задач в свое хранилище, поэтому очередь
+# используется, только если хранилище общее (Redis). Иначе веб-процесс не
+# увидел бы изменений статуса, и задачи выполняются через BackgroundTasks
+USE_CELERY = celery_tasks.is_celery_enabled() and tasks_info.redis_client is not None
+if celery_tasks.is_celery_enabled() and not USE_CELERY:
+    logger.warning(
+        "Celery broker is configured but the task store is not shared via Redis "
+        "(REDIS_URL), using BackgroundTasks"
+    )
 
 # Инициализируем конвейер
 pipeline = Pipeline()
@@ -45,9 +70,85 @@ pipeline = Pipeline()
 # Инициализируем кеш
 cache = get_cache()
 
+# Статистика кеша запрашивается мониторингом часто, а размер кеша требует
+# запроса к Redis или обхода директории: результат хранится CACHE_STATS_TTL секунд
+CACHE_STATS_TTL = 0.5
+_cache_stats_cache: Dict[str, Any] = {"ts": 0.0, "stats": None}
+_cache_stats_lock = asyncio.Lock()
+
 # Инициализируем сборщик метрик
 metrics_collector = get_metrics_collector()
 
+# Адаптер для проверки и сериализации протоколов в потоковом ответе
+_PROTOCOL_ADAPTER = TypeAdapter(Protocol)
+
+# Поддерживаемые расширения аудиофайлов
+AUDIO_EXTENSIONS = frozenset({".mp3", ".wav", ".m4a"})
+
+# Размер блока при сохранении загруженного файла
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Минимальный интервал (секунды) и шаг прогресса (проценты) между обновлениями
+# статуса задачи из progress_callback
+PROGRESS_UPDATE_INTERVAL = 0.25
+PROGRESS_UPDATE_STEP = 1.0
+
+def _copy_spooled_file(source: Any, file_path: Path) -> None:
+    """
+    Копирует временный файл загрузки на диск через os.sendfile
+    
+    Args:
+        source: Временный файл загрузки, сброшенный на диск
+        file_path: Путь для сохранения
+    """
+    source.flush()
+    source_fd = source.fileno()
+    size = os.fstat(source_fd).st_size
+    
+    with open(file_path, "wb") as target:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(target.fileno(), source_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+async def save_upload_file(file: UploadFile, file_path: Path) -> None:
+    """
+    Сохраняет загруженный файл на диск блоками по UPLOAD_CHUNK_SIZE
+    
+    Файл не читается в память целиком, а запись на диск выполняется в пуле
+    потоков, поэтому цикл событий не блокируется на больших аудиофайлах.
+    Если Starlette уже сбросил загрузку во временный файл на диске, он
+    копируется ядром через os.sendfile, без чтения данных в Python.
+    
+    Args:
+        file: Загруженный файл
+        file_path: Путь для сохранения
+    """
+    # _rolled - признак SpooledTemporaryFile, что данные уже лежат на диске
+    if hasattr(os, "sendfile") and getattr(file.file, "_rolled", False):
+        await run_in_threadpool(_copy_spooled_file, file.file, file_path)
+        return
+    
+    f = await run_in_threadpool(open, file_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(f.write, chunk)
+    finally:
+        await run_in_threadpool(f.close)
+
+def update_active_tasks_metric() -> None:
+    """
+    Передает в метрики количество ожидающих и выполняющихся задач
+    и общее количество задач в хранилище
+    
+    Количество берется из индекса статусов хранилища, без обхода всех задач.
+    """
+    counts = tasks_info.status_counts()
+    track_active_tasks(counts[ProcessingStatus.PENDING.value] + counts[ProcessingStatus.PROCESSING.value])
+    track_stored_tasks(len(tasks_info))
+
 def update_task_status(
     task_id: str, 
     status: ProcessingStatus, 
@@ -56,7 +157,7 @@ def update_task_status(
     result: Optional[Dict[str, Any]] = None
 ) -> None:
     """
-    Обновляет статус задачи в словаре tasks_info
+    Обновляет статус задачи в хранилище tasks_info
     
     Args:
         task_id: Идентификатор задачи
@@ -65,36 +166,196 @@ def update_task_status(
         message: Сообщение о статусе
         result: Результат выполнения задачи
     """
-    if task_id not in tasks_info:
-        tasks_info[task_id] = {}
-    
-    tasks_info[task_id].update({
+    now = time.time()
+    fields = {
         "status": status,
         "progress": progress,
         "message": message,
-        "updated_at": datetime.now().isoformat()
-    })
+        "updated_at": datetime.fromtimestamp(now).isoformat(),
+        "updated_ts": now
+    }
     
     if result:
-        tasks_info[task_id]["result"] = result
+        fields["result"] = result
+    
+    if not tasks_info.update_task(task_id, fields):
+        # Задачу удалили, пока конвейер еще работал: не восстанавливаем ее
+        logger.debug("Task %s no longer exists, status update skipped", task_id)
+        return
     
     # Обновляем метрики
     metrics_collector.task_status_update(task_id, status.value, progress)
-    track_active_tasks(tasks_info)
+    update_active_tasks_metric()
+    
+    logger.debug("Updated task %s: status=%s, progress=%s, message=%s", task_id, status, progress, message)
+
+# Текущая секунда и ее представление ISO 8601 для now_iso()
+_now_iso_cache: Tuple[int, str] = (0, "")
+
+def now_iso() -> str:
+    """
+    Возвращает текущее время в формате ISO 8601 с точностью до секунды
     
-    logger.debug(f"Updated task {task_id}: status={status}, progress={progress}, message={message}")
+    Строка строится один раз в секунду и переиспользуется, поэтому частые
+    запросы проверок состояния не вызывают datetime.now().isoformat() каждый
+    раз. Кортеж (секунда, строка) заменяется одним присваиванием, так что
+    потоки не видят несогласованную пару.
+    
+    Returns:
+        Текущее время вида "2025-05-25T12:00:00"
+    """
+    global _now_iso_cache
+    second = int(time.time())
+    cached_second, cached_iso = _now_iso_cache
+    if second != cached_second:
+        cached_iso = datetime.fromtimestamp(second).isoformat()
+        _now_iso_cache = (second, cached_iso)
+    return cached_iso
 
-async def process_audio_task(
+def _file_mtime_ns(file_path: str) -> Optional[int]:
+    """
+    Возвращает время изменения файла в наносекундах
+    
+    Args:
+        file_path: Путь к файлу
+        
+    Returns:
+        Время изменения или None, если файла нет
+    """
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except OSError:
+        return None
+
+def _file_stat_fields(file_path: str) -> Optional[List[float]]:
+    """
+    Возвращает поля os.stat_result файла в виде, пригодном для хранения в tasks_info
+    
+    Времена сохраняются как float, поэтому восстановленный через
+    os.stat_result(...) результат дает те же заголовки Last-Modified и ETag,
+    что и свежий вызов os.stat.
+    
+    Args:
+        file_path: Путь к файлу
+        
+    Returns:
+        Список из десяти полей stat или None, если файла нет
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return [*st[:7], st.st_atime, st.st_mtime, st.st_ctime]
+
+def make_progress_callback(
+    task_id: str,
+    start: float,
+    scale: float
+) -> Callable[[str, float], None]:
+    """
+    Создает функцию обратного вызова для отслеживания прогресса задачи
+    
+    Конвейер сообщает о прогрессе очень часто, поэтому статус обновляется
+    только при смене этапа, изменении прогресса не менее чем на
+    PROGRESS_UPDATE_STEP процентов или не чаще раза в PROGRESS_UPDATE_INTERVAL
+    секунд. Пропущенное значение запоминается и записывается перед сменой
+    этапа или вызовом progress_callback.flush() по завершении конвейера.
+    
+    Args:
+        task_id: Идентификатор задачи
+        start: Прогресс задачи в начале работы конвейера
+        scale: Множитель для перевода прогресса конвейера (0-100) в прогресс задачи
+        
+    Returns:
+        Функция обратного вызова (stage, progress_value) с методом flush()
+    """
+    last_stage: Optional[str] = None
+    last_progress = 0.0
+    last_time = 0.0
+    pending: Optional[Tuple[str, float]] = None
+    
+    def write(stage: str, progress_value: float) -> None:
+        update_task_status(
+            task_id=task_id,
+            status=ProcessingStatus.PROCESSING,
+            progress=start + progress_value * scale,
+            message=f"Обработка: {stage}"
+        )
+    
+    def flush() -> None:
+        nonlocal pending
+        if pending is not None:
+            write(*pending)
+            pending = None
+    
+    def progress_callback(stage: str, progress_value: float) -> None:
+        nonlocal last_stage, last_progress, last_time, pending
+        
+        now = time.monotonic()
+        if (
+            stage == last_stage
+            and progress_value - last_progress < PROGRESS_UPDATE_STEP
+            and now - last_time < PROGRESS_UPDATE_INTERVAL
+        ):
+            pending = (stage, progress_value)
+            return
+        
+        # Последнее значение предыдущего этапа не теряется
+        if stage != last_stage:
+            flush()
+        
+        pending = None
+        last_stage, last_progress, last_time = stage, progress_value, now
+        write(stage, progress_value)
+    
+    progress_callback.flush = flush
+    return progress_callback
+
+def build_file_stem(metadata: Dict[str, Any]) -> str:
+    """
+    Формирует имя файлов протокола без расширения
+    
+    Args:
+        metadata: Метаданные протокола
+        
+    Returns:
+        Имя вида "{дата}_{название}"
+    """
+    date = metadata.get("date") or datetime.now().strftime("%Y-%m-%d")
+    return f"{date}_{metadata.get('title', 'protocol')}"
+
+def build_result_files(output_dir: Path, file_stem: str) -> Dict[str, str]:
+    """
+    Формирует пути к файлам протокола в директории результатов
+    
+    Args:
+        output_dir: Директория для сохранения результатов
+        file_stem: Имя файлов протокола без расширения
+        
+    Returns:
+        Словарь с путями к JSON- и Markdown-файлам
+    """
+    base_path = output_dir / file_stem
+    return {
+        "json": f"{base_path}.json",
+        "md": f"{base_path}.md"
+    }
+
+def process_audio_task(
     task_id: str,
     file_path: Path,
     output_dir: Path,
     metadata: Dict[str, Any],
     language: Optional[str] = None,
-    skip_notifications: bool = False
+    skip_notifications: bool = False,
+    file_stem: Optional[str] = None
 ) -> None:
     """
     Фоновая задача для обработки аудиофайла
     
+    Функция синхронная: BackgroundTasks выполняет ее в пуле потоков, не
+    блокируя цикл событий, а воркер Celery вызывает ее напрямую.
+    
     Args:
         task_id: Идентификатор задачи
         file_path: Путь к аудиофайлу
@@ -102,7 +363,12 @@ async def process_audio_task(
         metadata: Метаданные протокола
         language: Язык аудио
         skip_notifications: Пропустить отправку уведомлений
+        file_stem: Имя файлов протокола без расширения (если None, строится
+                   из метаданных)
     """
+    if file_stem is None:
+        file_stem = build_file_stem(metadata)
+    
     try:
         # Обновляем статус задачи
         update_task_status(
@@ -112,28 +378,25 @@ async def process_audio_task(
             message="Начало обработки аудиофайла"
         )
         
-        # Определяем функцию обратного вызова для отслеживания прогресса
-        def progress_callback(stage: str, progress_value: float) -> None:
-            # Преобразуем прогресс в диапазон 5-95%
-            normalized_progress = 5.0 + progress_value * 0.9
-            update_task_status(
-                task_id=task_id,
-                status=ProcessingStatus.PROCESSING,
-                progress=normalized_progress,
-                message=f"Обработка: {stage}"
-            )
+        # Прогресс конвейера переводится в диапазон 5-95%
+        progress_callback = make_progress_callback(task_id, start=5.0, scale=0.9)
         
         # Обрабатываем аудиофайл
-        result = pipeline.process_audio_file(
-            audio_path=file_path,
-            output_dir=output_dir,
-            language=language,
-            meeting_info=metadata,
-            skip_notifications=skip_notifications,
-            progress_callback=progress_callback
-        )
+        try:
+            result = pipeline.process_audio_file(
+                audio_path=file_path,
+                output_dir=output_dir,
+                language=language,
+                meeting_info=metadata,
+                skip_notifications=skip_notifications,
+                progress_callback=progress_callback
+            )
+        finally:
+            # Записываем прогресс, пропущенный при прореживании
+            progress_callback.flush()
         
         # Обновляем статус задачи
+        files = build_result_files(output_dir, file_stem)
         update_task_status(
             task_id=task_id,
             status=ProcessingStatus.COMPLETED,
@@ -142,18 +405,17 @@ async def process_audio_task(
             result={
                 "protocol": result.to_dict() if hasattr(result, "to_dict") else result,
                 "output_dir": str(output_dir),
-                "files": {
-                    "json": str(output_dir / f"{metadata.get('date', datetime.now().strftime('%Y-%m-%d'))}_{metadata.get('title', 'protocol')}.json"),
-                    "md": str(output_dir / f"{metadata.get('date', datetime.now().strftime('%Y-%m-%d'))}_{metadata.get('title', 'protocol')}.md")
-                }
+                "files": files,
+                "file_stats": {kind: _file_stat_fields(path) for kind, path in files.items()},
+                "json_mtime_ns": _file_mtime_ns(files["json"])
             }
         )
         
-        logger.info(f"Task {task_id} completed successfully")
+        logger.info("Task %s completed successfully", task_id)
         
     except (ASRError, LLMError, NotificationError, ConfigError, ValidationError) as e:
         # Обрабатываем известные ошибки
-        logger.error(f"Task {task_id} failed with error: {str(e)}")
+        logger.error("Task %s failed with error: %s", task_id, e)
         update_task_status(
             task_id=task_id,
             status=ProcessingStatus.FAILED,
@@ -162,7 +424,7 @@ async def process_audio_task(
         )
     except Exception as e:
         # Обрабатываем неизвестные ошибки
-        logger.exception(f"Task {task_id} failed with unexpected error: {str(e)}")
+        logger.exception("Task %s failed with unexpected error: %s", task_id, e)
         update_task_status(
             task_id=task_id,
             status=ProcessingStatus.FAILED,
@@ -170,13 +432,14 @@ async def process_audio_task(
             message=f"Неизвестная ошибка: {str(e)}"
         )
 
-async def process_transcript_task(
+def process_transcript_task(
     task_id: str,
     file_path: Path,
     output_dir: Path,
     metadata: Dict[str, Any],
     language: Optional[str] = None,
-    skip_notifications: bool = False
+    skip_notifications: bool = False,
+    file_stem: Optional[str] = None
 ) -> None:
     """
     Фоновая задача для обработки JSON-файла транскрипта
@@ -188,7 +451,12 @@ async def process_transcript_task(
         metadata: Метаданные протокола
         language: Язык транскрипта
         skip_notifications: Пропустить отправку уведомлений
+        file_stem: Имя файлов протокола без расширения (если None, строится
+                   из метаданных)
     """
+    if file_stem is None:
+        file_stem = build_file_stem(metadata)
+    
     try:
         # Обновляем статус задачи
         update_task_status(
@@ -198,28 +466,25 @@ async def process_transcript_task(
             message="Начало обработки транскрипта"
         )
         
-        # Определяем функцию обратного вызова для отслеживания прогресса
-        def progress_callback(stage: str, progress_value: float) -> None:
-            # Преобразуем прогресс в диапазон 10-95%
-            normalized_progress = 10.0 + progress_value * 0.85
-            update_task_status(
-                task_id=task_id,
-                status=ProcessingStatus.PROCESSING,
-                progress=normalized_progress,
-                message=f"Обработка: {stage}"
-            )
+        # Прогресс конвейера переводится в диапазон 10-95%
+        progress_callback = make_progress_callback(task_id, start=10.0, scale=0.85)
         
         # Обрабатываем JSON-файл транскрипта
-        result = pipeline.process_transcript_json(
-            transcript_path=file_path,
-            output_dir=output_dir,
-            language=language,
-            meeting_info=metadata,
-            skip_notifications=skip_notifications,
-            progress_callback=progress_callback
-        )
+        try:
+            result = pipeline.process_transcript_json(
+                transcript_path=file_path,
+                output_dir=output_dir,
+                language=language,
+                meeting_info=metadata,
+                skip_notifications=skip_notifications,
+                progress_callback=progress_callback
+            )
+        finally:
+            # Записываем прогресс, пропущенный при прореживании
+            progress_callback.flush()
         
         # Обновляем статус задачи
+        files = build_result_files(output_dir, file_stem)
         update_task_status(
             task_id=task_id,
             status=ProcessingStatus.COMPLETED,
@@ -228,18 +493,17 @@ async def process_transcript_task(
             result={
                 "protocol": result.to_dict() if hasattr(result, "to_dict") else result,
                 "output_dir": str(output_dir),
-                "files": {
-                    "json": str(output_dir / f"{metadata.get('date', datetime.now().strftime('%Y-%m-%d'))}_{metadata.get('title', 'protocol')}.json"),
-                    "md": str(output_dir / f"{metadata.get('date', datetime.now().strftime('%Y-%m-%d'))}_{metadata.get('title', 'protocol')}.md")
-                }
+                "files": files,
+                "file_stats": {kind: _file_stat_fields(path) for kind, path in files.items()},
+                "json_mtime_ns": _file_mtime_ns(files["json"])
             }
         )
         
-        logger.info(f"Task {task_id} completed successfully")
+        logger.info("Task %s completed successfully", task_id)
         
     except (LLMError, NotificationError, ConfigError, ValidationError) as e:
         # Обрабатываем известные ошибки
-        logger.error(f"Task {task_id} failed with error: {str(e)}")
+        logger.error("Task %s failed with error: %s", task_id, e)
         update_task_status(
             task_id=task_id,
             status=ProcessingStatus.FAILED,
@@ -248,7 +512,7 @@ async def process_transcript_task(
         )
     except Exception as e:
         # Обрабатываем неизвестные ошибки
-        logger.exception(f"Task {task_id} failed with unexpected error: {str(e)}")
+        logger.exception("Task %s failed with unexpected error: %s", task_id, e)
         update_task_status(
             task_id=task_id,
             status=ProcessingStatus.FAILED,
@@ -256,6 +520,155 @@ async def process_transcript_task(
             message=f"Неизвестная ошибка: {str(e)}"
         )
 
+@lru_cache(maxsize=1)
+def _config_healthy() -> bool:
+    """
+    Проверяет конфигурацию приложения один раз за время жизни процесса
+    
+    Конфигурация не меняется во время работы, поэтому результат полной
+    проверки кешируется. После изменения настроек кеш сбрасывается
+    вызовом _config_healthy.cache_clear().
+    
+    Returns:
+        True, если конфигурация валидна
+    """
+    return is_config_healthy()
+
+@lru_cache(maxsize=1024)
+def _load_protocol(json_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Загружает протокол из JSON-файла с кешированием
+    
+    Время изменения файла входит в ключ кеша, поэтому после перезаписи файла
+    протокол читается заново. Возвращаемый словарь общий для всех вызовов и
+    не должен изменяться.
+    
+    Args:
+        json_path: Путь к JSON-файлу протокола
+        mtime_ns: Время изменения файла в наносекундах
+        
+    Returns:
+        Данные протокола
+    """
+    with open(json_path, "rb") as f:
+        return orjson.loads(f.read())
+
+def file_download_response(
+    file_path: Union[str, Path],
+    media_type: str,
+    filename: str,
+    stat_result: Optional[os.stat_result] = None
+) -> Response:
+    """
+    Формирует ответ для скачивания файла результата
+    
+    Если задан config.x_accel_redirect_prefix и файл лежит в output_dir,
+    содержимое отдает nginx по заголовку X-Accel-Redirect, не копируя байты
+    через Python. Иначе возвращается FileResponse с заранее полученным
+    stat_result, чтобы Starlette не выполнял stat повторно.
+    
+    Args:
+        file_path: Путь к файлу
+        media_type: MIME-тип файла
+        filename: Имя файла для скачивания
+        stat_result: Сохраненный ранее результат os.stat для файла (если None,
+                     stat выполняется при формировании ответа)
+        
+    Returns:
+        Ответ со ссылкой для nginx или с содержимым файла
+    """
+    prefix = config.x_accel_redirect_prefix
+    if prefix:
+        try:
+            relative_path = Path(file_path).resolve().relative_to(Path(config.output_dir).resolve())
+        except ValueError:
+            relative_path = None
+        
+        if relative_path is not None:
+            quoted_filename = quote(filename)
+            if quoted_filename != filename:
+                content_disposition = f"attachment; filename*=utf-8''{quoted_filename}"
+            else:
+                content_disposition = f'attachment; filename="{filename}"'
+            
+            return Response(
+                media_type=media_type,
+                headers={
+                    "X-Accel-Redirect": f"{prefix.rstrip('/')}/{quote(relative_path.as_posix())}",
+                    "Content-Disposition": content_disposition
+                }
+            )
+    
+    return FileResponse(
+        path=file_path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result if stat_result is not None else os.stat(file_path)
+    )
+
+def _iter_protocols_json(protocols: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Сериализует список протоколов в JSON вида ProtocolsResponse по частям
+    
+    Каждый протокол проверяется моделью Protocol так же, как при ответе через
+    response_model. Протоколы, не прошедшие проверку, пропускаются, потому что
+    после начала потоковой передачи ответить ошибкой уже нельзя.
+    
+    Args:
+        protocols: Данные протоколов
+        
+    Yields:
+        Части JSON-документа
+    """
+    yield b'{"protocols":['
+    separator = b""
+    for protocol in protocols:
+        try:
+            protocol_json = _PROTOCOL_ADAPTER.dump_json(_PROTOCOL_ADAPTER.validate_python(protocol))
+        except PydanticValidationError as e:
+            logger.warning("Протокол %s не соответствует схеме и пропущен: %s", protocol.get('id'), e)
+            continue
+        yield separator + protocol_json
+        separator = b","
+    yield b"]}"
+
+def _read_task_protocol(task_id: str, task_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Загружает протокол завершенной задачи для списка протоколов
+    
+    Args:
+        task_id: Идентификатор задачи
+        task_info: Информация о задаче
+        
+    Returns:
+        Копия данных протокола с полем id или None, если протокол недоступен
+    """
+    try:
+        # Проверяем наличие результата
+        if "result" not in task_info or not task_info["result"] or "files" not in task_info["result"]:
+            return None
+        
+        # Проверяем наличие JSON-файла протокола
+        json_path = task_info["result"]["files"].get("json")
+        if not json_path:
+            return None
+        
+        # Файлы протокола не меняются после завершения задачи, поэтому время
+        # изменения записывается в результат один раз и stat не нужен
+        if "json_mtime_ns" in task_info["result"]:
+            mtime_ns = task_info["result"]["json_mtime_ns"]
+        else:
+            mtime_ns = _file_mtime_ns(json_path)
+        if mtime_ns is None:
+            return None
+        
+        # Загружаем протокол из кеша и добавляем к копии ID задачи
+        return dict(_load_protocol(json_path, mtime_ns), id=task_id)
+        
+    except Exception as e:
+        logger.warning("Ошибка при загрузке протокола для задачи %s: %s", task_id, e)
+        return None
+
 @router.post(
     "/upload",
     response_model=UploadResponse,
@@ -279,8 +692,7 @@ async def upload_audio(
     Загрузка и обработка аудиофайла или JSON-файла транскрипта
     """
     # Проверяем, что конфигурация корректна
-    from ..utils.config_validator import is_config_healthy
-    if not is_config_healthy():
+    if not _config_healthy():
         raise HTTPException(
             status_code=500,
             detail="Некорректная конфигурация приложения. Проверьте настройки и API-ключи."
@@ -289,26 +701,21 @@ async def upload_audio(
     # Генерируем уникальный идентификатор задачи
     task_id = str(uuid.uuid4())
     
-    # Парсим информацию о встрече
+    # Парсим и проверяем информацию о встрече
     metadata = {}
     if meeting_info:
         try:
-            metadata = json.loads(meeting_info)
-        except json.JSONDecodeError:
-            raise HTTPException(
-                status_code=400,
-                detail="Некорректный формат информации о встрече. Ожидается JSON."
-            )
+            metadata = MeetingInfoIn.model_validate_json(meeting_info).model_dump()
+        except PydanticValidationError as e:
+            if e.errors()[0]["type"] == "json_invalid":
+                detail = "Некорректный формат информации о встрече. Ожидается JSON."
+            else:
+                detail = "Некорректный формат информации о встрече. Ожидается JSON-объект с полями title и date в виде строк."
+            raise HTTPException(status_code=400, detail=detail)
     
-    # Проверяем, что metadata - это словарь
-    if not isinstance(metadata, dict):
-        raise HTTPException(
-            status_code=400,
-            detail="Некорректный формат информации о встрече. Ожидается JSON-объект."
-        )
-    
-    # Проверяем формат файла
-    file_extension = os.path.splitext(file.filename)[1].lower() if file.filename else ""
+    # Проверяем формат файла (имя вида ".mp3" считается именем без расширения, как в os.path.splitext)
+    base_name, dot, extension = (file.filename or "").rpartition(".")
+    file_extension = f".{extension.lower()}" if dot and base_name.strip(".") else ""
     
     if is_transcript:
         # Проверяем, что файл - это JSON
@@ -319,7 +726,7 @@ async def upload_audio(
             )
     else:
         # Проверяем, что файл - это аудиофайл
-        if file_extension not in [".mp3", ".wav", ".m4a"]:
+        if file_extension not in AUDIO_EXTENSIONS:
             raise HTTPException(
                 status_code=415,
                 detail="Неподдерживаемый формат аудиофайла. Поддерживаются форматы: .mp3, .wav, .m4a"
@@ -335,8 +742,7 @@ async def upload_audio(
     # Сохраняем файл
     file_path = uploads_dir / f"{task_id}{file_extension}"
     
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    await save_upload_file(file, file_path)
     
     # Обновляем метаданные
     if "title" not in metadata or not metadata["title"]:
@@ -345,8 +751,44 @@ async def upload_audio(
     if "date" not in metadata or not metadata["date"]:
         metadata["date"] = datetime.now().strftime("%Y-%m-%d")
     
-    # Добавляем задачу в фоновые задачи
-    if is_transcript:
+    file_stem = build_file_stem(metadata)
+    
+    # Инициализируем информацию о задаче до постановки в очередь,
+    # чтобы воркер не успел обновить статус раньше создания записи
+    now = time.time()
+    created_at = datetime.fromtimestamp(now).isoformat()
+    tasks_info[task_id] = {
+        "task_id": task_id,
+        "file_name": file.filename,
+        "file_path": str(file_path),
+        "output_dir": str(output_dir),
+        "is_transcript": is_transcript,
+        "metadata": metadata,
+        "language": language,
+        "skip_notifications": skip_notifications,
+        "file_stem": file_stem,
+        "status": ProcessingStatus.PENDING,
+        "progress": 0.0,
+        "message": "Задача поставлена в очередь",
+        "created_at": created_at,
+        "updated_at": created_at,
+        "created_ts": now,
+        "updated_ts": now
+    }
+    
+    # Добавляем задачу в очередь Celery или в фоновые задачи
+    if USE_CELERY:
+        celery_task = celery_tasks.process_transcript if is_transcript else celery_tasks.process_audio
+        celery_task.delay(
+            task_id=task_id,
+            file_path=str(file_path),
+            output_dir=str(output_dir),
+            metadata=metadata,
+            language=language,
+            skip_notifications=skip_notifications,
+            file_stem=file_stem
+        )
+    elif is_transcript:
         background_tasks.add_task(
             process_transcript_task,
             task_id=task_id,
@@ -354,7 +796,8 @@ async def upload_audio(
             output_dir=output_dir,
             metadata=metadata,
             language=language,
-            skip_notifications=skip_notifications
+            skip_notifications=skip_notifications,
+            file_stem=file_stem
         )
     else:
         background_tasks.add_task(
@@ -364,29 +807,13 @@ async def upload_audio(
             output_dir=output_dir,
             metadata=metadata,
             language=language,
-            skip_notifications=skip_notifications
+            skip_notifications=skip_notifications,
+            file_stem=file_stem
         )
     
-    # Инициализируем информацию о задаче
-    tasks_info[task_id] = {
-        "task_id": task_id,
-        "file_name": file.filename,
-        "file_path": str(file_path),
-        "output_dir": str(output_dir),
-        "is_transcript": is_transcript,
-        "metadata": metadata,
-        "language": language,
-        "skip_notifications": skip_notifications,
-        "status": ProcessingStatus.PENDING,
-        "progress": 0.0,
-        "message": "Задача поставлена в очередь",
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
-    }
-    
     # Обновляем метрики
     metrics_collector.task_created(task_id)
-    track_active_tasks(tasks_info)
+    update_active_tasks_metric()
     
     # Возвращаем ответ
     return UploadResponse(
@@ -426,19 +853,28 @@ async def get_task_status(
     if task_info["status"] == ProcessingStatus.PROCESSING and task_info["progress"] > 0:
         # Вычисляем оставшееся время на основе прогресса и времени, прошедшего с начала обработки
         try:
-            created_at = datetime.fromisoformat(task_info["created_at"])
-            updated_at = datetime.fromisoformat(task_info["updated_at"])
-            elapsed_time = (updated_at - created_at).total_seconds()
+            # Записи, созданные до появления меток времени в секундах, содержат только ISO-строки
+            if "created_ts" in task_info and "updated_ts" in task_info:
+                created_ts = task_info["created_ts"]
+                updated_ts = task_info["updated_ts"]
+            else:
+                created_ts = datetime.fromisoformat(task_info["created_at"]).timestamp()
+                updated_ts = datetime.fromisoformat(task_info["updated_at"]).timestamp()
+            elapsed_time = updated_ts - created_ts
             
             if elapsed_time > 0 and task_info["progress"] > 0:
                 # Оцениваем общее время на основе текущего прогресса
                 total_time = elapsed_time / (task_info["progress"] / 100)
                 remaining_time = total_time - elapsed_time
                 
-                # Добавляем оставшееся время к текущему времени
-                estimated_completion = (updated_at + datetime.timedelta(seconds=remaining_time)).isoformat()
+                # Добавляем оставшееся время ко времени последнего обновления
+                estimated_completion = datetime.fromtimestamp(updated_ts + remaining_time).isoformat()
         except Exception as e:
-            logger.warning(f"Failed to estimate completion time for task {task_id}: {e}")
+            logger.warning("Failed to estimate completion time for task %s: %s", task_id, e)
+    
+    # Результат завершенной задачи, которую еще запрашивают, храним дольше
+    if task_info["status"] == ProcessingStatus.COMPLETED:
+        tasks_info.touch(task_id)
     
     # Возвращаем статус задачи
     return StatusResponse(
@@ -501,8 +937,8 @@ async def get_protocol(
                 detail=f"Файл протокола в формате Markdown не найден"
             )
         
-        return FileResponse(
-            path=md_file_path,
+        return file_download_response(
+            md_file_path,
             media_type="text/markdown",
             filename=os.path.basename(md_file_path)
         )
@@ -514,7 +950,7 @@ async def get_protocol(
     try:
         return ProtocolResponse.from_internal(protocol_data)
     except Exception as e:
-        logger.error(f"Failed to convert protocol to response model: {e}")
+        logger.error("Failed to convert protocol to response model: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Ошибка при преобразовании протокола: {str(e)}"
@@ -533,7 +969,7 @@ async def get_protocol(
 async def download_file(
     task_id: str = PathParam(..., description="Идентификатор задачи"),
     file_type: str = PathParam(..., description="Тип файла: 'md' для Markdown или 'json' для JSON")
-) -> FileResponse:
+) -> Response:
     """
     Скачивание файла результата
     """
@@ -582,8 +1018,8 @@ async def download_file(
         )
     
     # Возвращаем файл
-    return FileResponse(
-        path=file_path,
+    return file_download_response(
+        file_path,
         media_type=media_type,
         filename=os.path.basename(file_path)
     )
@@ -603,29 +1039,27 @@ async def get_tasks() -> TasksResponse:
     Получение списка всех задач
     """
     try:
-        # Преобразуем словарь задач в список
+        # Хранилище отдает задачи уже отсортированными по времени
+        # создания (новые сначала)
         tasks_list = []
-        for task_id, task_info in tasks_info.items():
+        for task_id, task_info in tasks_info.recent_items():
             # Создаем копию информации о задаче
             task_data = {
                 "task_id": task_id,
                 "status": task_info.get("status", ProcessingStatus.PENDING),
                 "message": task_info.get("message", ""),
                 "progress": task_info.get("progress", 0),
-                "created_at": task_info.get("created_at", datetime.now().isoformat()),
-                "updated_at": task_info.get("updated_at", datetime.now().isoformat()),
+                "created_at": task_info.get("created_at", now_iso()),
+                "updated_at": task_info.get("updated_at", now_iso()),
                 "file_name": task_info.get("file_name", ""),
                 "task_type": task_info.get("task_type", "audio_processing")
             }
             tasks_list.append(task_data)
         
-        # Сортируем задачи по времени создания (новые сначала)
-        tasks_list.sort(key=lambda x: x["created_at"], reverse=True)
-        
         return TasksResponse(tasks=tasks_list)
         
     except Exception as e:
-        logger.exception(f"Ошибка при получении списка задач: {str(e)}")
+        logger.exception("Ошибка при получении списка задач: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка при получении списка задач: {str(e)}")
 
 @router.get(
@@ -638,56 +1072,41 @@ async def get_tasks() -> TasksResponse:
         500: {"description": "Внутренняя ошибка сервера", "model": ErrorResponse}
     }
 )
-async def get_protocols() -> ProtocolsResponse:
+async def get_protocols() -> StreamingResponse:
     """
     Получение списка всех протоколов
     """
     try:
         # Получаем список задач со статусом 'completed'
-        completed_tasks = [task_id for task_id, task_info in tasks_info.items() 
-                          if task_info.get("status") == ProcessingStatus.COMPLETED]
+        completed_tasks = [
+            (task_id, task_info) for task_id, task_info in tasks_info.recent_items()
+            if task_info.get("status") == ProcessingStatus.COMPLETED
+        ]
         
-        # Получаем протоколы для завершенных задач
-        protocols_list = []
+        # Читаем файлы протоколов параллельно в пуле потоков, не блокируя цикл событий
+        protocols = await asyncio.gather(*(
+            asyncio.to_thread(_read_task_protocol, task_id, task_info)
+            for task_id, task_info in completed_tasks
+        ))
         
-        for task_id in completed_tasks:
-            try:
-                # Проверяем наличие результата
-                task_info = tasks_info[task_id]
-                if "result" not in task_info or not task_info["result"] or "files" not in task_info["result"]:
-                    continue
-                
-                # Проверяем наличие JSON-файла протокола
-                json_path = task_info["result"]["files"].get("json")
-                if not json_path or not os.path.exists(json_path):
-                    continue
-                
-                # Загружаем протокол из JSON-файла
-                with open(json_path, "r", encoding="utf-8") as f:
-                    protocol_data = json.load(f)
-                
-                # Добавляем ID задачи к протоколу
-                protocol_data["id"] = task_id
-                
-                # Добавляем протокол в список
-                protocols_list.append(protocol_data)
-                
-            except Exception as e:
-                logger.warning(f"Ошибка при загрузке протокола для задачи {task_id}: {str(e)}")
-                continue
-        
-        # Сортируем протоколы по дате (новые сначала)
-        protocols_list.sort(
-            key=lambda x: x.get("metadata", {}).get("date", "") 
-                if isinstance(x.get("metadata", {}).get("date", ""), str) 
-                else str(x.get("metadata", {}).get("date", "")), 
-            reverse=True
-        )
+        # Сортируем протоколы по дате (новые сначала): ключ сортировки
+        # вычисляется один раз для каждого протокола
+        dated_protocols = [
+            (str((protocol.get("metadata") or {}).get("date", "")), protocol)
+            for protocol in protocols
+            if protocol is not None
+        ]
+        dated_protocols.sort(key=itemgetter(0), reverse=True)
+        protocols_list = [protocol for _, protocol in dated_protocols]
         
-        return ProtocolsResponse(protocols=protocols_list)
+        # Ответ сериализуется по одному протоколу, без построения всего тела в памяти
+        return StreamingResponse(
+            _iter_protocols_json(protocols_list),
+            media_type="application/json"
+        )
         
     except Exception as e:
-        logger.exception(f"Ошибка при получении списка протоколов: {str(e)}")
+        logger.exception("Ошибка при получении списка протоколов: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка при получении списка протоколов: {str(e)}")
 
 @router.get(
@@ -728,8 +1147,8 @@ async def get_protocol_by_id(protocol_id: str = PathParam(..., description="Ид
             raise HTTPException(status_code=404, detail=f"Файл протокола не найден")
         
         # Загружаем протокол из JSON-файла
-        with open(json_path, "r", encoding="utf-8") as f:
-            protocol_data = json.load(f)
+        with open(json_path, "rb") as f:
+            protocol_data = orjson.loads(f.read())
         
         # Добавляем ID задачи к протоколу
         protocol_data["id"] = protocol_id
@@ -739,9 +1158,80 @@ async def get_protocol_by_id(protocol_id: str = PathParam(..., description="Ид
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.exception(f"Ошибка при получении протокола: {str(e)}")
+        logger.exception("Ошибка при получении протокола: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка при получении протокола: {str(e)}")
 
+# Маршрут объявлен раньше /protocols/{protocol_id}/{format}, иначе тот
+# перехватывает путь .../download
+@router.get(
+    "/protocols/{protocol_id}/download",
+    summary="Скачивание протокола",
+    description="Возвращает протокол в указанном формате",
+    responses={
+        200: {"description": "Файл протокола для скачивания"},
+        400: {"description": "Неверный формат", "model": ErrorResponse},
+        404: {"description": "Протокол не найден", "model": ErrorResponse}
+    }
+)
+async def download_protocol(
+    protocol_id: str = PathParam(..., description="Идентификатор протокола"),
+    format: str = Query("markdown", description="Формат файла: 'markdown' или 'json'")
+) -> Response:
+    """
+    Скачивание протокола в указанном формате
+    """
+    try:
+        if format not in ["markdown", "json"]:
+            raise HTTPException(status_code=400, detail="Неподдерживаемый формат. Используйте 'markdown' или 'json'")
+        
+        # Читаем задачу одним обращением к хранилищу
+        task_info = tasks_info.get(protocol_id)
+        if task_info is None:
+            raise HTTPException(status_code=404, detail=f"Протокол с ID {protocol_id} не найден")
+        
+        if task_info["status"] != "completed":
+            raise HTTPException(status_code=400, detail="Обработка протокола не завершена")
+        
+        # Определяем путь к файлу
+        if format == "markdown":
+            media_type = "text/markdown"
+            file_extension = "md"
+        else:  # json
+            media_type = "application/json"
+            file_extension = "json"
+        
+        # Пути к файлам и их stat записываются в результат при завершении задачи
+        result = task_info.get("result") or {}
+        file_path = result.get("files", {}).get(file_extension)
+        if not file_path:
+            raise HTTPException(status_code=404, detail=f"Файл протокола в формате {format} не найден")
+        
+        # Если stat не сохранен, выполняем его один раз вместо проверки
+        # exists() и повторного stat в FileResponse
+        stat_fields = result.get("file_stats", {}).get(file_extension)
+        if stat_fields:
+            stat_result = os.stat_result(stat_fields)
+        else:
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                raise HTTPException(status_code=404, detail=f"Файл протокола в формате {format} не найден")
+        
+        # Возвращаем файл
+        filename = f"protocol_{protocol_id}.{file_extension}"
+        return file_download_response(
+            file_path,
+            media_type=media_type,
+            filename=filename,
+            stat_result=stat_result
+        )
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.exception("Ошибка при скачивании протокола: %s", e)
+        raise HTTPException(status_code=500, detail=f"Ошибка при скачивании протокола: {str(e)}")
+
 @router.get(
     "/protocols/{protocol_id}/{format}",
     response_class=FileResponse,
@@ -756,7 +1246,7 @@ async def get_protocol_by_id(protocol_id: str = PathParam(..., description="Ид
 async def get_protocol_format(
     protocol_id: str = PathParam(..., description="Идентификатор протокола"),
     format: str = PathParam(..., description="Формат протокола: 'md' для Markdown или 'json' для JSON")
-) -> FileResponse:
+) -> Response:
     """
     Получение протокола в указанном формате
     """
@@ -800,16 +1290,16 @@ async def get_protocol_format(
         filename = f"protocol_{protocol_id}.{format_key}"
         
         # Возвращаем файл
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type=media_type
+        return file_download_response(
+            file_path,
+            media_type=media_type,
+            filename=filename
         )
         
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.exception(f"Ошибка при получении протокола: {str(e)}")
+        logger.exception("Ошибка при получении протокола: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка при получении протокола: {str(e)}")
 
 @router.delete(
@@ -827,48 +1317,71 @@ async def delete_task(task_id: str = PathParam(..., description="Идентиф
     Удаление задачи
     """
     try:
-        # Проверяем существование задачи
-        if task_id not in tasks_info:
+        # Удаляем задачу одной операцией: отдельная проверка существования
+        # оставляла окно, в котором задачу мог удалить параллельный запрос
+        task_info = tasks_info.pop(task_id, None)
+        if task_info is None:
             raise HTTPException(status_code=404, detail=f"Задача с ID {task_id} не найдена")
         
-        # Удаляем задачу из словаря
-        task_info = tasks_info.pop(task_id)
-        
         # Логируем удаление
-        logger.info(f"Задача {task_id} удалена")
+        logger.info("Задача %s удалена", task_id)
         
         # Обновляем метрики
-        metrics_collector.decrement_counter("active_tasks")
+        update_active_tasks_metric()
         
         return {"status": "success", "message": f"Задача {task_id} успешно удалена"}
         
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.exception(f"Ошибка при удалении задачи: {str(e)}")
+        logger.exception("Ошибка при удалении задачи: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка при удалении задачи: {str(e)}")
 
 
+def _collect_cache_stats() -> Dict[str, Any]:
+    """
+    Собирает статистику кеша
+    
+    Returns:
+        Словарь со статистикой кеша
+    """
+    return {
+        "healthy": True,
+        "timestamp": now_iso(),
+        "redis_available": cache.is_redis_available(),
+        "size": cache.get_cache_size(),
+        "type": type(cache).__name__
+    }
+
+def _get_cached_cache_stats() -> Optional[Dict[str, Any]]:
+    """Возвращает статистику кеша, если она моложе CACHE_STATS_TTL"""
+    stats = _cache_stats_cache["stats"]
+    if stats is not None and time.monotonic() - _cache_stats_cache["ts"] < CACHE_STATS_TTL:
+        return stats
+    return None
+
 @router.get("/cache/stats")
 async def get_cache_stats():
     """
     Получение статистики кеша
     """
     try:
-        cache = get_cache()
-        stats = {
-            "healthy": True,
-            "timestamp": datetime.now().isoformat(),
-            "redis_available": cache.is_redis_available() if hasattr(cache, 'is_redis_available') else True,
-            "size": cache.get_cache_size() if hasattr(cache, 'get_cache_size') else None,
-            "type": type(cache).__name__
-        }
+        stats = _get_cached_cache_stats()
+        if stats is None:
+            async with _cache_stats_lock:
+                stats = _get_cached_cache_stats()
+                if stats is None:
+                    # Размер кеша - запрос к Redis или обход директории, поэтому
+                    # считается в пуле потоков и не чаще раза в CACHE_STATS_TTL
+                    stats = await asyncio.to_thread(_collect_cache_stats)
+                    _cache_stats_cache["stats"] = stats
+                    _cache_stats_cache["ts"] = time.monotonic()
         return stats
     except Exception as e:
-        logger.exception(f"Ошибка получения статистики кеша: {str(e)}")
+        logger.exception("Ошибка получения статистики кеша: %s", e)
         return {
             "healthy": False,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "redis_available": False,
             "error": str(e)
         }
@@ -883,65 +1396,8 @@ async def clear_cache():
         cache = get_cache()
         if hasattr(cache, 'clear'):
             cache.clear()
+        _cache_stats_cache["stats"] = None
         return {"status": "success", "message": "Кеш успешно очищен"}
     except Exception as e:
-        logger.exception(f"Ошибка очистки кеша: {str(e)}")
+        logger.exception("Ошибка очистки кеша: %s", e)
         raise HTTPException(status_code=500, detail=f"Ошибка очистки кеша: {str(e)}")
-
-
-@router.get(
-    "/protocols/{protocol_id}/download",
-    summary="Скачивание протокола",
-    description="Возвращает протокол в указанном формате",
-    responses={
-        200: {"description": "Файл протокола для скачивания"},
-        400: {"description": "Неверный формат", "model": ErrorResponse},
-        404: {"description": "Протокол не найден", "model": ErrorResponse}
-    }
-)
-async def download_protocol(
-    protocol_id: str = PathParam(..., description="Идентификатор протокола"),
-    format: str = Query("markdown", description="Формат файла: 'markdown' или 'json'")
-) -> FileResponse:
-    """
-    Скачивание протокола в указанном формате
-    """
-    try:
-        if format not in ["markdown", "json"]:
-            raise HTTPException(status_code=400, detail="Неподдерживаемый формат. Используйте 'markdown' или 'json'")
-        
-        # Проверяем, существует ли задача с таким ID
-        if protocol_id not in tasks_info:
-            raise HTTPException(status_code=404, detail=f"Протокол с ID {protocol_id} не найден")
-        
-        task_info = tasks_info[protocol_id]
-        if task_info["status"] != "completed":
-            raise HTTPException(status_code=400, detail="Обработка протокола не завершена")
-        
-        # Определяем путь к файлу
-        if format == "markdown":
-            file_path = task_info.get("markdown_file")
-            media_type = "text/markdown"
-            file_extension = "md"
-        else:  # json
-            file_path = task_info.get("json_file")
-            media_type = "application/json"
-            file_extension = "json"
-        
-        if not file_path or not Path(file_path).exists():
-            raise HTTPException(status_code=404, detail=f"Файл протокола в формате {format} не найден")
-        
-        # Возвращаем файл
-        filename = f"protocol_{protocol_id}.{file_extension}"
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type=media_type
-        )
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        logger.exception(f"Ошибка при скачивании протокола: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Ошибка при скачивании протокола: {str(e)}")
-
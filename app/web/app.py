@@ -2,76 +2,54 @@
 FastAPI веб-интерфейс для конвейера генерации протоколов совещаний
 """
 import os
-import json
+import time
+import asyncio
 import logging
-from datetime import datetime, date
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 
+import orjson
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 
-from ..utils.logging import get_default_logger
+from ..utils.logging import get_default_logger, start_queue_logging, stop_queue_logging
 from ..config.config import config
-from ..utils.config_validator import get_config_health_status, is_config_healthy
+from ..utils.config_validator import get_config_health_status
 
 from ..utils.cache import get_cache
 from ..utils.metrics import get_metrics_collector
-from .api_routes import router as api_router
+from .api_routes import now_iso, router as api_router, upload_audio
 
-class CustomJSONEncoder(json.JSONEncoder):
-    """
-    Кастомный JSON-энкодер для сериализации datetime и других объектов
-    """
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
 from .auth_routes import router as auth_router
-from .models import ErrorResponse
 
 logger = get_default_logger(__name__)
 
-# Настраиваем кастомный JSON-энкодер для FastAPI
-def custom_json_encoder():
-    """
-    Функция для настройки кастомного JSON-энкодера в FastAPI
-    """
-    def default(obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-    
-    return default
-
 # Инициализируем FastAPI приложение
 app = FastAPI(
     title="Meeting Protocol Generator",
     description="API для генерации протоколов совещаний из аудиозаписей",
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_url="/openapi.json",
-    json_encoders={datetime: lambda dt: dt.isoformat(), date: lambda d: d.isoformat()}
+    # /openapi.json, /docs и /redoc объявлены ниже, чтобы отдавать схему
+    # готовыми байтами
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None
 )
 
 # Добавляем маршруты API
 app.include_router(api_router)
 app.include_router(auth_router)
 
-# Добавляем backward compatibility routes
-from fastapi import APIRouter
-compat_router = APIRouter(prefix="/api", tags=["Compatibility"])
-
-# Импортируем функцию upload из api_routes
-from .api_routes import upload_audio
-compat_router.add_api_route("/upload", upload_audio, methods=["POST"])
-app.include_router(compat_router)
+# Маршрут для обратной совместимости регистрируется прямо в приложении,
+# без отдельного роутера, и не попадает в схему OpenAPI
+app.add_api_route("/api/upload", upload_audio, methods=["POST"], include_in_schema=False)
 
 # Настраиваем CORS
 app.add_middleware(
@@ -126,29 +104,90 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+@app.on_event("startup")
+async def start_background_logging():
+    """Переводит запись логов в фоновый поток, чтобы запросы не ждали ввода-вывода"""
+    start_queue_logging()
+
+@app.on_event("shutdown")
+async def stop_background_logging():
+    """Дописывает оставшиеся в очереди логи при остановке приложения"""
+    stop_queue_logging()
+
+OPENAPI_URL = "/openapi.json"
+
+# Схема OpenAPI, сериализованная orjson
+_openapi_json: Optional[bytes] = None
+
+def get_openapi_json() -> bytes:
+    """
+    Возвращает схему OpenAPI, сериализованную в JSON
+    
+    Схема строится и сериализуется один раз: маршруты приложения после
+    запуска не меняются. Обычно это происходит при старте приложения, а при
+    запуске без событий жизненного цикла (например, в TestClient без
+    контекстного менеджера) - при первом запросе.
+    
+    Returns:
+        JSON-документ схемы
+    """
+    global _openapi_json
+    if _openapi_json is None:
+        _openapi_json = orjson.dumps(app.openapi())
+    return _openapi_json
+
+@app.on_event("startup")
+async def build_openapi_schema():
+    """Строит схему OpenAPI при запуске, а не при первом запросе документации"""
+    get_openapi_json()
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json() -> Response:
+    return Response(content=get_openapi_json(), media_type="application/json")
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui() -> HTMLResponse:
+    return get_swagger_ui_html(openapi_url=OPENAPI_URL, title=f"{app.title} - Swagger UI")
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc() -> HTMLResponse:
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
+
+def _error_response(detail: Any, status_code: int, path: str) -> JSONResponse:
+    """
+    Формирует ответ с ошибкой в формате ErrorResponse
+    
+    Словарь собирается напрямую, без создания и проверки модели ErrorResponse,
+    потому что все поля уже известны и корректны. Модель по-прежнему
+    описывает ответы с ошибками в схеме OpenAPI.
+    
+    Args:
+        detail: Описание ошибки
+        status_code: HTTP-код ошибки
+        path: Путь запроса
+        
+    Returns:
+        JSON-ответ с описанием ошибки
+    """
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "detail": detail,
+            "status_code": status_code,
+            "path": path,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
 # Обработчик исключений
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=ErrorResponse(
-            detail=exc.detail,
-            status_code=exc.status_code,
-            path=request.url.path
-        ).model_dump()
-    )
+    return _error_response(exc.detail, exc.status_code, request.url.path)
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.exception(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
-        status_code=500,
-        content=ErrorResponse(
-            detail=f"Internal Server Error: {str(exc)}",
-            status_code=500,
-            path=request.url.path
-        ).model_dump()
-    )
+    logger.exception("Unhandled exception: %s", exc)
+    return _error_response(f"Internal Server Error: {str(exc)}", 500, request.url.path)
 
 # Маршруты веб-интерфейса
 
@@ -182,46 +221,104 @@ async def protocols_page(request: Request):
     protocol_id = request.query_params.get("id")
     return templates.TemplateResponse("protocols.html", {"request": request, "protocol_id": protocol_id})
 
+def _collect_dir_status(directories: List[Tuple[str, Path, str, int]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Проверяет состояние директорий приложения
+    
+    Args:
+        directories: Кортежи (имя, путь, имя поля проверки доступа, режим для os.access)
+        
+    Returns:
+        Словарь с состоянием каждой директории
+    """
+    directories_status = {}
+    for name, path, access_field, access_mode in directories:
+        exists = os.path.exists(path)
+        directories_status[name] = {
+            "path": str(path),
+            "exists": exists,
+            "is_dir": os.path.isdir(path) if exists else False,
+            access_field: os.access(path, access_mode) if exists else False
+        }
+    return directories_status
+
+def _get_cache_size(cache_instance: Any) -> Optional[int]:
+    """
+    Возвращает размер кеша, если кеш его поддерживает
+    
+    Args:
+        cache_instance: Экземпляр кеша
+        
+    Returns:
+        Размер кеша или None
+    """
+    if cache_instance and hasattr(cache_instance, "size"):
+        return cache_instance.size()
+    return None
+
+# Кеш ответа /health: пробы мониторинга приходят каждые несколько секунд,
+# и почти все они получают одинаковый ответ
+_health_cache: Dict[str, Any] = {"ts": 0.0, "payload": None}
+_health_lock = asyncio.Lock()
+
+def _get_cached_health() -> Optional[bytes]:
+    """Возвращает сериализованный статус, если он моложе config.health_cache_ttl"""
+    payload = _health_cache["payload"]
+    if payload is not None and time.monotonic() - _health_cache["ts"] < config.health_cache_ttl:
+        return payload
+    return None
+
 # Health Check endpoint
 @app.get("/health", tags=["Monitoring"])
 async def health_check():
     """
     Health check endpoint для мониторинга состояния приложения
     
+    Ответ кешируется на config.health_cache_ttl секунд. Устаревший ответ
+    пересобирает только один запрос, остальные ждут его результата.
+    
     Returns:
         JSON с информацией о здоровье системы
     """
-    # Проверяем конфигурацию
-    config_status = get_config_health_status()
+    payload = _get_cached_health()
+    if payload is None:
+        async with _health_lock:
+            payload = _get_cached_health()
+            if payload is None:
+                # Статус сериализуем через orjson и храним готовые байты,
+                # минуя jsonable_encoder
+                payload = orjson.dumps(await _build_health_status())
+                _health_cache["payload"] = payload
+                _health_cache["ts"] = time.monotonic()
     
-    # Проверяем директории
-    directories_status = {
-        "uploads_dir": {
-            "path": config.uploads_dir,
-            "exists": os.path.exists(config.uploads_dir),
-            "is_dir": os.path.isdir(config.uploads_dir) if os.path.exists(config.uploads_dir) else False,
-            "writable": os.access(config.uploads_dir, os.W_OK) if os.path.exists(config.uploads_dir) else False
-        },
-        "output_dir": {
-            "path": config.output_dir,
-            "exists": os.path.exists(config.output_dir),
-            "is_dir": os.path.isdir(config.output_dir) if os.path.exists(config.output_dir) else False,
-            "writable": os.access(config.output_dir, os.W_OK) if os.path.exists(config.output_dir) else False
-        },
-        "prompt_templates_dir": {
-            "path": config.prompt_templates_dir,
-            "exists": os.path.exists(config.prompt_templates_dir),
-            "is_dir": os.path.isdir(config.prompt_templates_dir) if os.path.exists(config.prompt_templates_dir) else False,
-            "readable": os.access(config.prompt_templates_dir, os.R_OK) if os.path.exists(config.prompt_templates_dir) else False
-        }
-    }
+    return Response(content=payload, media_type="application/json")
+
+async def _build_health_status() -> Dict[str, Any]:
+    """
+    Собирает информацию о состоянии приложения
     
-    # Проверяем кеш
+    Returns:
+        Словарь со статусом конфигурации, директорий, кеша и метрик
+    """
     cache_instance = get_cache()
+    
+    # Проверки конфигурации, директорий и размера кеша обращаются к диску,
+    # поэтому выполняются параллельно в пуле потоков, не блокируя цикл событий
+    config_status, directories_status, cache_size = await asyncio.gather(
+        asyncio.to_thread(get_config_health_status),
+        asyncio.to_thread(_collect_dir_status, [
+            ("uploads_dir", config.uploads_dir, "writable", os.W_OK),
+            ("output_dir", config.output_dir, "writable", os.W_OK),
+            ("prompt_templates_dir", config.prompt_templates_dir, "readable", os.R_OK)
+        ]),
+        asyncio.to_thread(_get_cache_size, cache_instance)
+    )
+    
+    # Проверяем кеш
     cache_status = {
         "initialized": cache_instance is not None,
         "type": type(cache_instance).__name__ if cache_instance else None,
-        "size": cache_instance.size() if cache_instance and hasattr(cache_instance, "size") else None
+        "size": cache_size
     }
     
     # Проверяем метрики
@@ -233,8 +330,8 @@ async def health_check():
     
     # Собираем общий статус
     status = {
-        "status": "healthy" if is_config_healthy() else "unhealthy",
-        "timestamp": datetime.now().isoformat(),
+        "status": "healthy" if config_status["healthy"] else "unhealthy",
+        "timestamp": now_iso(),
         "components": {
             "config": config_status,
             "directories": directories_status,
@@ -278,14 +375,24 @@ def start():
     host = getattr(config, "web_host", "0.0.0.0")
     port = getattr(config, "web_port", 8080)
     reload = getattr(config, "debug_mode", False)
+    # Несколько воркеров требуют общего хранилища задач (REDIS_URL), поэтому
+    # по умолчанию запускается один процесс; с reload воркер всегда один
+    workers = 1 if reload else config.web_workers
+    access_log = config.web_access_log
     
-    logger.info(f"Starting web server on {host}:{port} (reload={reload})")
+    logger.info("Starting web server on %s:%s (reload=%s, workers=%s)", host, port, reload, workers)
     
+    # loop="auto" и http="auto" выбирают uvloop и httptools, если они
+    # установлены (uvicorn[standard]), иначе asyncio и h11
     uvicorn.run(
         "app.web.app:app",
         host=host,
         port=port,
-        reload=reload
+        reload=reload,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        access_log=access_log
     )
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 
 from ..services.auth_service import UserCreate, Token, UserInDB
 from ..services.auth_dependencies import (
@@ -41,7 +42,8 @@ async def register(
         HTTPException: Если пользователь уже существует
     """
     try:
-        user = auth_service.create_user(user_create)
+        # Хеширование пароля и запись на диск выполняются в пуле потоков
+        user = await run_in_threadpool(auth_service.create_user, user_create)
         return {
             "message": "User registered successfully",
             "username": user.username,
@@ -71,7 +73,9 @@ async def login(
     Raises:
         HTTPException: Если аутентификация не удалась
     """
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    # Проверка пароля (bcrypt) нагружает CPU, поэтому выполняется в пуле
+    # потоков, не блокируя цикл событий для параллельных запросов
+    user = await run_in_threadpool(auth_service.authenticate_user, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -82,8 +86,8 @@ async def login(
     # Создаем токен
     access_token = auth_service.create_access_token(user)
     
-    # Создаем сессию
-    session = auth_service.create_session(user)
+    # Создаем сессию (сохранение на диск выполняется в пуле потоков)
+    session = await run_in_threadpool(auth_service.create_session, user)
     
     # Устанавливаем cookie с session_id
     if response:
@@ -228,20 +232,8 @@ async def list_users():
     Returns:
         Список пользователей
     """
-    users = list(auth_service.users.values())
-    return {
-        "users": [
-            {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "roles": user.roles,
-                "is_active": user.is_active,
-                "created_at": user.created_at.isoformat()
-            }
-            for user in users
-        ]
-    }
+    # Строки пользователей собираются при изменении, а не при каждом запросе
+    return {"users": [user.json_row for user in list(auth_service.users.values())]}
 
 @router.put("/admin/users/{username}/roles", dependencies=[Depends(require_admin)])
 async def update_user_roles(
@@ -258,17 +250,14 @@ async def update_user_roles(
     Returns:
         Обновленная информация о пользователе
     """
-    user = auth_service.get_user(username)
+    # Роли меняются и сохраняются под блокировкой сервиса
+    user = await run_in_threadpool(auth_service.set_user_roles, username, roles)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Обновляем роли
-    user.roles = roles
-    auth_service._save_data()
-    
     return {
         "username": user.username,
         "roles": user.roles,
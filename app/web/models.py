@@ -35,6 +35,27 @@ class MeetingInfo(BaseModel):
         }
     }
 
+class MeetingInfoIn(BaseModel):
+    """
+    Информация о встрече из формы загрузки
+    
+    Все поля необязательны, дополнительные поля сохраняются в метаданных
+    протокола. Модель разбирается напрямую из JSON-строки формы через
+    model_validate_json.
+    """
+    title: Optional[str] = None
+    date: Optional[str] = None
+    
+    model_config = {
+        "extra": "allow",
+        "json_schema_extra": {
+            "properties": {
+                "title": {"description": "Название встречи"},
+                "date": {"description": "Дата встречи (YYYY-MM-DD)"}
+            }
+        }
+    }
+
 class UploadResponse(BaseModel):
     """
     Ответ на загрузку аудиофайла
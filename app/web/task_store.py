@@ -0,0 +1,437 @@
+"""
+Хранилище информации о задачах обработки
+"""
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import orjson
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+from ..utils.logging import get_default_logger
+from .models import ProcessingStatus
+
+logger = get_default_logger(__name__)
+
+class TaskStore(MutableMapping):
+    """
+    Словарь задач с хранением в Redis и fallback на память процесса
+
+    В Redis каждая задача хранится в хеше task:{id} (значения полей
+    сериализованы orjson), а сортированное множество tasks:by_created
+    индексирует задачи по времени создания. Так состояние задач общее для
+    всех воркеров, а список последних задач читается без сортировки в Python.
+    Множества tasks:status:{статус} (в памяти - обычные множества) хранят
+    идентификаторы задач в каждом статусе, поэтому количество задач по
+    статусам считается без обхода всех записей.
+
+    Значения, возвращаемые при чтении из Redis, - копии: изменения записи
+    нужно сохранять через update_task() или присваивание. Создается запись
+    только присваиванием, update_task() обновляет лишь существующие задачи.
+
+    В памяти процесса update_task() не изменяет запись, а заменяет ее новым
+    словарем одним присваиванием. Читатели из других потоков без блокировок
+    видят либо старую, либо новую запись целиком, а писатели одной задачи
+    сериализуются блокировкой ее сегмента.
+
+    Задачи хранятся не дольше ttl секунд с последнего обновления и не более
+    maxsize штук (лишними считаются самые старые). В Redis срок задается
+    командой EXPIRE для хеша задачи, а индексы очищаются при чтении списка
+    задач и подсчете задач по статусам; в памяти просроченные записи удаляются при записи не реже раза в
+    _SWEEP_INTERVAL секунд.
+    """
+
+    _KEY_PREFIX = "task:"
+    _CREATED_INDEX = "tasks:by_created"
+    _STATUS_INDEX_PREFIX = "tasks:status:"
+    _STATUSES = tuple(status.value for status in ProcessingStatus)
+    _LOCK_SHARDS = 16
+    _SWEEP_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl: Optional[int] = None,
+        maxsize: Optional[int] = None
+    ):
+        """
+        Инициализация хранилища
+
+        Args:
+            redis_url: URL для подключения к Redis. Если None или Redis
+                      недоступен, задачи хранятся в памяти процесса
+            ttl: Время хранения задачи в секундах с последнего обновления
+                (если None, задачи не устаревают)
+            maxsize: Максимальное количество задач (если None, без ограничения)
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._next_sweep = 0.0
+        self._evict_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(self._LOCK_SHARDS)]
+        self._status_index: Dict[str, Set[str]] = {status: set() for status in self._STATUSES}
+        self.redis_client = None
+
+        if redis_url and REDIS_AVAILABLE:
+            try:
+                self.redis_client = redis.from_url(
+                    redis_url,
+                    socket_timeout=5,
+                    socket_connect_timeout=5
+                )
+                self.redis_client.ping()
+                logger.info("Task store connected to Redis")
+            except Exception as e:
+                logger.warning(f"Failed to connect task store to Redis: {e}")
+                logger.info("Falling back to in-memory task store")
+                self.redis_client = None
+        elif redis_url:
+            logger.warning("Redis not available, using in-memory task store")
+
+    def _lock(self, task_id: str) -> threading.Lock:
+        """Возвращает блокировку сегмента, к которому относится задача"""
+        return self._locks[hash(task_id) % self._LOCK_SHARDS]
+
+    def _key(self, task_id: str) -> str:
+        """Создает ключ Redis для задачи"""
+        return f"{self._KEY_PREFIX}{task_id}"
+
+    @staticmethod
+    def _status_name(status: Any) -> str:
+        """Приводит статус (ProcessingStatus или строку) к строковому значению"""
+        return getattr(status, "value", status)
+
+    def _index_status_local(self, task_id: str, status: Optional[Any]) -> None:
+        """Переносит задачу в индекс указанного статуса (None - убирает из индекса)"""
+        name = self._status_name(status) if status is not None else None
+        for status_name, task_ids in self._status_index.items():
+            if status_name == name:
+                task_ids.add(task_id)
+            else:
+                task_ids.discard(task_id)
+
+    def _index_status_redis(self, pipe: Any, task_id: str, status: Optional[Any]) -> None:
+        """Добавляет в пайплайн перенос задачи в индекс статуса Redis"""
+        name = self._status_name(status) if status is not None else None
+        for status_name in self._STATUSES:
+            if status_name != name:
+                pipe.srem(f"{self._STATUS_INDEX_PREFIX}{status_name}", task_id)
+        if name in self._STATUSES:
+            pipe.sadd(f"{self._STATUS_INDEX_PREFIX}{name}", task_id)
+
+    def _touch_local(self, task_id: str) -> None:
+        """Продлевает срок хранения задачи в памяти процесса"""
+        if self.ttl:
+            self._expires_at[task_id] = time.monotonic() + self.ttl
+
+    def _discard_local(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Удаляет задачу из памяти процесса и возвращает ее запись, если она была"""
+        with self._lock(task_id):
+            self._expires_at.pop(task_id, None)
+            self._index_status_local(task_id, None)
+            return self._local.pop(task_id, None)
+
+    def _evict_local(self) -> None:
+        """Удаляет из памяти процесса просроченные и лишние задачи"""
+        now = time.monotonic()
+        sweep_due = bool(self.ttl) and now >= self._next_sweep
+        over_limit = bool(self.maxsize) and len(self._local) > self.maxsize
+        if not (sweep_due or over_limit):
+            return
+
+        # Очистку выполняет один поток, остальные не ждут ее завершения
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            if sweep_due:
+                self._next_sweep = now + self._SWEEP_INTERVAL
+                for task_id, expires_at in self._expires_at.copy().items():
+                    if expires_at <= now:
+                        self._discard_local(task_id)
+
+            if self.maxsize:
+                excess = len(self._local) - self.maxsize
+                if excess > 0:
+                    # Порядок ключей словаря - порядок создания задач
+                    for task_id in list(self._local)[:excess]:
+                        self._discard_local(task_id)
+        finally:
+            self._evict_lock.release()
+
+    def _remove_redis(self, task_ids: List[str]) -> None:
+        """Удаляет задачи и их записи в индексах Redis"""
+        pipe = self.redis_client.pipeline()
+        for task_id in task_ids:
+            pipe.delete(self._key(task_id))
+            pipe.zrem(self._CREATED_INDEX, task_id)
+            self._index_status_redis(pipe, task_id, None)
+        pipe.execute()
+
+    def _evict_redis(self) -> None:
+        """Удаляет из Redis самые старые задачи сверх maxsize"""
+        if not self.maxsize:
+            return
+
+        excess = self.redis_client.zcard(self._CREATED_INDEX) - self.maxsize
+        if excess > 0:
+            oldest = self.redis_client.zrange(self._CREATED_INDEX, 0, excess - 1)
+            self._remove_redis([task_id.decode("utf-8") for task_id in oldest])
+
+    @staticmethod
+    def _encode_fields(fields: Dict[str, Any]) -> Dict[str, bytes]:
+        """Сериализует поля задачи для записи в хеш Redis"""
+        return {name: orjson.dumps(value, default=str) for name, value in fields.items()}
+
+    @staticmethod
+    def _decode_fields(raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        """Десериализует поля задачи из хеша Redis"""
+        return {name.decode("utf-8"): orjson.loads(value) for name, value in raw.items()}
+
+    def __getitem__(self, task_id: str) -> Dict[str, Any]:
+        if self.redis_client is None:
+            return self._local[task_id]
+
+        raw = self.redis_client.hgetall(self._key(task_id))
+        if not raw:
+            raise KeyError(task_id)
+        return self._decode_fields(raw)
+
+    def __setitem__(self, task_id: str, task_info: Dict[str, Any]) -> None:
+        if self.redis_client is None:
+            with self._lock(task_id):
+                self._local[task_id] = task_info
+                self._touch_local(task_id)
+                self._index_status_local(task_id, task_info.get("status"))
+            self._evict_local()
+            return
+
+        pipe = self.redis_client.pipeline()
+        pipe.delete(self._key(task_id))
+        if task_info:
+            pipe.hset(self._key(task_id), mapping=self._encode_fields(task_info))
+        if task_info and self.ttl:
+            pipe.expire(self._key(task_id), self.ttl)
+        pipe.zadd(self._CREATED_INDEX, {task_id: time.time()}, nx=True)
+        self._index_status_redis(pipe, task_id, task_info.get("status"))
+        pipe.execute()
+        self._evict_redis()
+
+    def __delitem__(self, task_id: str) -> None:
+        if self.redis_client is None:
+            if self._discard_local(task_id) is None:
+                raise KeyError(task_id)
+            return
+
+        pipe = self.redis_client.pipeline()
+        pipe.delete(self._key(task_id))
+        pipe.zrem(self._CREATED_INDEX, task_id)
+        self._index_status_redis(pipe, task_id, None)
+        deleted = pipe.execute()[0]
+        if not deleted:
+            raise KeyError(task_id)
+
+    def pop(self, task_id: str, *default: Any) -> Any:
+        """
+        Удаляет задачу и возвращает ее запись одной операцией
+
+        В отличие от MutableMapping.pop() (чтение, затем удаление) между
+        проверкой и удалением нет окна, в котором задачу удалит другой запрос.
+
+        Args:
+            task_id: Идентификатор задачи
+            *default: Значение, возвращаемое при отсутствии задачи
+
+        Returns:
+            Запись задачи или default
+        """
+        if self.redis_client is None:
+            task_info = self._discard_local(task_id)
+        else:
+            # Конвейер redis-py по умолчанию выполняется в MULTI/EXEC
+            pipe = self.redis_client.pipeline()
+            pipe.hgetall(self._key(task_id))
+            pipe.delete(self._key(task_id))
+            pipe.zrem(self._CREATED_INDEX, task_id)
+            self._index_status_redis(pipe, task_id, None)
+            raw = pipe.execute()[0]
+            task_info = self._decode_fields(raw) if raw else None
+
+        if task_info is None:
+            if default:
+                return default[0]
+            raise KeyError(task_id)
+        return task_info
+
+    def __contains__(self, task_id: object) -> bool:
+        if self.redis_client is None:
+            return task_id in self._local
+        return bool(self.redis_client.exists(self._key(task_id)))
+
+    def __iter__(self) -> Iterator[str]:
+        if self.redis_client is None:
+            return iter(list(self._local))
+        return (task_id.decode("utf-8") for task_id in self.redis_client.zrange(self._CREATED_INDEX, 0, -1))
+
+    def __len__(self) -> int:
+        if self.redis_client is None:
+            return len(self._local)
+        return self.redis_client.zcard(self._CREATED_INDEX)
+
+    def copy(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает снимок всех задач в виде обычного словаря"""
+        return dict(self.recent_items())
+
+    def update_task(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        """
+        Обновляет поля существующей задачи
+
+        Записи создаются только присваиванием: обновление удаленной или
+        просроченной задачи (например, от еще работающего конвейера)
+        ничего не делает. В Redis записываются только переданные поля, без
+        чтения записи; проверка существования и запись выполняются в одной
+        транзакции WATCH/MULTI.
+
+        Args:
+            task_id: Идентификатор задачи
+            fields: Поля для обновления
+
+        Returns:
+            True, если задача существует и была обновлена
+        """
+        if self.redis_client is None:
+            with self._lock(task_id):
+                if task_id not in self._local:
+                    return False
+                self._local[task_id] = {**self._local[task_id], **fields}
+                self._touch_local(task_id)
+                if "status" in fields:
+                    self._index_status_local(task_id, fields["status"])
+            self._evict_local()
+            return True
+
+        key = self._key(task_id)
+        mapping = self._encode_fields(fields)
+
+        def update(pipe: Any) -> bool:
+            if not pipe.exists(key):
+                return False
+            pipe.multi()
+            pipe.hset(key, mapping=mapping)
+            if self.ttl:
+                pipe.expire(key, self.ttl)
+            if "status" in fields:
+                self._index_status_redis(pipe, task_id, fields["status"])
+            return True
+
+        return self.redis_client.transaction(update, key, value_from_callable=True)
+
+    def recent_items(self, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Возвращает задачи, начиная с самых новых
+
+        Args:
+            limit: Максимальное количество задач (если None, все задачи)
+
+        Returns:
+            Список пар (идентификатор задачи, информация о задаче)
+        """
+        if self.redis_client is None:
+            items = sorted(
+                self._local.copy().items(),
+                key=lambda item: str(item[1].get("created_at", "")),
+                reverse=True
+            )
+            return items if limit is None else items[:limit]
+
+        end = -1 if limit is None else limit - 1
+        task_ids = [task_id.decode("utf-8") for task_id in self.redis_client.zrevrange(self._CREATED_INDEX, 0, end)]
+
+        pipe = self.redis_client.pipeline()
+        for task_id in task_ids:
+            pipe.hgetall(self._key(task_id))
+
+        items = []
+        expired = []
+        for task_id, raw in zip(task_ids, pipe.execute()):
+            if raw:
+                items.append((task_id, self._decode_fields(raw)))
+            else:
+                expired.append(task_id)
+
+        # Хеши просроченных задач удалены Redis, убираем их из индексов
+        if expired:
+            self._remove_redis(expired)
+
+        return items
+
+    def touch(self, task_id: str) -> None:
+        """
+        Продлевает срок хранения задачи на ttl секунд
+
+        Args:
+            task_id: Идентификатор задачи
+        """
+        if not self.ttl:
+            return
+
+        if self.redis_client is None:
+            if task_id in self._local:
+                self._touch_local(task_id)
+            return
+
+        self.redis_client.expire(self._key(task_id), self.ttl)
+
+    def status_counts(self) -> Dict[str, int]:
+        """
+        Возвращает количество задач в каждом статусе
+
+        В Redis хеши задач удаляются по EXPIRE без участия хранилища, а их
+        идентификаторы остаются в множествах статусов. Поэтому перед
+        подсчетом идентификаторы задач, чьих хешей уже нет, убираются из
+        индексов.
+
+        Returns:
+            Словарь {значение статуса: количество задач}
+        """
+        if self.redis_client is None:
+            return {status: len(task_ids) for status, task_ids in self._status_index.items()}
+
+        pipe = self.redis_client.pipeline()
+        for status in self._STATUSES:
+            pipe.smembers(f"{self._STATUS_INDEX_PREFIX}{status}")
+        members = [
+            [task_id.decode("utf-8") for task_id in task_ids]
+            for task_ids in pipe.execute()
+        ]
+
+        pipe = self.redis_client.pipeline()
+        for task_ids in members:
+            for task_id in task_ids:
+                pipe.exists(self._key(task_id))
+        exists = iter(pipe.execute())
+
+        counts = {}
+        expired = []
+        for status, task_ids in zip(self._STATUSES, members):
+            alive = 0
+            for task_id in task_ids:
+                if next(exists):
+                    alive += 1
+                else:
+                    expired.append(task_id)
+            counts[status] = alive
+
+        # Хеши просроченных задач удалены Redis, убираем их из индексов
+        if expired:
+            self._remove_redis(expired)
+
+        return counts
@@ -0,0 +1 @@
+"""Фоновые воркеры для длительной обработки"""
@@ -0,0 +1,109 @@
+"""
+Celery-приложение для обработки аудио и транскриптов вне веб-процесса
+
+Очередь используется, если установлен celery и задан брокер: настройка
+CELERY_BROKER_URL (например, redis://redis:6379/1), а без нее - REDIS_URL.
+Воркер запускается командой:
+
+    celery -A app.workers.celery_app worker --concurrency=2
+
+Статус задач воркер пишет в то же хранилище задач, что и веб-процесс, поэтому
+очередь используется, только если задан и доступен REDIS_URL. Без брокера или
+без общего хранилища задачи выполняются через FastAPI BackgroundTasks в пуле
+потоков веб-процесса.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    from celery import Celery
+    CELERY_AVAILABLE = True
+except ImportError:
+    Celery = None
+    CELERY_AVAILABLE = False
+
+from ..utils.logging import get_default_logger
+from ..config.config import config
+
+logger = get_default_logger(__name__)
+
+CELERY_BROKER_URL = config.celery_broker_url or config.redis_url
+
+celery_app = None
+process_audio = None
+process_transcript = None
+
+if CELERY_AVAILABLE and CELERY_BROKER_URL:
+    celery_app = Celery(
+        "meeting_minutes",
+        broker=CELERY_BROKER_URL,
+        backend=config.celery_result_backend
+    )
+    celery_app.conf.update(
+        task_serializer="json",
+        accept_content=["json"],
+        # Обработка одной встречи занимает минуты: берем задачи по одной
+        # и подтверждаем их только после выполнения
+        task_acks_late=True,
+        worker_prefetch_multiplier=1,
+        task_time_limit=config.celery_task_time_limit,
+        worker_max_tasks_per_child=config.celery_max_tasks_per_child
+    )
+
+    @celery_app.task(name="meeting_minutes.process_audio")
+    def process_audio(
+        task_id: str,
+        file_path: str,
+        output_dir: str,
+        metadata: Dict[str, Any],
+        language: Optional[str] = None,
+        skip_notifications: bool = False,
+        file_stem: Optional[str] = None
+    ) -> None:
+        """Обрабатывает аудиофайл в воркере Celery"""
+        # Импорт внутри задачи: api_routes сам импортирует этот модуль
+        from ..web.api_routes import process_audio_task
+        process_audio_task(
+            task_id=task_id,
+            file_path=Path(file_path),
+            output_dir=Path(output_dir),
+            metadata=metadata,
+            language=language,
+            skip_notifications=skip_notifications,
+            file_stem=file_stem
+        )
+
+    @celery_app.task(name="meeting_minutes.process_transcript")
+    def process_transcript(
+        task_id: str,
+        file_path: str,
+        output_dir: str,
+        metadata: Dict[str, Any],
+        language: Optional[str] = None,
+        skip_notifications: bool = False,
+        file_stem: Optional[str] = None
+    ) -> None:
+        """Обрабатывает JSON-файл транскрипта в воркере Celery"""
+        from ..web.api_routes import process_transcript_task
+        process_transcript_task(
+            task_id=task_id,
+            file_path=Path(file_path),
+            output_dir=Path(output_dir),
+            metadata=metadata,
+            language=language,
+            skip_notifications=skip_notifications,
+            file_stem=file_stem
+        )
+
+    logger.info("Celery task queue enabled")
+elif CELERY_BROKER_URL:
+    logger.warning("Celery broker is configured but celery is not installed, using BackgroundTasks")
+
+def is_celery_enabled() -> bool:
+    """
+    Проверяет, отправляются ли задачи обработки в очередь Celery
+
+    Returns:
+        True, если Celery установлен и задан брокер
+    """
+    return celery_app is not None
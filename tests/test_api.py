@@ -79,6 +79,22 @@ class TestAPI:
         assert "metrics" in response.json()
         assert "version" in response.json()
     
+    def test_health_check_cached(self, client):
+        """
+        Тест кеширования ответа /health
+        """
+        from app.web import app as web_app
+        
+        health_status = {"healthy": True, "errors": [], "warnings": [], "details": {}}
+        with patch.dict(web_app._health_cache, {"ts": 0.0, "payload": None}), \
+             patch.object(web_app.config, "health_cache_ttl", 60.0), \
+             patch("app.web.app.get_config_health_status", return_value=health_status) as mock_status:
+            first = client.get("/health")
+            second = client.get("/health")
+        
+        assert first.json() == second.json()
+        mock_status.assert_called_once()
+    
     def test_upload_audio_success(self, client, mock_pipeline, mock_background_tasks, mock_update_task_status):
         """
         Тест успешной загрузки аудиофайла
@@ -372,3 +388,16 @@ class TestAPI:
         
         # Удаляем тестовую задачу
         del tasks_info[task_id]
+
+def test_openapi_schema(client):
+    """
+    Тест получения схемы OpenAPI
+    """
+    response = client.get("/openapi.json")
+    
+    assert response.status_code == 200
+    schema = response.json()
+    assert schema["info"]["title"] == "Meeting Protocol Generator"
+    assert "bearerAuth" in schema["components"]["securitySchemes"]
+    assert "/api/upload" not in schema["paths"]
+    assert client.get("/openapi.json").content == response.content
@@ -234,6 +234,16 @@ def test_upload_transcript(mock_pipeline, mock_uuid, mock_background_tasks):
         if test_file_path.exists():
             os.remove(test_file_path)
 
+def test_upload_invalid_meeting_info():
+    """Тест отклонения некорректной информации о встрече"""
+    for meeting_info in ("{not json", "[1, 2]", '{"title": 5}'):
+        response = client.post(
+            "/api/v1/upload",
+            files={"file": ("test_audio.mp3", b"audio", "audio/mpeg")},
+            data={"meeting_info": meeting_info}
+        )
+        assert response.status_code == 400
+
 def test_get_task_status():
     """Тест получения статуса задачи"""
     # Настраиваем задачу в tasks_info
@@ -260,6 +270,26 @@ def test_get_task_status():
         assert data["progress"] == 100
         assert data["message"] == "Task completed"
 
+def test_get_task_status_estimated_completion():
+    """Тест оценки времени завершения задачи"""
+    task_id = "test-task-eta"
+    created_ts = datetime(2025, 5, 25, 10, 0, 0).timestamp()
+    
+    with patch.dict("app.web.api_routes.tasks_info", {
+        task_id: {
+            "status": ProcessingStatus.PROCESSING.value,
+            "progress": 25.0,
+            "message": "Processing",
+            "created_ts": created_ts,
+            "updated_ts": created_ts + 60
+        }
+    }):
+        response = client.get(f"/api/v1/status/{task_id}")
+        
+        # 25% за минуту: до завершения остается еще три минуты
+        assert response.status_code == 200
+        assert response.json()["estimated_completion"] == "2025-05-25T10:04:00"
+
 def test_get_tasks():
     """Тест получения списка задач"""
     # Патчим tasks_info
@@ -315,6 +345,9 @@ def test_get_protocols(mock_completed_tasks):
     assert "Meeting 1" in protocol_titles
     assert "Meeting 2" in protocol_titles
     
+    # Протоколы отсортированы по дате, новые сначала
+    assert protocol_titles == ["Meeting 2", "Meeting 1"]
+    
     # Проверяем, что все обязательные поля присутствуют
     for protocol in data["protocols"]:
         assert "metadata" in protocol
@@ -324,6 +357,182 @@ def test_get_protocols(mock_completed_tasks):
         assert "decisions" in protocol
         assert "action_items" in protocol
 
+def test_load_protocol_cache(tmp_path):
+    """Тест кеширования протокола по времени изменения файла"""
+    from app.web.api_routes import _load_protocol
+    
+    json_path = tmp_path / "protocol.json"
+    json_path.write_text(json.dumps({"summary": "v1"}), encoding="utf-8")
+    mtime_ns = os.stat(json_path).st_mtime_ns
+    
+    # Повторное чтение с тем же временем изменения берется из кеша
+    first = _load_protocol(str(json_path), mtime_ns)
+    assert _load_protocol(str(json_path), mtime_ns) is first
+    
+    # Новое время изменения приводит к повторному чтению файла
+    json_path.write_text(json.dumps({"summary": "v2"}), encoding="utf-8")
+    assert _load_protocol(str(json_path), mtime_ns + 1)["summary"] == "v2"
+
+def test_progress_callback_debounce():
+    """Тест прореживания обновлений прогресса задачи"""
+    from app.web.api_routes import make_progress_callback
+    
+    with patch("app.web.api_routes.update_task_status") as mock_update, \
+         patch("app.web.api_routes.time.monotonic", return_value=100.0) as mock_time:
+        callback = make_progress_callback("task-1", start=5.0, scale=0.9)
+        
+        callback("asr", 0.0)
+        callback("asr", 0.5)  # Тот же этап, малый шаг и короткий интервал
+        callback("asr", 1.0)  # Шаг прогресса достиг порога
+        callback("llm", 1.2)  # Смена этапа
+        mock_time.return_value = 101.0
+        callback("llm", 1.3)  # Прошел интервал
+        
+        progress_values = [call.kwargs["progress"] for call in mock_update.call_args_list]
+        assert progress_values == pytest.approx([5.0, 5.9, 6.08, 6.17])
+
+def test_progress_callback_flushes_pending_update():
+    """Тест записи пропущенного значения прогресса при смене этапа и по завершении"""
+    from app.web.api_routes import make_progress_callback
+    
+    with patch("app.web.api_routes.update_task_status") as mock_update, \
+         patch("app.web.api_routes.time.monotonic", return_value=100.0):
+        callback = make_progress_callback("task-1", start=5.0, scale=0.9)
+        
+        callback("asr", 0.0)
+        callback("asr", 0.5)  # Пропущено прореживанием
+        callback("llm", 0.6)  # Смена этапа записывает пропущенное значение
+        callback("llm", 0.7)  # Пропущено прореживанием
+        callback.flush()      # Завершение конвейера
+        callback.flush()      # Повторный вызов ничего не пишет
+        
+        updates = [(call.kwargs["message"], call.kwargs["progress"]) for call in mock_update.call_args_list]
+        assert [message for message, _ in updates] == [
+            "Обработка: asr", "Обработка: asr", "Обработка: llm", "Обработка: llm"
+        ]
+        assert [progress for _, progress in updates] == pytest.approx([5.0, 5.45, 5.54, 5.63])
+
+def test_task_store_status_counts():
+    """Тест инкрементального подсчета задач по статусам"""
+    from app.web.task_store import TaskStore
+    
+    store = TaskStore()
+    store["task-1"] = {"status": ProcessingStatus.PENDING}
+    store["task-2"] = {"status": ProcessingStatus.PROCESSING}
+    store.update_task("task-1", {"progress": 50.0})
+    assert store.status_counts() == {"pending": 1, "processing": 1, "completed": 0, "failed": 0}
+    
+    # Смена статуса переносит задачу между счетчиками
+    store.update_task("task-1", {"status": ProcessingStatus.COMPLETED})
+    assert store.status_counts()["pending"] == 0
+    assert store.status_counts()["completed"] == 1
+    
+    del store["task-2"]
+    assert store.status_counts()["processing"] == 0
+    
+    # pop удаляет задачу и возвращает ее запись
+    assert store.pop("task-1")["progress"] == 50.0
+    assert store.pop("task-1", None) is None
+    assert store.status_counts()["completed"] == 0
+
+def test_task_store_update_does_not_recreate_deleted_task():
+    """Тест того, что обновление удаленной задачи не создает ее заново"""
+    from app.web.task_store import TaskStore
+    
+    store = TaskStore()
+    store["task-1"] = {"status": ProcessingStatus.PROCESSING, "created_at": "2026-01-01T00:00:00"}
+    assert store.update_task("task-1", {"progress": 50.0}) is True
+    
+    del store["task-1"]
+    assert store.update_task("task-1", {"status": ProcessingStatus.COMPLETED}) is False
+    assert "task-1" not in store
+    assert store.status_counts()["completed"] == 0
+
+def test_task_store_redis_update_does_not_recreate_deleted_task():
+    """Тест того, что обновление удаленной задачи в Redis не создает ее заново"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.web.task_store import TaskStore
+    
+    store = TaskStore(ttl=60)
+    store.redis_client = fakeredis.FakeRedis()
+    store["task-1"] = {"status": ProcessingStatus.PROCESSING, "created_at": "2026-01-01T00:00:00"}
+    assert store.update_task("task-1", {"progress": 50.0}) is True
+    assert store["task-1"]["progress"] == 50.0
+    
+    del store["task-1"]
+    assert store.update_task("task-1", {"status": ProcessingStatus.COMPLETED}) is False
+    assert "task-1" not in store
+    assert store.status_counts()["completed"] == 0
+
+def test_update_task_status_skips_deleted_task():
+    """Тест пропуска обновления статуса задачи, удаленной через API"""
+    from app.web.api_routes import update_task_status
+    
+    tasks_info["deleted-task"] = {"status": ProcessingStatus.PROCESSING, "created_at": "2026-01-01T00:00:00"}
+    response = client.delete("/api/v1/tasks/deleted-task")
+    assert response.status_code == 200
+    
+    update_task_status("deleted-task", ProcessingStatus.PROCESSING, 50.0, "Обработка")
+    
+    assert "deleted-task" not in tasks_info
+    assert client.get("/api/v1/status/deleted-task").status_code == 404
+
+def test_task_store_redis_status_counts_skip_expired_tasks():
+    """Тест подсчета задач по статусам в Redis без задач, удаленных по EXPIRE"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.web.task_store import TaskStore
+    
+    store = TaskStore(ttl=60)
+    store.redis_client = fakeredis.FakeRedis()
+    store["task-1"] = {"status": ProcessingStatus.PROCESSING}
+    store["task-2"] = {"status": ProcessingStatus.PROCESSING}
+    
+    # Redis удаляет хеш просроченной задачи сам, минуя хранилище
+    store.redis_client.delete("task:task-1")
+    
+    assert store.status_counts()["processing"] == 1
+    assert store.redis_client.smembers("tasks:status:processing") == {b"task-2"}
+    assert list(store) == ["task-2"]
+
+def test_task_store_eviction():
+    """Тест удаления устаревших и лишних задач из хранилища"""
+    from app.web.task_store import TaskStore
+    
+    store = TaskStore(ttl=60, maxsize=2)
+    with patch("app.web.task_store.time.monotonic", return_value=1000.0) as mock_time:
+        for i in range(3):
+            store[f"task-{i}"] = {"status": ProcessingStatus.PENDING}
+        
+        # Сверх maxsize удаляется самая старая задача
+        assert sorted(store) == ["task-1", "task-2"]
+        
+        # Продленная задача переживает срок хранения остальных
+        mock_time.return_value = 1030.0
+        store.touch("task-2")
+        mock_time.return_value = 1070.0
+        store["task-3"] = {"status": ProcessingStatus.PENDING}
+        
+        assert sorted(store) == ["task-2", "task-3"]
+        assert store.status_counts()["pending"] == 2
+
+def test_file_download_response_x_accel_redirect(tmp_path):
+    """Тест передачи файла результата nginx через X-Accel-Redirect"""
+    from app.web.api_routes import config, file_download_response
+    
+    file_path = tmp_path / "task-1" / "Встреча.md"
+    file_path.parent.mkdir()
+    file_path.write_text("# Protocol", encoding="utf-8")
+    
+    with patch.object(config, "output_dir", tmp_path), \
+         patch.object(config, "x_accel_redirect_prefix", "/_results/"):
+        response = file_download_response(file_path, "text/markdown", file_path.name)
+    
+    assert response.body == b""
+    assert response.headers["x-accel-redirect"] == "/_results/task-1/%D0%92%D1%81%D1%82%D1%80%D0%B5%D1%87%D0%B0.md"
+    assert response.headers["content-disposition"] == (
+        "attachment; filename*=utf-8''%D0%92%D1%81%D1%82%D1%80%D0%B5%D1%87%D0%B0.md"
+    )
+
 @pytest.fixture
 def mock_protocol_file():
     """Мок для файла протокола"""
@@ -367,8 +576,13 @@ def mock_protocol_file():
             "status": "completed",
             "progress": 100,
             "message": "Task completed",
-            "markdown_file": str(markdown_path),
-            "json_file": str(protocol_path),
+            "result": {
+                "protocol": protocol_data,
+                "files": {
+                    "json": str(protocol_path),
+                    "md": str(markdown_path)
+                }
+            },
             "created_at": "2025-05-25T10:00:00Z"
         }
     }
@@ -427,7 +641,7 @@ def test_download_protocol_markdown(mock_protocol_file):
     
     # Проверяем результат
     assert response.status_code == 200
-    assert response.headers["content-type"] == "text/markdown"
+    assert response.headers["content-type"].startswith("text/markdown")
     assert response.headers["content-disposition"] == f'attachment; filename="protocol_{protocol_id}.md"'
     assert response.content.decode() == markdown_content
 
@@ -450,3 +664,36 @@ def test_download_protocol_json(mock_protocol_file):
     assert response_data["metadata"]["date"] == protocol_data["metadata"]["date"]
     assert response_data["summary"] == protocol_data["summary"]
     assert len(response_data["participants"]) == len(protocol_data["participants"])
+
+def test_download_protocol_uses_cached_stat(mock_protocol_file):
+    """Тест скачивания протокола с сохраненным при завершении задачи stat"""
+    from app.web.api_routes import _file_stat_fields
+    
+    protocol_id = mock_protocol_file["protocol_id"]
+    markdown_path = str(mock_protocol_file["markdown_path"])
+    stat_fields = _file_stat_fields(markdown_path)
+    result = dict(tasks_info[protocol_id]["result"], file_stats={"md": stat_fields})
+    tasks_info.update_task(protocol_id, {"result": result})
+    
+    with patch("app.web.api_routes.os.stat") as mock_stat:
+        response = client.get(f"/api/v1/protocols/{protocol_id}/download?format=markdown")
+    
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(stat_fields[6])
+    assert response.content.decode() == mock_protocol_file["markdown_content"]
+    mock_stat.assert_not_called()
+
+def test_now_iso_reused_within_second():
+    """Тест переиспользования строки текущего времени в пределах секунды"""
+    from app.web.api_routes import now_iso
+    
+    with patch("app.web.api_routes.time.time") as mock_time:
+        mock_time.return_value = 1748174400.2
+        first = now_iso()
+        mock_time.return_value = 1748174400.9
+        assert now_iso() is first
+        mock_time.return_value = 1748174401.1
+        second = now_iso()
+    
+    assert first == datetime.fromtimestamp(1748174400).isoformat()
+    assert second == datetime.fromtimestamp(1748174401).isoformat()
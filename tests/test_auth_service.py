@@ -279,6 +279,19 @@ class TestAuthenticationService:
         updated_user = auth_service.get_user(user.username)
         assert "moderator" in updated_user.roles
     
+    def test_user_json_row_refreshed_on_update(self, auth_service, test_user_data):
+        """Тест обновления строки списка пользователей после изменений"""
+        user = auth_service.create_user(test_user_data)
+        
+        assert user.json_row["created_at"] == user.created_at.isoformat()
+        assert "moderator" not in user.json_row["roles"]
+        
+        auth_service.add_role_to_user(user.username, "moderator")
+        auth_service.update_user(user.username, is_active=False)
+        
+        assert "moderator" in user.json_row["roles"]
+        assert user.json_row["is_active"] is False
+    
     def test_remove_role_from_user(self, auth_service, test_user_data):
         """Тест удаления роли у пользователя"""
         # Создаем пользователя с дополнительной ролью
@@ -350,6 +363,26 @@ class TestAuthenticationService:
         assert active_session.session_id in auth_service.sessions
         assert expired_session1.session_id not in auth_service.sessions
         assert expired_session2.session_id not in auth_service.sessions
+        assert auth_service.sessions_by_user[user.id] == {active_session.session_id}
+    
+    def test_get_active_sessions_by_user(self, auth_service, test_user_data):
+        """Тест получения активных сессий пользователя по индексу"""
+        user = auth_service.create_user(test_user_data)
+        other_user = auth_service.create_user(UserCreate(
+            username="otheruser",
+            email="other@example.com",
+            password="OtherPassword123!"
+        ))
+        
+        active_session = auth_service.create_session(user)
+        invalidated_session = auth_service.create_session(user)
+        auth_service.invalidate_session(invalidated_session.session_id)
+        auth_service.create_session(other_user)
+        
+        sessions = auth_service.get_active_sessions(user.id)
+        
+        assert [session.session_id for session in sessions] == [active_session.session_id]
+        assert len(auth_service.get_active_sessions()) == 2
     
     def test_data_persistence(self, temp_db_path):
         """Тест сохранения данных между сессиями"""
@@ -372,3 +405,40 @@ class TestAuthenticationService:
         assert loaded_user is not None
         assert loaded_user.email == "persist@example.com"
         assert loaded_user.id == created_user.id
+    
+    def test_concurrent_sessions_are_saved(self, auth_service, test_user_data, temp_db_path):
+        """Тест сохранения сессий, созданных из нескольких потоков одновременно"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        user = auth_service.create_user(test_user_data)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(lambda _: auth_service.create_session(user), range(200)))
+        
+        reloaded = AuthenticationService(db_path=temp_db_path)
+        assert len(reloaded.sessions) == 200
+    
+    def test_concurrent_registration_of_same_username(self, auth_service, test_user_data):
+        """Тест того, что одновременная регистрация одного имени создает одного пользователя"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        def register(_):
+            try:
+                auth_service.create_user(test_user_data)
+                return True
+            except AuthenticationError:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(register, range(4)))
+        
+        assert results.count(True) == 1
+    
+    def test_set_user_roles(self, auth_service, test_user_data):
+        """Тест замены списка ролей пользователя"""
+        auth_service.create_user(test_user_data)
+        
+        user = auth_service.set_user_roles(test_user_data.username, ["user", "moderator"])
+        
+        assert user.roles == ["user", "moderator"]
+        assert user.json_row["roles"] == ["user", "moderator"]
+        assert auth_service.set_user_roles("missing", ["user"]) is None
@@ -0,0 +1,50 @@
+"""
+Тесты для модуля metrics.py
+"""
+import threading
+import unittest
+
+from app.utils.metrics import MetricsCollector, _ShardedCounter, CollectorRegistry, PROMETHEUS_AVAILABLE
+
+class TestMetrics(unittest.TestCase):
+    """
+    Тесты для счетчиков задач
+    """
+
+    def test_sharded_counter_threads(self):
+        """
+        Тест суммирования счетчиков, увеличенных из нескольких потоков
+        """
+        counter = _ShardedCounter()
+
+        def worker():
+            for _ in range(1000):
+                counter.increment("processing")
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        counter.increment("completed")
+        self.assertEqual(counter.snapshot(), {"processing": 4000, "completed": 1})
+
+    def test_task_counts(self):
+        """
+        Тест учета созданных задач и обновлений статусов
+        """
+        # Отдельный реестр, чтобы не регистрировать метрики повторно в глобальном
+        collector = MetricsCollector(registry=CollectorRegistry() if PROMETHEUS_AVAILABLE else None)
+
+        collector.task_created("task-1")
+        collector.task_status_update("task-1", "processing", 10.0)
+        collector.task_status_update("task-1", "completed", 100.0)
+
+        self.assertEqual(collector.get_task_counts(), {
+            "created": 1,
+            "status_updates": {"processing": 1, "completed": 1}
+        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,11 @@ import tempfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from app.utils.schemas import validate_json, validate_protocol_json
+from app.utils.schemas import (
+    validate_json, validate_protocol_json, validate_json_schema, fix_protocol_data, _get_validator,
+    validate_json_streaming, IJSON_AVAILABLE
+)
+from app.core.exceptions import ValidationError as AppValidationError
 
 class TestSchemas(unittest.TestCase):
     """
@@ -190,5 +194,69 @@ class TestSchemas(unittest.TestCase):
             with self.assertRaises(ValueError):
                 validate_protocol_json(123)  # Не словарь, не строка и не Path
 
+    def test_get_validator_is_cached(self):
+        """
+        Тест кеширования скомпилированных валидаторов
+        """
+        schema = {"type": "object", "required": ["title"]}
+        
+        # Повторный вызов с тем же объектом возвращает тот же валидатор
+        self.assertIs(_get_validator(schema), _get_validator(schema))
+        
+        # Равная по содержимому схема из другого объекта тоже попадает в кеш
+        self.assertIs(_get_validator(schema), _get_validator(json.loads(json.dumps(schema))))
+        
+        # Закешированный валидатор по-прежнему находит ошибки
+        self.assertEqual(validate_json_schema({"title": "ok"}, schema), [])
+        self.assertEqual(len(validate_json_schema({}, schema)), 1)
+
+    def test_fix_protocol_data_field_aliases(self):
+        """
+        Тест переноса немецких и альтернативных ключей в fix_protocol_data
+        """
+        result = fix_protocol_data({
+            "meta": {"title": "Sitzung"},
+            "zusammenfassung": "Kurz",
+            "entscheidungen": ["E1"],
+            "actions": ["A1"]
+        })
+        
+        self.assertEqual(result["metadata"]["title"], "Sitzung")
+        self.assertEqual(result["metadata"]["date"], "Unknown Date")
+        self.assertEqual(result["summary"], "Kurz")
+        self.assertEqual(result["decisions"], ["E1"])
+        self.assertEqual(result["action_items"], ["A1"])
+        
+        # Без синонимов остаются значения по умолчанию
+        empty = fix_protocol_data({})
+        self.assertEqual(empty["summary"], "No summary available")
+        self.assertEqual(empty["decisions"], [])
+        self.assertEqual(empty["action_items"], [])
+
+    @unittest.skipUnless(IJSON_AVAILABLE, "ijson is not installed")
+    def test_validate_json_streaming(self):
+        """
+        Тест потоковой валидации файла протокола
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "protocol.json"
+            path.write_text(json.dumps(self.valid_protocol), encoding="utf-8")
+            self.assertEqual(
+                validate_json_streaming(path),
+                len(self.valid_protocol["agenda_items"])
+            )
+            
+            # Ошибка в пункте повестки указывает на его позицию в массиве
+            invalid = dict(self.valid_protocol, agenda_items=["ok", {"unknown": 1}])
+            path.write_text(json.dumps(invalid), encoding="utf-8")
+            with self.assertRaises(AppValidationError) as ctx:
+                validate_json_streaming(path)
+            self.assertEqual(ctx.exception.details["validation_error"]["path"], "agenda_items/1")
+            
+            # Ошибки в остальных полях тоже обнаруживаются
+            path.write_text(json.dumps({"summary": "s"}), encoding="utf-8")
+            with self.assertRaises(AppValidationError):
+                validate_json_streaming(path)
+
 if __name__ == '__main__':
     unittest.main()
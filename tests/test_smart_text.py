@@ -0,0 +1,143 @@
+"""
+Тесты для модуля smart_text.py
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import smart_text
+from app.utils.smart_text import optimize_deduplication
+
+def _three_way_duplicate():
+    """Три варианта одной задачи и одна несвязанная задача"""
+    return [
+        {"text": "Подготовить отчет по проекту", "owners": ["Иван"]},
+        {"text": "Согласовать бюджет на квартал", "owners": ["Анна"]},
+        {"text": "Подготовить отчет по проекту.", "owners": ["Мария"]},
+        {"text": "Подготовить отчет по проекту!", "owners": ["Петр"]}
+    ]
+
+def test_fallback_merges_three_way_duplicate():
+    """Тест объединения трех дубликатов без MinHash LSH"""
+    with patch.object(smart_text, "DATASKETCH_AVAILABLE", False):
+        result = optimize_deduplication(_three_way_duplicate())
+    
+    assert len(result) == 2
+    merged = next(item for item in result if item["text"].startswith("Подготовить"))
+    assert merged["owners"] == ["Иван", "Мария", "Петр"]
+
+@pytest.mark.skipif(not smart_text.DATASKETCH_AVAILABLE, reason="datasketch не установлен")
+def test_lsh_and_fallback_give_same_result():
+    """Тест совпадения результатов дедупликации с MinHash LSH и без него"""
+    items = _three_way_duplicate()
+    
+    with patch.object(smart_text.config, "use_datasketch", True):
+        lsh_result = optimize_deduplication(items)
+    with patch.object(smart_text.config, "use_datasketch", False):
+        fallback_result = optimize_deduplication(items)
+    
+    assert lsh_result == fallback_result
+    # Исходные элементы не изменяются при объединении
+    assert items == _three_way_duplicate()
+
+def test_datasketch_disabled_by_config():
+    """Тест дедупликации без MinHash LSH при выключенной настройке use_datasketch"""
+    with patch.object(smart_text, "DATASKETCH_AVAILABLE", True), \
+         patch.object(smart_text.config, "use_datasketch", False), \
+         patch.object(smart_text, "_deduplicate_with_lsh") as mock_lsh:
+        result = optimize_deduplication(_three_way_duplicate())
+    
+    mock_lsh.assert_not_called()
+    assert len(result) == 2
+
+def test_fallback_keeps_input_order():
+    """Тест сохранения исходного порядка элементов без MinHash LSH"""
+    items = [
+        {"text": "Согласовать бюджет на квартал"},
+        {"text": "Подготовить отчет по проекту"},
+        {"description": "Без текста"},
+        {"text": "Обновить документацию"}
+    ]
+    
+    with patch.object(smart_text, "DATASKETCH_AVAILABLE", False):
+        result = optimize_deduplication(items)
+    
+    assert result == items
+
+def test_fallback_key_window():
+    """Тест сравнения ключей групп в пределах окна без MinHash LSH"""
+    items = [
+        {"text": "abcdefghij meeting notes"},
+        {"text": "bbbbbbbbbb unrelated item"},
+        {"text": "cccccccccc another item"},
+        {"text": "xbcdefghij meeting notes"}
+    ]
+    
+    with patch.object(smart_text, "DATASKETCH_AVAILABLE", False):
+        # Между ключами дубликатов после сортировки два других ключа
+        windowed = optimize_deduplication(items, key_window=1)
+        unbounded = optimize_deduplication(items, key_window=None)
+    
+    assert len(windowed) == 4
+    assert [item["text"] for item in unbounded] == [item["text"] for item in items[:3]]
+
+def test_semantic_splitter_disabled_by_config():
+    """Тест отключения semantic-text-splitter настройкой use_semantic_splitter"""
+    text = "Первый абзац.\n\nВторой абзац."
+    with patch.object(smart_text, "SEMANTIC_SPLITTER_AVAILABLE", True), \
+         patch.object(smart_text.config, "use_semantic_splitter", False), \
+         patch.object(smart_text, "_get_semantic_splitter") as mock_splitter:
+        chunks = list(smart_text.smart_split_text_iter(text, chunk_tokens=100, overlap_tokens=0))
+    
+    mock_splitter.assert_not_called()
+    assert chunks
+
+def test_semantic_splitter_enabled_by_config():
+    """Тест использования semantic-text-splitter при включенной настройке"""
+    with patch.object(smart_text, "SEMANTIC_SPLITTER_AVAILABLE", True), \
+         patch.object(smart_text.config, "use_semantic_splitter", True), \
+         patch.object(smart_text, "_get_semantic_splitter") as mock_splitter:
+        mock_splitter.return_value.chunks.return_value = ["chunk"]
+        chunks = list(smart_text.smart_split_text_iter("text", chunk_tokens=100, overlap_tokens=0))
+    
+    assert chunks == ["chunk"]
+
+def test_hyperscan_disabled_by_config():
+    """Тест отключения Hyperscan настройкой use_hyperscan"""
+    segments = [{"text": "Мы решили перенести встречу"}, {"text": "Погода"}]
+    with patch.object(smart_text.config, "use_hyperscan", False), \
+         patch.object(smart_text, "_get_hyperscan_classifier") as mock_classifier:
+        result = smart_text.classify_transcript_segments(segments)
+    
+    mock_classifier.assert_not_called()
+    assert sum(len(items) for items in result.values()) == len(segments)
+
+def test_rapidfuzz_disabled_by_config():
+    """Тест сравнения текстов через difflib при выключенной настройке use_rapidfuzz"""
+    with patch.object(smart_text.config, "use_rapidfuzz", False), \
+         patch.object(smart_text, "fuzz", create=True) as mock_fuzz:
+        similarity = smart_text._text_similarity("abcd", "abce")
+    
+    mock_fuzz.ratio.assert_not_called()
+    assert similarity == 0.75
+
+@pytest.mark.skipif(not smart_text.RAPIDFUZZ_AVAILABLE, reason="rapidfuzz не установлен")
+def test_rapidfuzz_and_difflib_give_same_dedup_result():
+    """Тест совпадения результатов дедупликации с rapidfuzz и difflib"""
+    items = _three_way_duplicate()
+    
+    with patch.object(smart_text.config, "use_rapidfuzz", True):
+        rapidfuzz_result = optimize_deduplication(items)
+    with patch.object(smart_text.config, "use_rapidfuzz", False):
+        difflib_result = optimize_deduplication(items)
+    
+    assert rapidfuzz_result == difflib_result
+
+def test_pysbd_disabled_by_config():
+    """Тест разбиения на предложения регулярным выражением при выключенной настройке use_pysbd"""
+    with patch.object(smart_text.config, "use_pysbd", False), \
+         patch.object(smart_text, "_get_sentence_segmenter") as mock_segmenter:
+        sentences = smart_text._split_sentences("Первое предложение. Второе предложение.")
+    
+    mock_segmenter.assert_not_called()
+    assert len(sentences) == 2
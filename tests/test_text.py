@@ -0,0 +1,109 @@
+"""
+Тесты для модуля text.py
+"""
+import unittest
+from unittest.mock import patch
+
+import tiktoken
+
+from app.utils.text import (
+    split_text_into_chunks, split_text_binary, split_transcript_segments, count_segment_tokens
+)
+
+# Побайтовая кодировка: не требует загрузки словаря cl100k_base
+_BYTE_ENCODING = tiktoken.Encoding(
+    "bytes",
+    pat_str=r"""\s?\S+|\s+""",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={}
+)
+
+@patch('app.utils.text._get_encoding', return_value=_BYTE_ENCODING)
+class TestTextChunking(unittest.TestCase):
+    """
+    Тесты для функций разбиения текста на чанки
+    """
+
+    def test_split_text_into_chunks_overlap(self, _):
+        """
+        Тест разбиения текста с перекрытием чанков
+        """
+        text = "abcdefghij" * 5
+        chunks = split_text_into_chunks(text, chunk_tokens=20, overlap_tokens=5)
+
+        self.assertEqual(chunks[0], text[:20])
+        self.assertEqual(chunks[1], text[15:35])
+        self.assertEqual(chunks[-1], text[30:])
+
+        # Короткий текст возвращается целиком
+        self.assertEqual(split_text_into_chunks("short", 20, 5), ["short"])
+        self.assertEqual(split_text_into_chunks("", 20, 5), [])
+
+    def test_split_text_into_chunks_keeps_utf8_characters(self, _):
+        """
+        Тест того, что границы чанков не разрезают многобайтовые символы
+        """
+        text = "Привет мир " * 10
+        chunks = split_text_into_chunks(text, chunk_tokens=25, overlap_tokens=0)
+
+        self.assertFalse(any("�" in chunk for chunk in chunks))
+        self.assertEqual("".join(chunks), text)
+
+    def test_split_transcript_segments_overlap(self, _):
+        """
+        Тест разбиения сегментов транскрипции с перекрытием
+        """
+        segments = [{"text": "x" * 10, "id": i} for i in range(10)]
+        chunks = split_transcript_segments(segments, chunk_tokens=40, overlap_segments=1)
+
+        self.assertEqual(
+            [[segment["id"] for segment in chunk] for chunk in chunks],
+            [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]]
+        )
+
+    def test_split_transcript_segments_precomputed_tokens(self, mock_get_encoding):
+        """
+        Тест использования заранее посчитанного числа токенов сегментов
+        """
+        segments = [{"text": "x" * 10, "n_tokens": 10, "id": i} for i in range(10)]
+        chunks = split_transcript_segments(segments, chunk_tokens=40, overlap_segments=0)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        mock_get_encoding.assert_not_called()
+
+    def test_count_segment_tokens(self, _):
+        """
+        Тест пакетного заполнения числа токенов сегментов
+        """
+        segments = [{"text": "x" * 12}, {"text": "y" * 5, "n_tokens": 7}, {"text": ""}]
+        with patch.object(_BYTE_ENCODING, 'encode_ordinary_batch',
+                          wraps=_BYTE_ENCODING.encode_ordinary_batch) as mock_batch:
+            result = count_segment_tokens(segments)
+
+        self.assertIs(result, segments)
+        self.assertEqual([segment["n_tokens"] for segment in segments], [12, 7, 0])
+        mock_batch.assert_called_once()
+        self.assertEqual(mock_batch.call_args[0][0], ["x" * 12, ""])
+
+    def test_split_text_binary_balanced(self, _):
+        """
+        Тест сбалансированного разбиения текста по параграфам
+        """
+        paragraphs = ["a" * 10, "b" * 30, "c" * 10, "d" * 10, "e" * 20, "f" * 20]
+        text = "\n\n".join(paragraphs)
+
+        # 100 токенов при лимите 30 дают глубину 2 и четыре части
+        parts = split_text_binary(text, chunk_tokens=30)
+        self.assertEqual(parts, [
+            paragraphs[0],
+            "\n\n".join(paragraphs[1:3]),
+            "\n\n".join(paragraphs[3:5]),
+            paragraphs[5]
+        ])
+
+        # Глубину можно ограничить
+        self.assertEqual(len(split_text_binary(text, chunk_tokens=30, max_depth=1)), 2)
+        self.assertEqual(split_text_binary("", chunk_tokens=30), [])
+
+if __name__ == '__main__':
+    unittest.main()